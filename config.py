@@ -8,5 +8,59 @@ USERNAME = "REMOVED"
 PASSWORD = "REMOVED"
 COOKIES_FILE = os.path.join(BASE_DIR, 'oj_cookies.txt')
 AUTO_SELECT_COURSE = False
+DEFAULT_COURSE = None  # 子命令(oja homeworks等)未指定--course时使用的课程ID，None则自动确定
 AUTO_SELECT_HOMEWORK = True
 MAX_RECORDS_TO_SHOW = 3
+LAZY_PROBLEM_LOADING = True  # 题目列表先只加载名称，详情与提交记录在后台或打开题目时加载
+PREFETCH_WORKERS = 2  # 后台预加载题目详情的并发数
+
+# 请求超时（秒）：每个请求的连接/读取超时，以及加载一个作业列表或题目列表的总时间预算
+REQUEST_CONNECT_TIMEOUT = 5
+REQUEST_READ_TIMEOUT = 20
+FANOUT_DEADLINE = 30  # 超出预算仍未返回的作业/题目详情显示为N/A
+
+# 请求调度：同时进行的API请求数上限，其中一部分名额只留给用户操作（打开题目、提交等）
+MAX_CONCURRENT_REQUESTS = 8
+INTERACTIVE_RESERVED_REQUESTS = 2
+# 熔断：同一主机或接口连续失败这么多次后，之后的请求直接失败，RESET秒后再放行一个探测请求
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 30
+# 传输：使用HTTP/2在一个连接上并发所有API请求，需要 pip install httpx[http2]
+HTTP2_TRANSPORT = False
+# 客户端限速：{接口类别: (每秒请求数, 突发上限)}，服务器返回429/503时该类请求会暂停
+RATE_LIMITS = {
+    'read': (10, 20),   # 课程/作业/题目/提交记录
+    'submit': (1, 2),   # 提交作业
+    'poll': (2, 4),     # 轮询批改结果
+}
+RATE_LIMIT_MAX_WAITS = 3  # 被限流时最多等待重发的次数
+# 请求重试：连接错误或5xx时按指数退避(带随机抖动)重试，提交作业只在确认未提交时才重发
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.5  # 首次重试前的最长等待秒数，之后每次加倍
+RETRY_BACKOFF_MAX = 8.0
+RETRY_BUDGET = 20  # 会话级重试额度，每次成功请求回补0.1次，服务器持续故障时不再重试
+
+# 本地编译与测试（oja watch）
+JAVAC_PATH = 'javac'
+JAVA_PATH = 'java'
+JUNIT_JAR = ''  # junit-platform-console-standalone.jar 的路径，留空则只运行样例文件
+WATCH_DEBOUNCE_MS = 300
+WATCH_POLL_INTERVAL_MS = 500
+
+# 本地缓存目录（单元测试文件等）
+CACHE_DIR = os.path.join(BASE_DIR, '.oja_cache')
+UNIT_TEST_DOWNLOAD_WORKERS = 8
+UNIT_TEST_PROBE_TTL = 6 * 3600  # 单元测试存在性探测结果的缓存时间（秒）
+
+# 本地存储：镜像获取到的课程/作业/题目/提交记录，用于离线浏览（oja --offline）
+ENABLE_LOCAL_STORE = True
+LOCAL_STORE_FILE = os.path.join(CACHE_DIR, 'oja.sqlite3')
+SYNC_WORKERS = 8  # oja sync 整课程同步的并发数
+SUBMIT_WORKERS = 3  # oja submit-all 同时提交与查询结果的并发数（仍受RATE_LIMITS限速）
+TREND_REGRESSION_THRESHOLD = 0.2  # 测试用例耗时/内存比上一次提交增加超过该比例时标记为退步
+TREND_LIMIT_WARNING = 0.8  # 测试用例耗时/内存达到限制的该比例时高亮显示
+
+# 守护进程（oja daemon）：保持登录状态、连接池与缓存，之后的oja调用通过Unix域套接字交给它执行
+USE_DAEMON = True  # 守护进程在运行时是否自动使用
+DAEMON_SOCKET = os.path.join(CACHE_DIR, 'oja.sock')
+DAEMON_IDLE_TIMEOUT = 30 * 60  # 空闲多少秒后自动退出
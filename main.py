@@ -1,28 +1,94 @@
-import utils.workdir
-from services import OJRequester, handle_login, fetch_and_process_homeworks, fetch_and_process_problems
-from ui import display_courses, display_homeworks, select_course, select_homework, interact_with_problems
-from config import AUTO_SELECT_COURSE
+import sys
+if sys.version_info < (3, 10):
+    # 数据模型使用 @dataclass(slots=True)，旧版本在导入时就会失败
+    sys.exit("[x] ojAssistant 需要 Python 3.10 或更高版本，当前为 " + sys.version.split()[0])
 
-# 禁用SSL警告
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# 启动路径上只导入轻量模块，工作目录先显示出来；requests等网络模块在后台导入（见_preload_network）
+import utils.workdir
+from config import AUTO_SELECT_COURSE, LAZY_PROBLEM_LOADING, USE_DAEMON, DAEMON_SOCKET
+
+# 子命令: oja <command> [args...]，值为(模块, 函数)，在需要时才导入
+COMMANDS = {
+    'watch': ('ui.watch', 'run_watch'),
+    'sync': ('ui.commands', 'run_sync'),
+    'export': ('ui.commands', 'run_export'),
+    'search': ('ui.commands', 'run_search'),
+    'daemon': ('ui.commands', 'run_daemon'),
+    'homeworks': ('ui.commands', 'run_homeworks'),
+    'problems': ('ui.commands', 'run_problems'),
+    'submit': ('ui.commands', 'run_submit'),
+    'submit-all': ('ui.commands', 'run_submit_all'),
+    'result': ('ui.commands', 'run_result'),
+    'tests': ('ui.commands', 'run_tests'),
+    'trends': ('ui.commands', 'run_trends'),
+}
+
+def run_command(name, args):
+    """执行子命令，返回是否成功"""
+    import importlib
+    module_name, func_name = COMMANDS[name]
+    handler = getattr(importlib.import_module(module_name), func_name)
+    return handler(args)
+
+def _preload_network():
+    """在后台线程中导入网络相关模块，与打开本地存储、读取Cookies同时进行"""
+    try:
+        import services.requester
+        import services.data_service
+    except Exception:
+        pass  # 导入失败时由主线程再次导入并报告错误
 
 # 主函数
-def main():
-    # 如果有参数，替换工作目录
+def main(argv=None):
     import sys,os
-    if len(sys.argv) > 1:
-        utils.workdir.set(os.path.abspath(sys.argv[1]))
+    if argv is None:
+        argv = sys.argv[1:]
+        # oja daemon正在运行时交给它执行，省去启动、登录与缓存预热
+        if USE_DAEMON and argv[:1] != ['daemon'] and os.path.exists(DAEMON_SOCKET):
+            from services.daemon import forward
+            status = forward(argv)
+            if status is not None:
+                # 与直接运行时一致：命令失败时返回False，以非0状态退出
+                return False if status else None
+
+    if argv and argv[0] in COMMANDS:
+        return run_command(argv[0], argv[1:])
+
+    args = argv
+    offline = '--offline' in args
+    show_stats = '--stats' in args
+    args = [arg for arg in args if arg not in ('--offline', '--stats')]
 
-    print("当前工作目录:", utils.workdir.get())
+    # 如果有参数，替换工作目录
+    if args:
+        utils.workdir.set(os.path.abspath(args[0]))
 
-    # 创建一个OJ请求实例
-    requester = OJRequester()
+    print("当前工作目录:", utils.workdir.get(), flush=True)
 
-    # 处理登录
-    if not handle_login(requester):
+    if not offline:
+        import threading
+        threading.Thread(target=_preload_network, daemon=True).start()
+
+    # 创建请求实例并处理登录（离线模式下只使用本地存储中的数据）
+    from services import create_requester
+    requester = create_requester(offline)
+    if not requester:
         return  # 如果登录失败，退出程序
 
+    try:
+        run_interactive(requester)
+    finally:
+        if show_stats:
+            from ui import display_request_stats
+            display_request_stats(requester.request_stats())
+
+def run_interactive(requester):
+    """课程 -> 作业 -> 题目 的交互流程"""
+    from services import fetch_and_process_homeworks, fetch_and_process_problems, fetch_problem_list, \
+        ProblemWarmer
+    from ui import display_courses, display_homeworks, display_service_status, select_course, select_homework, \
+        interact_with_problems
+
     # 获取并显示课程列表
     courses = display_courses(requester)
     if not courses:
@@ -38,13 +104,14 @@ def main():
 
     while True:
         # 获取作业列表并处理
-        enriched_homeworks = sorted(fetch_and_process_homeworks(requester, selected_course), key=lambda x: x['homeworkId'])
+        enriched_homeworks = sorted(fetch_and_process_homeworks(requester, selected_course), key=lambda x: x.id)
         if not enriched_homeworks:
             return  # 如果无法获取作业列表，退出程序
 
         # 显示作业列表
         if not display_homeworks(enriched_homeworks):
             return  # 如果无法显示作业列表，退出程序
+        display_service_status()
 
         # 用户选择作业
 
@@ -53,17 +120,36 @@ def main():
             return  # 如果用户没有选择有效的作业，退出程序
 
         # 获取问题列表并处理，包括获取提交记录
-        enriched_problems = fetch_and_process_problems(requester, selected_homework, selected_course)
+        warmer = None
+        if LAZY_PROBLEM_LOADING:
+            # 先只获取题目列表，详情与提交记录在后台预加载
+            enriched_problems = fetch_problem_list(requester, selected_homework, selected_course)
+            if enriched_problems:
+                warmer = ProblemWarmer(requester, selected_homework, selected_course, enriched_problems)
+        else:
+            enriched_problems = fetch_and_process_problems(requester, selected_homework, selected_course)
         if not enriched_problems:
             return  # 如果无法获取问题列表，退出程序
 
         # 处理与问题的交互（查看详情和提交作业）
-        if interact_with_problems(enriched_problems, selected_course, selected_homework, requester):
-            return  # 正常退出
+        try:
+            if interact_with_problems(enriched_problems, selected_course, selected_homework, requester, warmer):
+                return  # 正常退出
+        finally:
+            if warmer:
+                warmer.close()
         # 如果返回False，则继续外层循环，即返回到作业列表
 
         # 重置自动选择作业的标志，以便下次手动选择
         auto_select_homework = False
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import sys
+    try:
+        result = main()
+    finally:
+        # 取消排队中的单元测试探测，否则解释器退出时会等待整个探测队列
+        if 'services.unit_test_probe' in sys.modules:
+            sys.modules['services.unit_test_probe'].close_probe()
+    # 子命令失败时以非0状态退出，便于脚本判断
+    sys.exit(1 if result is False else 0)
\ No newline at end of file
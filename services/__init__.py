@@ -1,12 +1,35 @@
-"""服务层模块，提供认证、数据获取处理和API通信服务。"""
+"""服务层模块，提供认证、数据获取处理和API通信服务。
 
-from .requester import OJRequester
-from .auth_service import handle_login
-from .data_service import fetch_and_process_homeworks, fetch_and_process_problems, download_unit_test_file
+导出的名称在首次访问时才导入所在子模块，requests等较重的依赖不会拖慢启动。
+"""
+import importlib
+
+# 导出的名称 -> 所在子模块
+_EXPORTS = {
+    'OJRequester': 'requester',
+    'handle_login': 'auth_service',
+    'create_requester': 'auth_service',
+    'fetch_and_process_homeworks': 'data_service',
+    'fetch_and_process_problems': 'data_service',
+    'download_unit_test_file': 'data_service',
+    'download_homework_unit_tests': 'data_service',
+    'fetch_problem_list': 'data_service',
+    'ProblemWarmer': 'data_service',
+}
 
 __all__ = [
     'OJRequester',
     'handle_login',
+    'create_requester',
     'fetch_and_process_homeworks',
     'fetch_and_process_problems'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
@@ -1,10 +1,22 @@
 import config
 
-def handle_login(requester):
-    """处理登录流程，尝试使用本地cookies或执行CAS登录"""
+def handle_login(requester, saved_cookies=None):
+    """处理登录流程，网络请求失败（如超时）时返回False
+
+    saved_cookies为已经读取好的Cookies文件内容，不提供时由requester读取
+    """
+    import requests
+    try:
+        return _login(requester, saved_cookies)
+    except requests.RequestException as e:
+        print(f"[\x1b[0;31mx\x1b[0m] 登录时网络请求失败: {e}")
+        return False
+
+def _login(requester, saved_cookies=None):
+    """尝试使用本地cookies或执行CAS登录"""
     # 尝试先加载cookies
     login_successful = False
-    if requester.load_cookies():
+    if requester.load_cookies(stored=saved_cookies):
         # 验证cookies是否仍然有效
         if requester.check_cookies_status():
             login_successful = True
@@ -27,4 +39,52 @@ def handle_login(requester):
             print("[\x1b[0;31mx\x1b[0m] CAS 登录失败")
             return False
 
-    return login_successful
\ No newline at end of file
+    return login_successful
+
+
+# oja daemon中保持登录状态的请求实例，在线调用直接复用
+_warm_requester = None
+
+
+def keep_warm(requester):
+    """之后的create_requester()直接返回requester（由oja daemon使用）"""
+    global _warm_requester
+    _warm_requester = requester
+
+
+def create_requester(offline=False):
+    """创建请求实例
+
+    在线时附加本地存储（如果启用）并处理登录；离线时只从本地存储读取数据。
+    在oja daemon中执行时复用已登录的请求实例。
+
+    Returns:
+        请求实例，如果登录失败或无法打开本地存储则返回None
+    """
+    from services.store import open_store, OfflineRequester
+
+    if offline:
+        store = open_store()
+        if not store:
+            return None
+        print("[\x1b[0;33m!\x1b[0m] 离线模式: 仅显示本地存储中的数据")
+        return OfflineRequester(store)
+
+    if _warm_requester is not None:
+        return _warm_requester
+
+    # 先完成本地I/O（打开本地存储、读取Cookies），与后台导入网络模块（见main.py）重叠进行
+    store = open_store() if config.ENABLE_LOCAL_STORE else None
+    from utils.file_handlers import read_cookies_file
+    try:
+        saved_cookies = read_cookies_file(config.COOKIES_FILE)
+    except OSError:
+        saved_cookies = None  # 交给load_cookies重新读取并报告错误
+
+    from services.requester import OJRequester
+    requester = OJRequester()
+    requester.store = store
+
+    if not handle_login(requester, saved_cookies):
+        return None
+    return requester
\ No newline at end of file
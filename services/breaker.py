@@ -0,0 +1,152 @@
+"""熔断器：依赖的服务不可用时快速失败，而不是每次都等待超时"""
+import time
+import threading
+from urllib.parse import urlparse
+
+import requests
+
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+from services.deadline import DeadlineExceeded, timeout_shortened
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """熔断器处于打开状态，请求未发送"""
+
+
+class CircuitBreaker:
+    """单个主机或接口的熔断器
+
+    连续failure_threshold次失败后打开，打开期间的调用直接失败；reset_timeout秒后进入半开状态，
+    放行一个探测请求，成功则关闭，失败则重新打开。
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """是否放行一个请求，半开状态下只放行一个探测请求"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        """放行的探测请求最终没有发送"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def retry_in(self):
+        """距离下一次探测的秒数"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+class BreakerRegistry:
+    """按主机与接口管理熔断器
+
+    主机熔断器只统计连接错误与超时（主机不可达）；接口熔断器还统计5xx（接口故障）。
+    因时间预算用完(DeadlineExceeded)或被预算缩短的超时而失败的请求不计入，它们不代表服务故障。
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def call(self, url, send, per_endpoint=False):
+        """通过熔断器发送请求：send()返回响应，per_endpoint为True时同时使用该URL路径的接口熔断器
+
+        Raises:
+            CircuitOpenError: 主机或接口的熔断器处于打开状态
+        """
+        parsed = urlparse(url)
+        guards = [self.get(parsed.netloc)]
+        if per_endpoint:
+            guards.append(self.get(parsed.netloc + parsed.path))
+        for i, breaker in enumerate(guards):
+            if not breaker.allow():
+                for allowed in guards[:i]:
+                    allowed.release_probe()
+                raise CircuitOpenError(f"{breaker.name} 暂时不可用（已熔断），{breaker.retry_in():.0f}秒后重试")
+
+        shortened = timeout_shortened()
+        try:
+            response = send()
+        except DeadlineExceeded:
+            for breaker in guards:
+                breaker.release_probe()
+            raise
+        except requests.Timeout:
+            for breaker in guards:
+                if shortened:
+                    breaker.release_probe()
+                else:
+                    breaker.record_failure()
+            raise
+        except requests.RequestException:
+            for breaker in guards:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            for breaker in guards:
+                breaker.release_probe()
+            raise
+
+        guards[0].record_success()  # 收到了响应，主机是可达的
+        for breaker in guards[1:]:
+            if response.status_code >= 500 and response.status_code != 503:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    def open_breakers(self):
+        """处于打开或半开状态的熔断器，[(名称, 状态, 距下一次探测的秒数)]"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [(b.name, b.state, b.retry_in()) for b in breakers if b.state != CLOSED]
+
+
+# 所有出站请求共享的熔断器
+breakers = BreakerRegistry(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
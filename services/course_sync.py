@@ -0,0 +1,156 @@
+"""整课程同步：作业列表 -> 作业详情/题目列表 -> 题目详情/提交记录，以流水线方式并发获取"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SyncPipeline:
+    """共享一个有界线程池的任务流水线，任务完成时可以继续提交下游任务"""
+
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='oja-sync')
+        self._cond = threading.Condition()
+        self.pending = 0
+        self.completed = 0
+        self.requests = 0
+        self.errors = []
+
+    def submit(self, fn, *args):
+        with self._cond:
+            self.pending += 1
+        self._executor.submit(self._run, fn, args)
+
+    def count_request(self):
+        with self._cond:
+            self.requests += 1
+
+    def _run(self, fn, args):
+        try:
+            fn(*args)
+        except Exception as exc:
+            with self._cond:
+                self.errors.append(f"{fn.__name__}{args[:2]}: {exc}")
+        finally:
+            with self._cond:
+                self.pending -= 1
+                self.completed += 1
+                self._cond.notify_all()
+
+    def wait(self, on_progress=None, interval=0.2):
+        """等待所有任务（包括运行中新提交的下游任务）完成"""
+        with self._cond:
+            while self.pending:
+                self._cond.wait(interval)
+                if on_progress:
+                    on_progress(self.completed, self.completed + self.pending, self.requests)
+
+    def shutdown(self, cancel=False):
+        self._executor.shutdown(wait=not cancel, cancel_futures=cancel)
+
+
+def sync_course(requester, store, course_id, max_workers=None):
+    """将整个课程镜像到本地存储，支持中断后从断点继续
+
+    每个任务只发送一个请求，完成后立即提交依赖它的下游任务，不在层级之间等待。
+    已完成的任务记录在存储中，中断后再次同步同一课程时会跳过。
+
+    Returns:
+        dict: 同步统计信息，失败时返回None
+    """
+    from config import SYNC_WORKERS
+
+    done = store.begin_sync(course_id)
+    if done:
+        print(f"[\x1b[0;36m!\x1b[0m] 从上次中断处继续同步 (已完成 {len(done)} 个任务)")
+
+    pipeline = SyncPipeline(max_workers or SYNC_WORKERS)
+    stats = {'homeworks': 0, 'problems': 0}
+    stats_lock = threading.Lock()
+
+    def fetch(request, *args):
+        """发送一个请求，失败时抛出异常以便记录并在下次同步时重试"""
+        pipeline.count_request()
+        result = request(*args)
+        if result is False or result is None:
+            raise RuntimeError("请求失败")
+        return result
+
+    def homework_info(homework_id):
+        key = f"hwinfo:{homework_id}"
+        if key not in done:
+            fetch(requester.get_homework_info, homework_id, course_id)
+            store.mark_sync_task(course_id, key)
+
+    def problem_info(homework_id, problem_id):
+        key = f"info:{homework_id}:{problem_id}"
+        if key not in done:
+            fetch(requester.get_problem_info, problem_id, homework_id, course_id)
+            store.mark_sync_task(course_id, key)
+
+    def problem_records(homework_id, problem_id, problem_name):
+        key = f"records:{homework_id}:{problem_id}"
+        if key not in done:
+            result = fetch(requester.get_problem_submission_records, problem_id, homework_id, course_id)
+            store.record_sync.merge(course_id, homework_id, problem_id, result.get('list') or [], problem_name)
+            store.mark_sync_task(course_id, key)
+
+    def homework_problems(homework_id):
+        key = f"problems:{homework_id}"
+        # 续传时列表从本地存储读取，存储中没有时重新获取
+        problems = store.load_homework_problems(course_id, homework_id) if key in done else None
+        if problems is None:
+            problems = fetch(requester.get_homework_problems, homework_id, course_id)
+            store.mark_sync_task(course_id, key)
+
+        for problem in problems.get('list') or []:
+            with stats_lock:
+                stats['problems'] += 1
+            problem_id = problem.get('problemId')
+            pipeline.submit(problem_info, homework_id, problem_id)
+            pipeline.submit(problem_records, homework_id, problem_id, problem.get('problemName', ''))
+
+    def homeworks_list():
+        key = "homeworks"
+        homeworks = store.load_homeworks_list(course_id) if key in done else None
+        if homeworks is None:
+            homeworks = fetch(requester.get_homeworks_list, course_id)
+            store.mark_sync_task(course_id, key)
+
+        for hw in homeworks.get('list') or []:
+            with stats_lock:
+                stats['homeworks'] += 1
+            pipeline.submit(homework_info, hw['homeworkId'])
+            pipeline.submit(homework_problems, hw['homeworkId'])
+
+    started = time.monotonic()
+
+    def on_progress(completed, total, requests_sent):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"\r[\x1b[0;36m!\x1b[0m] 同步进度: {completed}/{total} 任务, "
+              f"{requests_sent / elapsed:.1f} 请求/秒", end="")
+
+    pipeline.submit(homeworks_list)
+    try:
+        pipeline.wait(on_progress)
+    except KeyboardInterrupt:
+        pipeline.shutdown(cancel=True)
+        print(f"\n[\x1b[0;33m!\x1b[0m] 同步已中断，再次运行 oja sync {course_id} 将从断点继续")
+        return None
+    pipeline.shutdown()
+    print("\r" + " " * 60 + "\r", end="")  # 清除进度显示
+
+    elapsed = time.monotonic() - started
+    if pipeline.errors:
+        print(f"[\x1b[0;33m!\x1b[0m] {len(pipeline.errors)} 个任务失败，再次运行将重试:")
+        for error in pipeline.errors[:5]:
+            print(f"  {error}")
+    else:
+        store.finish_sync(course_id)
+
+    return {
+        'homeworks': stats['homeworks'],
+        'problems': stats['problems'],
+        'requests': pipeline.requests,
+        'elapsed': elapsed,
+        'errors': len(pipeline.errors),
+    }
@@ -0,0 +1,218 @@
+"""oja daemon：常驻进程保持登录状态、连接池与内存缓存，通过Unix域套接字执行CLI调用
+
+客户端连接后先发送一行JSON {"argv": [...], "cwd": "..."}，之后客户端把标准输入原样发给守护进程，
+守护进程把标准输出与标准错误分帧发回（每帧为1字节流编号、4字节长度与数据，见_FrameWriter），
+命令执行完毕后发送退出状态帧（1字节，0为成功）并关闭连接。
+同一时间只执行一个调用，空闲超过DAEMON_IDLE_TIMEOUT秒后自动退出。
+"""
+import io
+import os
+import sys
+import json
+import socket
+import struct
+import threading
+
+from config import DAEMON_SOCKET, DAEMON_IDLE_TIMEOUT
+
+
+# 守护进程发回的帧: 流编号(1字节) + 数据长度(4字节，大端) + 数据
+FRAME_HEADER = struct.Struct('>BI')
+STDOUT, STDERR, EXIT_STATUS = 1, 2, 3
+
+
+class _FrameWriter(io.RawIOBase):
+    """把写入的数据作为某个流的帧发送到套接字，stdout与stderr共用一个锁保证帧不交错"""
+
+    def __init__(self, conn, stream, lock):
+        self.conn = conn
+        self.stream = stream
+        self.lock = lock
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        with self.lock:
+            self.conn.sendall(FRAME_HEADER.pack(self.stream, len(data)) + bytes(data))
+        return len(data)
+
+
+def _recv_exact(sock, size):
+    """读取恰好size字节，连接关闭时返回None"""
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def supported():
+    return hasattr(socket, 'AF_UNIX')
+
+
+def _connect(path):
+    """连接到正在运行的守护进程，没有运行时返回None"""
+    if not supported() or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def forward(argv, path=None):
+    """如果守护进程正在运行，把本次调用交给它执行
+
+    Returns:
+        守护进程没有运行时返回None，否则返回命令的退出状态（0为成功；没有收到退出状态时为1）
+    """
+    sock = _connect(path or DAEMON_SOCKET)
+    if sock is None:
+        return None
+
+    header = json.dumps({'argv': argv, 'cwd': os.getcwd()}, ensure_ascii=False) + '\n'
+    sock.sendall(header.encode('utf-8'))
+
+    def pump_stdin():
+        try:
+            for line in sys.stdin:
+                sock.sendall(line.encode('utf-8'))
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    threading.Thread(target=pump_stdin, daemon=True).start()
+    outputs = {STDOUT: sys.stdout.buffer, STDERR: sys.stderr.buffer}
+    status = 1
+    try:
+        while True:
+            header = _recv_exact(sock, FRAME_HEADER.size)
+            if header is None:
+                break
+            stream, length = FRAME_HEADER.unpack(header)
+            data = _recv_exact(sock, length)
+            if data is None:
+                break
+            if stream == EXIT_STATUS:
+                status = data[0] if data else 1
+                continue
+            out = outputs.get(stream, outputs[STDOUT])
+            out.write(data)
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return status
+
+
+def stop(path=None):
+    """通知正在运行的守护进程退出，返回是否有守护进程在运行"""
+    sock = _connect(path or DAEMON_SOCKET)
+    if sock is None:
+        return False
+    with sock:
+        sock.sendall(b'{"control": "stop"}\n')
+        sock.recv(1)
+    return True
+
+
+class OjaDaemon:
+    """在一个常驻进程中依次执行客户端转发来的oja调用"""
+
+    def __init__(self, handler, path=None, idle_timeout=None):
+        """
+        Args:
+            handler: handler(argv)，执行一次oja调用（即main.main）
+            path: 套接字路径
+            idle_timeout: 空闲多少秒后退出
+        """
+        self.handler = handler
+        self.path = path or DAEMON_SOCKET
+        self.idle_timeout = idle_timeout or DAEMON_IDLE_TIMEOUT
+
+    def serve(self):
+        if _connect(self.path) is not None:
+            print(f"[\x1b[0;33m!\x1b[0m] 守护进程已在运行 ({self.path})")
+            return False
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # 上次异常退出留下的套接字文件
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # 只有当前用户可以使用已登录的会话：套接字文件创建时就是0600，不留其他用户可以连接的间隙
+        umask = os.umask(0o077)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+        server.listen(4)
+        server.settimeout(self.idle_timeout)
+        print(f"[\x1b[0;32m+\x1b[0m] 守护进程已启动 ({self.path})，空闲{self.idle_timeout}秒后自动退出")
+
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    print("[\x1b[0;36m!\x1b[0m] 空闲超时，守护进程退出")
+                    break
+                with conn:
+                    if not self._serve_client(conn):
+                        print("[\x1b[0;36m!\x1b[0m] 收到停止请求，守护进程退出")
+                        break
+        except KeyboardInterrupt:
+            print("\n[\x1b[0;36m!\x1b[0m] 守护进程已停止")
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        return True
+
+    def _serve_client(self, conn):
+        """执行一次客户端调用，收到停止请求时返回False"""
+        conn.settimeout(None)
+        reader = conn.makefile('r', encoding='utf-8', newline='\n')
+        try:
+            request = json.loads(reader.readline() or '{}')
+        except json.JSONDecodeError:
+            return True
+        if request.get('control') == 'stop':
+            conn.sendall(b'\n')
+            return False
+
+        lock = threading.Lock()
+        writer = io.TextIOWrapper(_FrameWriter(conn, STDOUT, lock), encoding='utf-8', write_through=True)
+        errors = io.TextIOWrapper(_FrameWriter(conn, STDERR, lock), encoding='utf-8', write_through=True)
+        saved = sys.stdin, sys.stdout, sys.stderr, os.getcwd()
+        sys.stdin, sys.stdout, sys.stderr = reader, writer, errors
+        status = 1
+        try:
+            import utils.workdir
+            cwd = request.get('cwd') or saved[3]
+            os.chdir(cwd)
+            utils.workdir.set(cwd)
+            # 与直接运行时相同：处理函数返回False（子命令失败）或抛出异常时退出状态为1
+            status = 1 if self.handler(request.get('argv') or []) is False else 0
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            return True  # 客户端已断开
+        except Exception as e:
+            try:
+                print(f"[\x1b[0;31mx\x1b[0m] 执行出错: {e}")
+            except OSError:
+                pass
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved[0], saved[1], saved[2]
+            os.chdir(saved[3])
+        try:
+            _FrameWriter(conn, EXIT_STATUS, lock).write(bytes([status]))
+        except OSError:
+            pass  # 客户端已断开
+        return True
@@ -1,9 +1,16 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 import os
 import re
+import threading
+import time
 import requests
 from urllib.parse import quote
 
+from services.models import Homework, Problem
+from services.scheduler import request_priority, BACKGROUND
+from services.deadline import deadline, propagate, remaining, request_timeout
+from services.breaker import breakers, CircuitOpenError
+
 def fetch_and_process_homeworks(requester, course_id):
     """获取、排序和丰富作业数据
 
@@ -12,7 +19,7 @@ def fetch_and_process_homeworks(requester, course_id):
         course_id: 课程ID
 
     Returns:
-        enriched_homeworks: 包含详细信息的作业列表，如果获取失败则返回None
+        enriched_homeworks: Homework列表，如果获取失败则返回None
     """
     homeworks = requester.get_homeworks_list(course_id)
     if not homeworks or 'list' not in homeworks or not homeworks['list']:
@@ -26,34 +33,37 @@ def fetch_and_process_homeworks(requester, course_id):
     # 定义一个工作函数来获取作业详情
     def fetch_homework_detail(hw):
         """为单个作业获取详细信息的工作函数"""
-        hw_id = hw['homeworkId']
-        hw_details = requester.get_homework_info(hw_id, course_id)
-        if hw_details:
-            # 将详细信息合并到原始作业信息中
-            hw['details'] = hw_details
-        else:
-            # 没有获取到详细信息时设置空字典
-            hw['details'] = {}
-        return hw
+        hw_details = requester.get_homework_info(hw['homeworkId'], course_id)
+        # 没有获取到详细信息时按空详情处理
+        return Homework.from_api(hw, hw_details or {})
 
-    # 使用多线程获取每个作业的详细信息
+    # 使用多线程获取每个作业的详细信息，整体受FANOUT_DEADLINE时间预算限制
+    from config import FANOUT_DEADLINE
     enriched_homeworks = []
     max_workers = min(5, len(sorted_homeworks))  # 最多5个线程，或作业数量（取较小值）
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    with deadline(FANOUT_DEADLINE):
         # 提交所有作业的详情请求到线程池
-        future_to_hw = {executor.submit(fetch_homework_detail, hw): hw for hw in sorted_homeworks}
+        future_to_hw = {executor.submit(propagate(fetch_homework_detail), hw): hw for hw in sorted_homeworks}
 
         # 获取结果
-        for future in as_completed(future_to_hw):
-            try:
-                hw = future.result()
-                enriched_homeworks.append(hw)
-            except Exception as exc:
-                hw_id = future_to_hw[future].get('homeworkId', 'Unknown')
-                print(f"\n[\x1b[0;31mx\x1b[0m] 获取作业 {hw_id} 详情时出错: {exc}")
-                # 保留原始信息
-                enriched_homeworks.append(future_to_hw[future])
+        try:
+            for future in as_completed(future_to_hw, timeout=max(0, remaining())):
+                try:
+                    enriched_homeworks.append(future.result())
+                except Exception as exc:
+                    hw_id = future_to_hw[future].get('homeworkId', 'Unknown')
+                    print(f"\n[\x1b[0;31mx\x1b[0m] 获取作业 {hw_id} 详情时出错: {exc}")
+                    # 保留原始信息，完成度与得分显示为不可用
+                    enriched_homeworks.append(Homework.unavailable(future_to_hw[future]))
+        except FuturesTimeout:
+            pending = [hw for future, hw in future_to_hw.items() if not future.done()]
+            print(f"\n[\x1b[0;33m!\x1b[0m] {len(pending)}个作业的详情超出时间预算({FANOUT_DEADLINE}秒)，暂不显示")
+            enriched_homeworks.extend(Homework.unavailable(hw) for hw in pending)
+        finally:
+            # 未开始的请求直接取消，进行中的请求在截止时间后也会很快结束
+            executor.shutdown(wait=False, cancel_futures=True)
 
     return enriched_homeworks
 
@@ -66,7 +76,7 @@ def fetch_and_process_problems(requester, homework_id, course_id):
         course_id: 课程ID
 
     Returns:
-        enriched_problems: 包含详细信息的问题列表，如果获取失败则返回None
+        enriched_problems: Problem列表，如果获取失败则返回None
     """
     print(f"\n[\x1b[0;36m!\x1b[0m] 获取作业ID{homework_id}的题目列表...")
     problems_list = requester.get_homework_problems(homework_id, course_id)
@@ -76,24 +86,19 @@ def fetch_and_process_problems(requester, homework_id, course_id):
         return None
 
     # 定义函数以获取问题详细信息和提交记录
-    def fetch_problem_detail(problem):
+    def fetch_problem_detail(item):
         """为单个问题获取详细信息和提交记录的工作函数"""
-        problem_id = problem.get('problemId', 'Unknown')
+        problem_id = item.get('problemId', 'Unknown')
 
         # 获取问题详情
         problem_info = requester.get_problem_info(problem_id, homework_id, course_id)
-        if problem_info:
-            problem['details'] = problem_info
-        else:
-            problem['details'] = {}
 
         # 获取提交记录
         submission_records = requester.get_problem_submission_records(problem_id, homework_id, course_id)
-        if submission_records and 'list' in submission_records and len(submission_records['list']) > 0:
-            problem['submission_records'] = submission_records['list']
-        else:
-            problem['submission_records'] = []
+        records = submission_records.get('list') if submission_records else None
 
+        problem = Problem.from_api(item, problem_info or {})
+        problem.set_records(merge_records(requester, problem, homework_id, course_id, records or []))
         return problem
 
     # 使用多线程获取每个问题的详细信息
@@ -102,11 +107,13 @@ def fetch_and_process_problems(requester, homework_id, course_id):
 
     max_workers = min(5, len(original_problems))  # 最多5个线程
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    from config import FANOUT_DEADLINE
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    with deadline(FANOUT_DEADLINE):
         # 提交所有问题的详情请求到线程池，并记录原始索引
         futures = {}
         for i, problem in enumerate(original_problems):
-            future = executor.submit(fetch_problem_detail, problem)
+            future = executor.submit(propagate(fetch_problem_detail), problem)
             futures[future] = (i, problem.get('problemId', 'Unknown'))
 
         # 创建进度计数
@@ -114,21 +121,27 @@ def fetch_and_process_problems(requester, homework_id, course_id):
         total = len(futures)
 
         # 获取结果
-        for future in as_completed(futures):
-            try:
-                problem = future.result()
-                index, problem_id = futures[future]
-                problem_results[index] = problem
-                completed += 1
-                print(f"\r[\x1b[0;36m!\x1b[0m] 获取题目详情进度: {completed}/{total}", end="")
-            except Exception as exc:
-                index, problem_id = futures[future]
-                print(f"\n[\x1b[0;31mx\x1b[0m] 获取题目 {problem_id} 详情时出错: {exc}")
-                # 保留原始信息但添加空的details字典
-                problem = original_problems[index]
-                problem['details'] = {}
-                problem['submission_records'] = []
-                problem_results[index] = problem
+        try:
+            for future in as_completed(futures, timeout=max(0, remaining())):
+                try:
+                    problem = future.result()
+                    index, problem_id = futures[future]
+                    problem_results[index] = problem
+                    completed += 1
+                    print(f"\r[\x1b[0;36m!\x1b[0m] 获取题目详情进度: {completed}/{total}", end="")
+                except Exception as exc:
+                    index, problem_id = futures[future]
+                    print(f"\n[\x1b[0;31mx\x1b[0m] 获取题目 {problem_id} 详情时出错: {exc}")
+                    # 保留原始信息，不含详情与提交记录
+                    problem_results[index] = Problem.unavailable(original_problems[index])
+        except FuturesTimeout:
+            print(f"\n[\x1b[0;33m!\x1b[0m] {total - completed}道题目的详情超出时间预算({FANOUT_DEADLINE}秒)，暂不显示")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    for i, problem in enumerate(original_problems):
+        if i not in problem_results:
+            problem_results[i] = Problem.unavailable(problem)
 
     # 按原始顺序重建问题列表
     enriched_problems = [problem_results[i] for i in range(len(original_problems))]
@@ -137,6 +150,203 @@ def fetch_and_process_problems(requester, homework_id, course_id):
     return enriched_problems
 
 
+def merge_records(requester, problem, homework_id, course_id, records):
+    """有本地存储时按recordId增量合并提交记录，返回可传给Problem.set_records的列表"""
+    store = getattr(requester, 'store', None)
+    if store is None:
+        return records
+    try:
+        return store.record_sync.merge(course_id, homework_id, problem.id, records, problem.name)
+    except Exception as e:
+        print(f"\n[\x1b[0;33m!\x1b[0m] 合并提交记录到本地存储失败: {e}")
+        return records
+
+
+def fetch_problem_list(requester, homework_id, course_id):
+    """只获取作业的题目列表，不请求题目详情与提交记录
+
+    Returns:
+        未加载详情的Problem列表，如果获取失败则返回None
+    """
+    print(f"\n[\x1b[0;36m!\x1b[0m] 获取作业ID{homework_id}的题目列表...")
+    problems_list = requester.get_homework_problems(homework_id, course_id)
+
+    if not problems_list or 'list' not in problems_list or not problems_list['list']:
+        print("[\x1b[0;31mx\x1b[0m] 获取问题列表失败或列表为空")
+        return None
+
+    return [Problem.placeholder(item) for item in problems_list['list']]
+
+
+def load_problem(requester, problem, homework_id, course_id, details=True):
+    """为题目请求详情（可选）与提交记录，并填充到Problem对象中"""
+    if details:
+        problem_info = requester.get_problem_info(problem.id, homework_id, course_id)
+        problem.set_details(problem_info or {})
+
+    submission_records = requester.get_problem_submission_records(problem.id, homework_id, course_id)
+    records = submission_records.get('list') if submission_records else None
+    problem.set_records(merge_records(requester, problem, homework_id, course_id, records or []))
+    problem.loaded = True
+    return problem
+
+
+def poll_grading_result(requester, record_id, course_id, homework_id, time_limit=None, attempts=10, on_wait=None):
+    """轮询批改结果，直到不再是批改中(JG)
+
+    首次等待时间为题目的时间限制（默认2000毫秒），之后每次乘以1.5，最长5秒。
+
+    Args:
+        time_limit: 题目的时间限制（毫秒）
+        attempts: 最多查询的次数
+        on_wait: 每次等待前调用on_wait(第几次, attempts)，用于显示进度
+
+    Returns:
+        结果字典，尝试次数用完时resultState仍为'JG'；获取失败时返回None
+    """
+    wait_time = (time_limit or 2000) / 1000
+    result = None
+    for attempt in range(1, attempts + 1):
+        if on_wait:
+            on_wait(attempt, attempts)
+        time.sleep(wait_time)
+
+        result = requester.get_submission_result(record_id, course_id, homework_id)
+        if not result:
+            return None
+        if result['resultState'] != 'JG':
+            return result
+        wait_time = min(wait_time * 1.5, 5)
+    return result
+
+
+def poll_grading_results(requester, record_ids, course_id, homework_id, interval=1.0, attempts=15, on_result=None):
+    """同时轮询多个提交的批改结果
+
+    每一轮并发查询所有仍在批改中的提交（受轮询接口的客户端限速约束），所有提交共享同一个
+    等待间隔，从interval秒开始每轮乘以1.5，最长5秒。
+
+    Args:
+        on_result: 某个提交批改完成（或获取失败）时调用on_result(record_id, 结果字典或None)
+
+    Returns:
+        {record_id: 结果字典}，获取失败的为None，尝试次数用完仍在批改中的resultState为'JG'
+    """
+    from config import SUBMIT_WORKERS
+
+    def fetch(record_id):
+        try:
+            return requester.get_submission_result(record_id, course_id, homework_id)
+        except requests.RequestException:
+            return None
+
+    results = {}
+    pending = list(dict.fromkeys(record_ids))
+    wait_time = interval
+    with ThreadPoolExecutor(max_workers=max(1, min(len(pending), SUBMIT_WORKERS)),
+                            thread_name_prefix='oja-poll') as executor:
+        for _ in range(attempts):
+            if not pending:
+                break
+            time.sleep(wait_time)
+
+            still_judging = []
+            for record_id, result in zip(pending, executor.map(fetch, pending)):
+                results[record_id] = result or None
+                if result and result.get('resultState') == 'JG':
+                    still_judging.append(record_id)
+                elif on_result:
+                    on_result(record_id, results[record_id])
+            pending = still_judging
+            wait_time = min(wait_time * 1.5, 5)
+    return results
+
+
+def report_request_error(error):
+    """网络请求失败时显示一行说明：熔断中的服务显示暂时不可用，其他错误显示错误类型"""
+    if isinstance(error, CircuitOpenError):
+        print(f"[\x1b[0;31mx\x1b[0m] {error}")
+    else:
+        print(f"[\x1b[0;31mx\x1b[0m] 网络请求失败({type(error).__name__})，请稍后重试")
+
+
+class ProblemWarmer:
+    """在后台以有限的并发加载题目详情，打开题目时按需优先加载"""
+
+    def __init__(self, requester, homework_id, course_id, problems, max_workers=None):
+        from config import PREFETCH_WORKERS
+        self.requester = requester
+        self.homework_id = homework_id
+        self.course_id = course_id
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or PREFETCH_WORKERS,
+                                            thread_name_prefix='oja-warm')
+        for problem in problems:
+            if not problem.loaded:
+                self._futures[problem.id] = self._executor.submit(self._warm, problem)
+
+    def _load(self, problem):
+        if not problem.loaded:
+            load_problem(self.requester, problem, self.homework_id, self.course_id)
+        return problem
+
+    def _warm(self, problem):
+        # 后台预加载让位于用户正在等待的请求
+        with request_priority(BACKGROUND):
+            return self._load(problem)
+
+    def ensure(self, problem):
+        """确保题目已加载：尚未开始的后台任务会被取消并立即在当前线程加载
+
+        Returns:
+            Problem对象，网络请求失败（包括服务已熔断）时显示原因并返回None
+        """
+        if problem.loaded:
+            return problem
+
+        with self._lock:
+            future = self._futures.pop(problem.id, None)
+        if future is not None and not future.cancel():
+            # 后台已在加载该题目，等待其完成即可
+            try:
+                return future.result()
+            except Exception:
+                pass
+        try:
+            return self._load(problem)
+        except requests.RequestException as e:
+            report_request_error(e)
+            return None
+
+    def refresh_records(self, problem):
+        """提交后只重新获取该题目的提交记录，失败时显示原因并返回None"""
+        try:
+            return load_problem(self.requester, problem, self.homework_id, self.course_id, details=False)
+        except requests.RequestException as e:
+            report_request_error(e)
+            return None
+
+    def close(self):
+        """取消尚未开始的后台加载"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 基础URL，作者把单元测试文件放在了自费的阿里云OSS上
+UNIT_TEST_BASE_URL = "https://hexo-blog-netlify.oss-cn-shenzhen.aliyuncs.com/junittest"
+UNIT_TEST_FILE_NAME = "MainTest.java"
+
+
+def build_unit_test_url(course_code, homework_id, problem_id, problem_name):
+    """构造单元测试文件在OSS上的URL"""
+    return f"{UNIT_TEST_BASE_URL}/{course_code}/{homework_id}/{problem_id}_{quote(problem_name)}/{UNIT_TEST_FILE_NAME}"
+
+
+def _is_oss_error_response(response):
+    """OSS在某些情况下会以200返回XML格式的错误信息"""
+    return response.text.strip().startswith('<?xml') and '<Error>' in response.text
+
+
 def download_unit_test_file(course_code, problem_id, homework_id, problem_name):
     """
     下载单元测试文件
@@ -150,27 +360,20 @@ def download_unit_test_file(course_code, problem_id, homework_id, problem_name):
     Returns:
         (bool, str): 第一个元素表示是否成功，第二个元素为文件路径或错误消息
     """
-    # 基础URL，作者把单元测试文件放在了自费的阿里云OSS上
-    base_url = "https://hexo-blog-netlify.oss-cn-shenzhen.aliyuncs.com/junittest"
-
-    # 构造文件名，格式: "{problem_id}_{problem_name}.java"
-    file_name = f"MainTest.java"
-
-    # 构造URL
-    url = f"{base_url}/{course_code}/{homework_id}/{problem_id}_{quote(problem_name)}/MainTest.java"
-
+    url = build_unit_test_url(course_code, homework_id, problem_id, problem_name)
 
     # 保存路径
     import utils.workdir
-    save_path = os.path.join(utils.workdir.get(), file_name)
+    from utils.file_handlers import atomic_write
+    save_path = os.path.join(utils.workdir.get(), UNIT_TEST_FILE_NAME)
 
     # 下载文件
     try:
-        response = requests.get(url, verify=False, timeout=10)
+        response = breakers.call(url, lambda: requests.get(url, verify=False, timeout=request_timeout()))
 
         if response.status_code == 200:
             # 检查是否为XML错误响应
-            if response.text.strip().startswith('<?xml') and '<Error>' in response.text:
+            if _is_oss_error_response(response):
                 print(f"[\x1b[0;33m!\x1b[0m] 服务器返回错误:")
                 if '<Message>' in response.text:
                     message = re.search(r'<Message>(.*?)</Message>', response.text)
@@ -185,8 +388,7 @@ def download_unit_test_file(course_code, problem_id, homework_id, problem_name):
                 return False, "[\x1b[0;33m!\x1b[0m]该题目暂无单元测试文件"
 
             # 正常响应，保存文件
-            with open(save_path, 'wb') as file:
-                file.write(response.content)
+            atomic_write(save_path, response.content)
             return True, save_path
         elif response.status_code == 404:
             return False, "该题目暂无单元测试文件，你可以通过Pull Requests贡献单元测试到Github中，谢谢合作"
@@ -194,4 +396,115 @@ def download_unit_test_file(course_code, problem_id, homework_id, problem_name):
             return False, f"HTTP状态码: {response.status_code}"
 
     except Exception as e:
-        return False, f"[\x1b[0;33m!\x1b[0m]下载异常: {str(e)}"
\ No newline at end of file
+        return False, f"[\x1b[0;33m!\x1b[0m]下载异常: {str(e)}"
+
+
+def unit_test_dir(homework_id, problem_id, problem_name):
+    """单个题目的单元测试文件目录: <工作目录>/unittests/<作业ID>/<题目ID>_<题目名>/"""
+    import utils.workdir
+    safe_name = re.sub(r'[\\/:*?"<>|]', '-', problem_name).strip()
+    return os.path.join(utils.workdir.get(), 'unittests', str(homework_id), f"{problem_id}_{safe_name}")
+
+
+def download_homework_unit_tests(course_code, homework_id, problems, max_workers=None):
+    """并发下载一份作业中所有题目的单元测试文件到各自的目录
+
+    使用ETag/Last-Modified进行条件请求，未变化的文件只需一次304响应；
+    下载内容保存在内容寻址存储中，目标文件通过原子替换写入，内容相同则不重写。
+
+    Args:
+        course_code: 课程代码
+        homework_id: 作业ID
+        problems: Problem列表
+        max_workers: 并发数，默认使用UNIT_TEST_DOWNLOAD_WORKERS
+
+    Returns:
+        list of (problem, status, detail)，status为
+        'new' / 'updated' / 'unchanged' / 'missing' / 'error'
+    """
+    from requests.adapters import HTTPAdapter
+    from config import CACHE_DIR, UNIT_TEST_DOWNLOAD_WORKERS
+    from utils.cache import ContentStore, JsonIndex, file_sha256
+    from utils.file_handlers import atomic_write
+
+    if not problems:
+        return []
+
+    store = ContentStore(os.path.join(CACHE_DIR, 'objects'))
+    validators = JsonIndex(os.path.join(CACHE_DIR, 'unit_tests.json'))
+    max_workers = min(max_workers or UNIT_TEST_DOWNLOAD_WORKERS, len(problems))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
+
+    def sync_one(problem):
+        problem_id = problem.id
+        problem_name = problem.name
+        url = build_unit_test_url(course_code, homework_id, problem_id, problem_name)
+        target = os.path.join(unit_test_dir(homework_id, problem_id, problem_name), UNIT_TEST_FILE_NAME)
+
+        cached = validators.get(url)
+        headers = {}
+        if cached and cached.get('sha256') in store:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        def fetch(headers):
+            return breakers.call(url, lambda: session.get(url, headers=headers, verify=False,
+                                                          timeout=request_timeout()))
+
+        response = fetch(headers)
+
+        if response.status_code == 304:
+            digest = cached['sha256']
+            if file_sha256(target) == digest:
+                return 'unchanged', target
+            # 本地文件被删除或修改过，从缓存中恢复
+            content = store.get(digest)
+            if content is not None:
+                atomic_write(target, content)
+                return 'updated', target
+            # 缓存的内容在发出请求后被删除了，不带校验头重新下载
+            response = fetch({})
+
+        if response.status_code == 404 or (response.status_code == 200 and _is_oss_error_response(response)):
+            validators.pop(url)
+            return 'missing', "暂无单元测试文件"
+
+        if response.status_code != 200:
+            return 'error', f"HTTP状态码: {response.status_code}"
+
+        digest = store.put(response.content)
+        validators.set(url, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': digest,
+        })
+
+        existing = file_sha256(target)
+        if existing == digest:
+            return 'unchanged', target
+        atomic_write(target, response.content)
+        return ('updated' if existing else 'new'), target
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(sync_one, problem): i for i, problem in enumerate(problems)}
+        completed = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                status, detail = future.result()
+            except Exception as exc:
+                status, detail = 'error', f"下载异常: {exc}"
+            results[index] = (problems[index], status, detail)
+            completed += 1
+            print(f"\r[\x1b[0;36m!\x1b[0m] 同步单元测试进度: {completed}/{len(problems)}", end="")
+
+    print("\r" + " " * 50 + "\r", end="")  # 清除进度显示
+    session.close()
+    validators.save()
+    return [results[i] for i in range(len(problems))]
@@ -0,0 +1,75 @@
+"""请求截止时间：为一组并发请求设置总的时间预算，并传递到工作线程"""
+import time
+import threading
+from contextlib import contextmanager
+
+import requests
+
+from config import REQUEST_CONNECT_TIMEOUT, REQUEST_READ_TIMEOUT
+
+_local = threading.local()
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """所在的请求组已超出时间预算"""
+
+
+def current_deadline():
+    """当前线程的截止时间（time.monotonic()时刻），没有设置时返回None"""
+    return getattr(_local, 'deadline', None)
+
+
+def remaining():
+    """距截止时间的剩余秒数，没有设置截止时间时返回None"""
+    at = current_deadline()
+    return None if at is None else at - time.monotonic()
+
+
+@contextmanager
+def deadline(seconds=None, at=None):
+    """在with块内的请求共享一个截止时间，嵌套时取较早的一个"""
+    previous = current_deadline()
+    at = at if at is not None else time.monotonic() + seconds
+    _local.deadline = at if previous is None else min(previous, at)
+    try:
+        yield _local.deadline
+    finally:
+        _local.deadline = previous
+
+
+def propagate(func):
+    """让func在其他线程（如线程池）中运行时沿用当前线程的截止时间"""
+    at = current_deadline()
+    if at is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        with deadline(at=at):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def fits(delay):
+    """等待delay秒后是否仍在截止时间之前"""
+    left = remaining()
+    return left is None or delay < left
+
+
+def timeout_shortened():
+    """request_timeout()此刻给出的超时是否因时间预算而比配置的超时短"""
+    left = remaining()
+    return left is not None and left < max(REQUEST_CONNECT_TIMEOUT, REQUEST_READ_TIMEOUT)
+
+
+def request_timeout():
+    """单个请求的(连接超时, 读取超时)，读取超时不超过剩余的时间预算
+
+    Raises:
+        DeadlineExceeded: 已经超过截止时间
+    """
+    left = remaining()
+    if left is None:
+        return REQUEST_CONNECT_TIMEOUT, REQUEST_READ_TIMEOUT
+    if left <= 0:
+        raise DeadlineExceeded("请求超出时间预算")
+    return min(REQUEST_CONNECT_TIMEOUT, left), min(REQUEST_READ_TIMEOUT, left)
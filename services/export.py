@@ -0,0 +1,73 @@
+"""整课程导出为Markdown：每道题目一个文件，内容未变化的文件不重写"""
+import os
+import time
+import threading
+
+from services.course_sync import SyncPipeline
+from services.data_service import load_problem
+from services.models import Problem
+from utils.file_handlers import AtomicWriter, safe_file_name, write_problem_markdown
+
+
+def export_course(requester, course_id, out_dir, max_workers=None):
+    """把课程中所有作业的题目导出到 out_dir/<课程ID>/<作业ID>_<作业名>/<题目ID>_<题目名>.md
+
+    作业列表、题目列表与题目详情在一个有界线程池中以流水线方式获取，每道题目加载完成后
+    立即流式渲染到临时文件，与已有文件内容相同时丢弃，否则原子替换。
+
+    Returns:
+        dict: 导出统计信息，无法获取作业列表时返回None
+    """
+    from config import SYNC_WORKERS
+
+    homeworks = requester.get_homeworks_list(course_id)
+    if not homeworks or not homeworks.get('list'):
+        print("[\x1b[0;31mx\x1b[0m] 无法获取作业列表或列表为空")
+        return None
+
+    course_dir = os.path.join(out_dir, safe_file_name(str(course_id)))
+    pipeline = SyncPipeline(max_workers or SYNC_WORKERS)
+    stats = {'homeworks': 0, 'new': 0, 'updated': 0, 'unchanged': 0}
+    stats_lock = threading.Lock()
+
+    def export_problem(homework_id, homework_dir, item):
+        problem = load_problem(requester, Problem.from_api(item), homework_id, course_id)
+        path = os.path.join(homework_dir, f"{problem.id}_{safe_file_name(problem.name)}.md")
+        with AtomicWriter(path) as out:
+            write_problem_markdown(out, problem, course_id, homework_id)
+        with stats_lock:
+            stats[out.status] += 1
+
+    def export_homework(hw):
+        homework_id = hw['homeworkId']
+        homework_dir = os.path.join(course_dir, f"{homework_id}_{safe_file_name(hw.get('homeworkName', ''))}")
+        problems = requester.get_homework_problems(homework_id, course_id)
+        if not problems:
+            raise RuntimeError("无法获取题目列表")
+        for item in problems.get('list') or []:
+            pipeline.submit(export_problem, homework_id, homework_dir, item)
+
+    started = time.monotonic()
+    for hw in homeworks['list']:
+        stats['homeworks'] += 1
+        pipeline.submit(export_homework, hw)
+
+    def on_progress(completed, total, _):
+        print(f"\r[\x1b[0;36m!\x1b[0m] 导出进度: {completed}/{total}", end="")
+
+    try:
+        pipeline.wait(on_progress)
+    except KeyboardInterrupt:
+        pipeline.shutdown(cancel=True)
+        print("\n[\x1b[0;33m!\x1b[0m] 导出已中断，已写入的文件都是完整的")
+        return None
+    pipeline.shutdown()
+    print("\r" + " " * 60 + "\r", end="")  # 清除进度显示
+
+    if pipeline.errors:
+        print(f"[\x1b[0;33m!\x1b[0m] {len(pipeline.errors)} 个任务失败:")
+        for error in pipeline.errors[:5]:
+            print(f"  {error}")
+
+    stats.update(path=course_dir, errors=len(pipeline.errors), elapsed=time.monotonic() - started)
+    return stats
@@ -0,0 +1,50 @@
+"""可选的HTTP/2传输（需要安装 httpx[http2]），所有并发的API请求复用同一个连接"""
+import requests
+
+try:
+    import httpx
+except ImportError:  # 未安装httpx时使用requests
+    httpx = None
+
+
+class Http2Transport:
+    """基于httpx.Client(http2=True)的传输，多个线程共享一个客户端
+
+    与SessionPool共享同一个Cookie容器；服务器没有协商h2时自动停用，之后的请求回到requests。
+    """
+
+    def __init__(self, headers, cookies, pool_size):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self._client = httpx.Client(http2=True, verify=False, headers=headers, cookies=cookies, limits=limits)
+        self.enabled = True
+
+    def post(self, url, headers, data, timeout):
+        """发送POST请求，网络错误转换为对应的requests异常，便于统一重试"""
+        connect_timeout, read_timeout = timeout
+        try:
+            response = self._client.post(url, headers=headers, data=data,
+                                         timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+        if response.http_version != 'HTTP/2' and self.enabled:
+            self.enabled = False
+            print(f"[\x1b[0;33m!\x1b[0m] 服务器未协商HTTP/2({response.http_version})，改用HTTP/1.1连接池")
+        return response
+
+    def close(self):
+        self._client.close()
+
+
+def create_http2_transport(headers, cookies, pool_size):
+    """创建HTTP/2传输，缺少httpx或h2依赖时返回None"""
+    if httpx is None:
+        print("[\x1b[0;33m!\x1b[0m] 未安装httpx，无法使用HTTP/2 (pip install httpx[http2])")
+        return None
+    try:
+        return Http2Transport(headers, cookies, pool_size)
+    except ImportError:
+        print("[\x1b[0;33m!\x1b[0m] 未安装h2，无法使用HTTP/2 (pip install httpx[http2])")
+        return None
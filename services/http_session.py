@@ -0,0 +1,46 @@
+"""线程安全的HTTP会话：每个线程使用自己的Session，共享Cookies与连接池"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """为每个线程创建独立的requests.Session
+
+    所有Session共享同一个Cookie容器（登录状态与CSRF令牌）和同一个HTTPAdapter，
+    连接池大小与请求并发数一致，保证并发请求都能复用已建立的keep-alive连接。
+    """
+
+    def __init__(self, headers, pool_size):
+        self.headers = dict(headers)
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = 0
+
+    def session(self):
+        """当前线程的Session，首次使用时创建"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.cookies = self.cookies
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions += 1
+        return session
+
+    def stats(self):
+        """已建立的连接数与经由连接池发送的请求数，两者之差即复用连接的请求数"""
+        opened = requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {'sessions': self._sessions, 'connections': opened, 'requests': requests_sent}
@@ -0,0 +1,218 @@
+"""本地编译与测试服务，用于在提交前快速检查代码"""
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+from config import JAVAC_PATH, JAVA_PATH, JUNIT_JAR
+
+UNIT_TEST_FILE = "MainTest.java"
+
+
+class LocalCheckResult:
+    """一次本地检查的结果"""
+
+    def __init__(self):
+        self.compiled = False
+        self.kind = None  # 'junit' / 'samples' / None
+        self.passed = 0
+        self.total = 0
+        self.message = ""
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return self.compiled and self.passed == self.total
+
+
+def list_java_files(work_dir):
+    """列出工作目录下的所有.java文件"""
+    if not os.path.isdir(work_dir):
+        return []
+    return sorted(
+        os.path.join(work_dir, f) for f in os.listdir(work_dir)
+        if f.lower().endswith(".java") and os.path.isfile(os.path.join(work_dir, f))
+    )
+
+
+def default_java_files(work_dir):
+    """默认提交的文件: 目录中的Main.java，没有则为目录下所有.java文件"""
+    main_java = os.path.join(work_dir, "Main.java")
+    return [main_java] if os.path.isfile(main_java) else list_java_files(work_dir)
+
+
+def match_problem_dirs(work_dir, problems):
+    """把工作目录下的子目录对应到题目
+
+    目录名为题目ID、以"题目ID_"（或"-"、空格）开头，或与题目名称相同（忽略大小写与标点）时对应该题目。
+
+    Returns:
+        [(problem, 目录)]，按题目顺序；没有对应目录或目录中没有.java文件的题目不包含在内
+    """
+    if not os.path.isdir(work_dir):
+        return []
+
+    def normalize(text):
+        return re.sub(r'[\W_]+', '', text).lower()
+
+    dirs = [d for d in sorted(os.listdir(work_dir)) if os.path.isdir(os.path.join(work_dir, d))]
+    matched = []
+    for problem in problems:
+        problem_id, name = str(problem.id), normalize(problem.name)
+        for d in dirs:
+            if d == problem_id or re.match(rf'{re.escape(problem_id)}[_\-\s]', d) or (name and normalize(d) == name):
+                path = os.path.join(work_dir, d)
+                if list_java_files(path):
+                    matched.append((problem, path))
+                    break
+    return matched
+
+
+def find_sample_cases(work_dir):
+    """查找工作目录中的样例文件对: xxx.in 与 xxx.out (或 xxx.ans)"""
+    cases = []
+    if not os.path.isdir(work_dir):
+        return cases
+    for name in sorted(os.listdir(work_dir)):
+        if not name.endswith('.in'):
+            continue
+        stem = os.path.join(work_dir, name[:-3])
+        for suffix in ('.out', '.ans'):
+            if os.path.isfile(stem + suffix):
+                cases.append((stem + '.in', stem + suffix))
+                break
+    return cases
+
+
+def compile_java(java_files, out_dir, classpath=None):
+    """调用javac编译Java文件
+
+    Returns:
+        (bool, str): 是否编译成功，以及编译器输出
+    """
+    command = [JAVAC_PATH, '-encoding', 'UTF-8', '-d', out_dir]
+    if classpath:
+        command += ['-cp', classpath]
+    command += java_files
+
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace')
+    except FileNotFoundError:
+        return False, f"找不到编译器: {JAVAC_PATH}"
+    return completed.returncode == 0, (completed.stdout + completed.stderr).strip()
+
+
+def _first_error_line(output):
+    for line in output.splitlines():
+        if 'error' in line.lower() or '错误' in line:
+            return line.strip()
+    return output.splitlines()[0].strip() if output else ""
+
+
+def _normalize_output(text):
+    return [line.rstrip() for line in text.strip().splitlines()]
+
+
+def run_sample_cases(out_dir, cases, timeout=10):
+    """使用样例输入运行Main，并与期望输出逐行比较（忽略行尾空白）
+
+    Returns:
+        (通过数量, 失败信息)
+    """
+    passed = 0
+    failure = ""
+    for input_path, expected_path in cases:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            stdin_data = f.read()
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = f.read()
+
+        try:
+            completed = subprocess.run([JAVA_PATH, '-cp', out_dir, 'Main'], input=stdin_data,
+                                       capture_output=True, text=True, encoding='utf-8',
+                                       errors='replace', timeout=timeout)
+        except subprocess.TimeoutExpired:
+            failure = failure or f"{os.path.basename(input_path)}: TLE"
+            continue
+        except FileNotFoundError:
+            return passed, f"找不到Java运行环境: {JAVA_PATH}"
+
+        if completed.returncode != 0:
+            failure = failure or f"{os.path.basename(input_path)}: RE"
+        elif _normalize_output(completed.stdout) == _normalize_output(expected):
+            passed += 1
+        else:
+            failure = failure or f"{os.path.basename(input_path)}: WA"
+    return passed, failure
+
+
+def run_junit_tests(out_dir, timeout=60):
+    """使用JUnit Platform Console Launcher运行MainTest
+
+    Returns:
+        (通过数量, 总数, 失败信息)
+    """
+    command = [JAVA_PATH, '-jar', JUNIT_JAR, '-cp', out_dir,
+               '--select-class', 'MainTest', '--details=summary', '--disable-banner']
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, encoding='utf-8',
+                                   errors='replace', timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return 0, 0, "JUnit运行超时"
+    except FileNotFoundError:
+        return 0, 0, f"找不到Java运行环境: {JAVA_PATH}"
+
+    output = completed.stdout + completed.stderr
+    found = re.search(r'(\d+)\s+tests found', output)
+    succeeded = re.search(r'(\d+)\s+tests successful', output)
+    total = int(found.group(1)) if found else 0
+    passed = int(succeeded.group(1)) if succeeded else 0
+
+    failure = ""
+    if passed < total:
+        match = re.search(r'MethodSource \[className = .*?, methodName = \'(\w+)\'', output)
+        failure = f"首个失败: {match.group(1)}" if match else "存在失败的测试"
+    return passed, total, failure
+
+
+def run_local_checks(work_dir):
+    """编译工作目录下的代码并运行本地测试
+
+    若存在MainTest.java且配置了JUNIT_JAR，则运行JUnit测试；
+    否则运行工作目录中的 .in/.out 样例文件。
+    """
+    result = LocalCheckResult()
+    started = time.monotonic()
+
+    java_files = list_java_files(work_dir)
+    has_unit_test = any(os.path.basename(f) == UNIT_TEST_FILE for f in java_files)
+    use_junit = has_unit_test and JUNIT_JAR and os.path.isfile(JUNIT_JAR)
+    if not use_junit:
+        # 没有JUnit环境时不编译测试类，避免缺少依赖导致编译失败
+        java_files = [f for f in java_files if os.path.basename(f) != UNIT_TEST_FILE]
+
+    if not java_files:
+        result.message = "工作目录中没有.java文件"
+        return result
+
+    with tempfile.TemporaryDirectory(prefix='oja_build_') as out_dir:
+        ok, output = compile_java(java_files, out_dir, classpath=JUNIT_JAR if use_junit else None)
+        if not ok:
+            result.message = _first_error_line(output)
+            result.elapsed = time.monotonic() - started
+            return result
+        result.compiled = True
+
+        if use_junit:
+            result.kind = 'junit'
+            result.passed, result.total, result.message = run_junit_tests(out_dir)
+        else:
+            cases = find_sample_cases(work_dir)
+            if cases:
+                result.kind = 'samples'
+                result.total = len(cases)
+                result.passed, result.message = run_sample_cases(out_dir, cases)
+
+    result.elapsed = time.monotonic() - started
+    return result
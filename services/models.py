@@ -0,0 +1,294 @@
+"""API数据模型：在解析时一次性构建，显示时只做属性访问
+
+较大的字段（题目描述、提交代码）以压缩形式保存，首次访问时才解码。
+"""
+import re
+import json
+import zlib
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from utils.formatters import records_status_color
+
+DIFFICULTY_LABELS = ("Unknown", "Noob", "Easy", "Normal", "Hard", "Demon")
+DIFFICULTY_LABELS_ZH = ("未知", "入门", "简单", "普通", "困难", "魔鬼")
+DIFFICULTY_COLORS = ("", "\x1b[0;36m", "\x1b[0;32m", "\x1b[0;33m", "\x1b[0;31m", "\x1b[0;35m")
+
+# 作业state字段: 1=未开始, 2=进行中, 3=已截止, 4=已完成
+HOMEWORK_STATES = {
+    1: ("Pending", "\x1b[0;33m"),
+    2: ("Active", "\x1b[0;36m"),
+    3: ("Closed", "\x1b[0;31m"),
+    4: ("Finished", "\x1b[0;32m"),
+}
+
+
+def _pack(text):
+    """压缩字符串，用于延迟解码的大字段"""
+    return zlib.compress(text.encode('utf-8')) if text else b''
+
+
+def _unpack(blob):
+    return zlib.decompress(blob).decode('utf-8') if blob else ''
+
+
+@dataclass(slots=True)
+class Course:
+    id: int
+    name: str
+    description: str
+
+    @classmethod
+    def from_api(cls, data):
+        return cls(data['course_id'], data.get('course_name', ''), data.get('description', ''))
+
+
+@dataclass(slots=True)
+class Homework:
+    id: int
+    name: str
+    state: int = 0
+    due_date: str = 'No Due Date'
+    problems_count: int = 0
+    has_details: bool = False
+    current_score: float = 0
+    total_score: float = 0
+    status: str = "Unknown"
+    status_color: str = ""
+    completion_text: str = "0%"
+    score_text: str = "0/0"
+
+    @classmethod
+    def from_api(cls, item, details=None, now=None):
+        """由作业列表项与作业详情构建，同时计算状态、完成度与得分文本"""
+        hw = cls(item['homeworkId'], item['homeworkName'],
+                 state=item.get('state', 0),
+                 due_date=item.get('nextDate', 'No Due Date'),
+                 problems_count=item.get('problemsCount', 0))
+        hw.status, hw.status_color = HOMEWORK_STATES.get(hw.state, ("Unknown", ""))
+
+        # 判断截止时间
+        if hw.due_date != 'No Due Date':
+            due_datetime = datetime.strptime(hw.due_date, '%Y-%m-%d %H:%M:%S')
+            if (now or datetime.now()) > due_datetime and hw.state == 2:
+                hw.status, hw.status_color = "Expired", "\x1b[0;31m"
+
+        # 从详细信息中提取完成度和得分
+        if details:
+            hw.has_details = True
+            if 'currentScore' in details and 'totalScore' in details:
+                hw.current_score = details.get('currentScore', 0)
+                hw.total_score = details.get('totalScore', 100.0)
+                hw.score_text = f"{hw.current_score}/{int(hw.total_score)}"
+
+                if 'attemptRate' in details:
+                    hw.completion_text = f"{int(details.get('attemptRate', 0))}%"
+
+                # 如果分数是满分，更新状态
+                if hw.current_score == hw.total_score and hw.total_score > 0:
+                    hw.status, hw.status_color = "Complete", "\x1b[0;32m"
+        return hw
+
+    @classmethod
+    def unavailable(cls, item):
+        """详情获取失败或超时的作业，完成度与得分显示为N/A而不是0"""
+        hw = cls.from_api(item)
+        hw.completion_text = hw.score_text = "N/A"
+        return hw
+
+    def to_dict(self):
+        """用于JSON输出的字典（不含显示用的颜色）"""
+        return {'id': self.id, 'name': self.name, 'state': self.state, 'status': self.status,
+                'due_date': self.due_date, 'problems_count': self.problems_count,
+                'current_score': self.current_score if self.has_details else None,
+                'total_score': self.total_score if self.has_details else None,
+                'completion': self.completion_text, 'score': self.score_text}
+
+
+@dataclass(slots=True)
+class SubmissionRecord:
+    record_id: int
+    result_state: str
+    score: float
+    submission_time: str
+    status: str = ""
+    status_color: str = ""
+    _code: bytes = b''
+    _code_hashes: dict = None
+
+    @classmethod
+    def from_api(cls, data, code_hashes=None):
+        """由API返回的提交记录构建，code_hashes为已知的代码哈希（可跳过重新计算）"""
+        record = cls(data.get('recordId', 'Unknown'), data.get('resultState', 'Unknown'),
+                     data.get('score', 0), data.get('submissionTime', 'Unknown'))
+        record.status, record.status_color = records_status_color(record.result_state)
+        if data.get('code'):
+            record._code = _pack(json.dumps(data['code'], ensure_ascii=False))
+        record._code_hashes = code_hashes
+        return record
+
+    def to_dict(self):
+        return {'record_id': self.record_id, 'result_state': self.result_state, 'score': self.score,
+                'submission_time': self.submission_time}
+
+    @property
+    def code(self):
+        """提交的代码，{文件名: 代码}"""
+        return json.loads(_unpack(self._code)) if self._code else {}
+
+    @property
+    def code_hashes(self):
+        """各文件代码的SHA-256，{文件名: 哈希}"""
+        if self._code_hashes is None:
+            self._code_hashes = {name: hashlib.sha256(content.encode('utf-8')).hexdigest()
+                                 for name, content in self.code.items()}
+        return self._code_hashes
+
+
+@dataclass(slots=True)
+class Problem:
+    id: int
+    name: str
+    list_name: str = ""
+    loaded: bool = True
+    has_details: bool = False
+    problem_type: str = '未知'
+    difficulty: int = 0
+    difficulty_label: str = DIFFICULTY_LABELS[0]
+    difficulty_label_zh: str = DIFFICULTY_LABELS_ZH[0]
+    difficulty_color: str = ""
+    time_limit: dict = field(default_factory=dict)
+    memory_limit: dict = field(default_factory=dict)
+    java_time_limit: int = None
+    time_limit_text: str = "Unknown"
+    io_mode: int = 0
+    public_tags: tuple = ()
+    records: list = field(default_factory=list)
+    latest_status: str = "Not Attempted"
+    latest_status_color: str = "\x1b[0;37m"  # 默认浅灰色
+    _content: bytes = b''
+
+    @classmethod
+    def from_api(cls, item, details=None, records=None):
+        """由题目列表项、题目详情与提交记录列表构建"""
+        problem = cls(item.get('problemId', 'Unknown'), item.get('problemName', 'Unknown'))
+        problem.list_name = re.sub(r'[^\w\s]', '', problem.name)
+        if details:
+            problem.set_details(details)
+        if records:
+            problem.set_records(records)
+        return problem
+
+    @classmethod
+    def placeholder(cls, item):
+        """仅由题目列表项构建，详情与提交记录稍后通过set_details/set_records填充"""
+        problem = cls.from_api(item)
+        problem.loaded = False
+        problem.difficulty_label = problem.time_limit_text = problem.latest_status = "..."
+        return problem
+
+    @classmethod
+    def unavailable(cls, item):
+        """详情与提交记录获取失败或超时的题目"""
+        problem = cls.from_api(item)
+        problem.difficulty_label = problem.time_limit_text = problem.latest_status = "N/A"
+        return problem
+
+    def set_details(self, details):
+        """解析题目详情，预先计算显示所需的派生字段"""
+        self.has_details = bool(details)
+        self.problem_type = details.get('problemType', '未知')
+        self.difficulty = details.get('difficulty', 0)
+        level = min(self.difficulty, 5)
+        self.difficulty_label = DIFFICULTY_LABELS[level]
+        self.difficulty_label_zh = DIFFICULTY_LABELS_ZH[level]
+        self.difficulty_color = DIFFICULTY_COLORS[level]
+        self.time_limit = details.get('timeLimit') or {}
+        self.memory_limit = details.get('memoryLimit') or {}
+        self.io_mode = details.get('ioMode', 0)
+        self.public_tags = tuple(details.get('publicTags') or ())
+        self._content = _pack(details['content']) if 'content' in details else b''
+
+        self.java_time_limit, self.time_limit_text = None, "Unknown"
+        if isinstance(self.time_limit, dict) and self.time_limit:
+            if 'Java' in self.time_limit:
+                self.java_time_limit = int(self.time_limit['Java'])
+                self.time_limit_text = f"{self.time_limit['Java']} ms"
+            elif 'Junit' in self.time_limit:
+                self.time_limit_text = f"{self.time_limit['Junit']} ms"
+            else:
+                first_lang = next(iter(self.time_limit))
+                self.time_limit_text = f"{self.time_limit[first_lang]} ms ({first_lang})"
+
+    def set_records(self, records):
+        """设置提交记录（最新的在前），并更新最新状态"""
+        self.records = [r if isinstance(r, SubmissionRecord) else SubmissionRecord.from_api(r) for r in records]
+        if self.records:
+            self.latest_status = self.records[0].status
+            self.latest_status_color = self.records[0].status_color
+        else:
+            self.latest_status, self.latest_status_color = "Not Attempted", "\x1b[0;37m"
+
+    def to_dict(self):
+        """用于JSON输出的字典，提交记录按最新在前排列"""
+        return {'id': self.id, 'name': self.name, 'loaded': self.loaded, 'type': self.problem_type,
+                'difficulty': self.difficulty_label, 'time_limit': self.time_limit,
+                'memory_limit': self.memory_limit, 'io_mode': self.io_mode, 'tags': list(self.public_tags),
+                'latest_status': self.latest_status, 'records': [r.to_dict() for r in self.records]}
+
+    @property
+    def content(self):
+        """题目描述，不可用时返回None"""
+        return _unpack(self._content) if self._content else None
+
+    @property
+    def io_mode_text(self):
+        return "标准输入输出" if self.io_mode == 0 else "文件输入输出"
+
+
+@dataclass(slots=True)
+class TestCaseResult:
+    title: str
+    state: str
+    time: object
+    memory: object
+    message: str
+    status_color: str = ""
+
+    @classmethod
+    def from_api(cls, data):
+        case = cls(data['title'], data['state'], data['time'], data['memory'], data['message'] or "")
+        case.status_color = records_status_color(case.state)[1]
+        return case
+
+    def to_dict(self):
+        return {'title': self.title, 'state': self.state, 'time': self.time, 'memory': self.memory,
+                'message': self.message}
+
+
+@dataclass(slots=True)
+class GradingResult:
+    record_id: int
+    problem_name: str
+    result_state: str
+    score: float
+    submission_time: str
+    status_color: str = ""
+    cases: list = field(default_factory=list)
+    all_correct: bool = False
+
+    @classmethod
+    def from_api(cls, data, record_id=None):
+        result = cls(record_id if record_id is not None else data.get('recordId', ''),
+                     data.get('problemName', ''), data['resultState'],
+                     data.get('score', 0), data.get('submissionTime', ''))
+        result.status_color = records_status_color(result.result_state)[1]
+        result.cases = [TestCaseResult.from_api(case) for case in data.get('resultList') or []]
+        result.all_correct = result.result_state == 'AC' and all(case.state == 'AC' for case in result.cases)
+        return result
+
+    def to_dict(self):
+        return {'record_id': self.record_id, 'problem_name': self.problem_name, 'result_state': self.result_state,
+                'score': self.score, 'submission_time': self.submission_time, 'all_correct': self.all_correct,
+                'cases': [case.to_dict() for case in self.cases]}
@@ -0,0 +1,111 @@
+"""客户端限速：按接口类别的令牌桶，所有线程共享"""
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+# 服务器表示过载/限流的状态码
+THROTTLE_STATUS = (429, 503)
+
+
+def parse_retry_after(value):
+    """解析Retry-After响应头（秒数或HTTP日期），无法解析时返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """令牌桶：以rate个/秒的速度补充，最多积攒burst个"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取走一个令牌，必要时等待，返回等待的秒数"""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # 暂停期间_updated在未来（暂停结束时刻），到那时才开始补充令牌
+                self._tokens = min(self.burst, self._tokens + max(0.0, now - self._updated) * self.rate)
+                self._updated = max(self._updated, now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """在接下来的seconds秒内不再发放令牌，并清空已积攒的令牌，暂停结束后按rate重新开始补充"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class RateLimiter:
+    """按接口类别（read/submit/poll）限速，遇到429/503时整类暂停
+
+    Args:
+        limits: {类别: (每秒请求数, 突发上限)}
+        backoff_base: 没有Retry-After时的初始暂停秒数，连续限流时加倍
+        backoff_max: 暂停秒数上限
+    """
+
+    def __init__(self, limits, backoff_base=1.0, backoff_max=30.0):
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self._lock = threading.Lock()
+        self._strikes = {name: 0 for name in limits}
+        self._stats = {name: {'requests': 0, 'throttled': 0, 'wait_total': 0.0} for name in limits}
+
+    def acquire(self, endpoint):
+        waited = self._buckets[endpoint].acquire()
+        with self._lock:
+            self._stats[endpoint]['requests'] += 1
+            self._stats[endpoint]['wait_total'] += waited
+
+    def throttled(self, endpoint, retry_after=None):
+        """服务器返回429/503：暂停该类请求，返回暂停的秒数"""
+        with self._lock:
+            self._strikes[endpoint] += 1
+            self._stats[endpoint]['throttled'] += 1
+            strikes = self._strikes[endpoint]
+        delay = retry_after
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (strikes - 1))
+            delay *= random.uniform(0.8, 1.2)
+        delay = min(delay, self.backoff_max)
+        self._buckets[endpoint].pause(delay)
+        return delay
+
+    def succeeded(self, endpoint):
+        with self._lock:
+            self._strikes[endpoint] = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'requests': item['requests'],
+                    'throttled': item['throttled'],
+                    'avg_wait_ms': item['wait_total'] / item['requests'] * 1000 if item['requests'] else 0.0,
+                }
+                for name, item in self._stats.items()
+            }
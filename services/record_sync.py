@@ -0,0 +1,119 @@
+"""提交记录增量同步：按recordId合并到本地存储，并汇总自上次运行以来的变化"""
+import json
+import threading
+
+from services.models import SubmissionRecord
+
+MAX_CHANGES_TO_SHOW = 10
+
+
+def _fmt_score(score):
+    return f"{score:g}" if isinstance(score, (int, float)) else score
+
+
+class RecordChange:
+    """一条新提交或成绩变化"""
+
+    __slots__ = ('problem_name', 'record_id', 'old_state', 'old_score', 'new_state', 'new_score')
+
+    def __init__(self, problem_name, record_id, old_state, old_score, new_state, new_score):
+        self.problem_name = problem_name
+        self.record_id = record_id
+        self.old_state = old_state
+        self.old_score = old_score
+        self.new_state = new_state
+        self.new_score = new_score
+
+    @property
+    def is_new(self):
+        return self.old_state is None
+
+
+class RecordSync:
+    """将recent_records的结果按recordId与本地存储比对合并
+
+    - 本地没有的记录：写入存储，计算一次代码哈希并保存
+    - 状态或分数变化的记录：更新存储，沿用已保存的代码哈希
+    - 未变化的记录：直接复用已构建的SubmissionRecord，不再解析与哈希代码
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._models = {}
+        self._pending_changes = []
+
+    def merge(self, course_id, homework_id, problem_id, raw_records, problem_name=''):
+        """合并一个题目的提交记录，返回SubmissionRecord列表（顺序与raw_records相同）"""
+        known = self.store.load_record_index(course_id, homework_id, problem_id)
+        models = []
+        rows = []
+        changes = []
+
+        for raw in raw_records:
+            if raw.get('recordId') is None:
+                models.append(SubmissionRecord.from_api(raw))
+                continue
+
+            record_id = str(raw['recordId'])
+            state, score = raw.get('resultState'), raw.get('score')
+            previous = known.get(record_id)
+
+            with self._lock:
+                model = self._models.get(record_id)
+
+            if previous is not None and previous[:2] == (state, score):
+                if model is None or (model.result_state, model.score) != (state, score):
+                    model = SubmissionRecord.from_api(raw, code_hashes=previous[2])
+                    with self._lock:
+                        self._models[record_id] = model
+                models.append(model)
+                continue
+
+            # 新记录或状态变化的记录，代码本身不会变化，可沿用已保存的哈希
+            model = SubmissionRecord.from_api(raw, code_hashes=previous[2] if previous else None)
+            with self._lock:
+                self._models[record_id] = model
+            models.append(model)
+
+            rows.append((record_id, str(course_id), str(homework_id), str(problem_id), state, score,
+                         raw.get('submissionTime'), json.dumps(raw, ensure_ascii=False),
+                         json.dumps(model.code_hashes)))
+            if previous is None:
+                changes.append(RecordChange(problem_name, record_id, None, None, state, score))
+            else:
+                changes.append(RecordChange(problem_name, record_id, previous[0], previous[1], state, score))
+
+        if rows:
+            self.store.upsert_records(rows)
+        if changes:
+            with self._lock:
+                self._pending_changes.extend(changes)
+        return models
+
+    def pop_changes(self):
+        """取出尚未报告的变化"""
+        with self._lock:
+            changes, self._pending_changes = self._pending_changes, []
+        return changes
+
+
+def report_record_changes(store):
+    """打印自上次运行（或上次报告）以来的新提交与成绩变化"""
+    if store is None:
+        return
+    changes = store.record_sync.pop_changes()
+    if not changes:
+        return
+
+    new_count = sum(1 for change in changes if change.is_new)
+    print(f"[\x1b[0;32m+\x1b[0m] 提交记录变化: {new_count} 条新记录, {len(changes) - new_count} 条结果更新")
+    for change in changes[:MAX_CHANGES_TO_SHOW]:
+        if change.is_new:
+            print(f"  新记录 {change.problem_name} #{change.record_id}: {change.new_state} {_fmt_score(change.new_score)}")
+        else:
+            print(f"  结果更新 {change.problem_name} #{change.record_id}: "
+                  f"{change.old_state} {_fmt_score(change.old_score)} -> "
+                  f"{change.new_state} {_fmt_score(change.new_score)}")
+    if len(changes) > MAX_CHANGES_TO_SHOW:
+        print(f"  ... 另有 {len(changes) - MAX_CHANGES_TO_SHOW} 条")
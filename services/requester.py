@@ -2,40 +2,197 @@ import requests
 import os
 import re
 import json
+import time
+import hashlib
 from urllib.parse import urlparse
 
-from config import COOKIES_FILE
+import urllib3
+
+from config import COOKIES_FILE, MAX_CONCURRENT_REQUESTS, INTERACTIVE_RESERVED_REQUESTS, RATE_LIMITS, \
+    RATE_LIMIT_MAX_WAITS, RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX, RETRY_BUDGET, HTTP2_TRANSPORT
+from services.scheduler import PriorityScheduler, Ticket, current_priority
+from services.ratelimit import RateLimiter, THROTTLE_STATUS, parse_retry_after
+from services.retry import RetryBudget, RETRY_STATUS, IDEMPOTENT_ENDPOINTS, backoff_delay
+from services.deadline import request_timeout, remaining, DeadlineExceeded, fits as fits_deadline
+from services.singleflight import SingleFlight, form_key
+from services.http_session import SessionPool
+from services.breaker import breakers, CircuitOpenError
+from utils.file_handlers import read_cookies_file
+
+# 学校的证书链在部分环境中无法验证，请求都使用verify=False，禁用对应的警告
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def _code_hashes(files):
+    """{文件名: 代码} -> {文件名: SHA-256}"""
+    return {name: hashlib.sha256(content.encode('utf-8')).hexdigest() for name, content in files.items()}
+
+
+# 通用请求头
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
+    'Accept': '*/*',
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+    'Sec-Ch-Ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'Sec-Ch-Ua-Platform': '"Windows"',
+    'Priority': 'u=1, i'
+}
 
 class OJRequester:
-    def __init__(self):
+    def __init__(self, http2=None):
         self.base_url = "https://oj.cse.sustech.edu.cn"
         self.base_domain = urlparse(self.base_url).netloc
-        self.session = requests.Session()
-
-        # 设置通用请求头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9',
-            'Sec-Ch-Ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"',
-            'Priority': 'u=1, i'
-        })
+        self.use_http2 = HTTP2_TRANSPORT if http2 is None else http2
+        self._init_transport()
         self.csrf_token = None
         self.cookies_file = COOKIES_FILE
+        self.store = None  # 可选的本地存储(LocalStore)，获取到的数据会同步写入
+        # 所有API请求按优先级排队：用户操作 > 普通 > 后台预加载
+        self.scheduler = PriorityScheduler(MAX_CONCURRENT_REQUESTS, reserved=INTERACTIVE_RESERVED_REQUESTS)
+        # 所有线程共享的客户端限速，避免在服务器繁忙时突发大量请求
+        self.limiter = RateLimiter(RATE_LIMITS)
+        self.retry_budget = RetryBudget(RETRY_BUDGET)
+        # 合并同时进行的相同请求
+        self.flights = SingleFlight()
+        # 可选，接收重试、限流等提示的函数on_notice(message, error)；未设置时直接打印。
+        # 实时更新的表格（如oja submit-all的汇总表）显示期间用它把提示显示在表格下方
+        self.on_notice = None
+
+    def _init_transport(self):
+        # 重新登录时替换传输，先关闭旧的HTTP/2客户端及其连接池
+        if getattr(self, 'http2', None) is not None:
+            self.http2.close()
+        # 每个线程使用自己的Session，共享Cookies与连接池
+        self.http = SessionPool(DEFAULT_HEADERS, pool_size=MAX_CONCURRENT_REQUESTS)
+        # 可选的HTTP/2传输，与Session共享Cookies，API请求都复用同一个连接
+        self.http2 = None
+        if self.use_http2:
+            from services.http2 import create_http2_transport
+            self.http2 = create_http2_transport(DEFAULT_HEADERS, self.http.cookies, MAX_CONCURRENT_REQUESTS)
+
+    @property
+    def session(self):
+        """当前线程的requests.Session"""
+        return self.http.session()
+
+    def _api_post(self, url, headers, data, endpoint='read'):
+        """所有OJ API请求的统一出口
+
+        幂等的请求按URL与表单数据合并：相同的请求正在进行时，直接等待并共享其响应（见services.singleflight），
+        等待者的优先级高于进行中的请求时会提高其优先级。
+        """
+        ticket = Ticket(current_priority())
+        if not IDEMPOTENT_ENDPOINTS[endpoint]:
+            return self._dispatch(url, headers, data, endpoint, ticket)
+
+        left = remaining()
+        try:
+            return self.flights.do(form_key(url, data),
+                                   lambda: self._dispatch(url, headers, data, endpoint, ticket),
+                                   context=ticket,
+                                   on_join=lambda leader: self.scheduler.boost(leader, ticket.priority),
+                                   wait_timeout=None if left is None else max(0, left))
+        except TimeoutError:
+            raise DeadlineExceeded("请求超出时间预算")
+
+    def _dispatch(self, url, headers, data, endpoint, ticket):
+        """发送一个API请求
+
+        请求先按ticket的优先级排队（见services.scheduler），再从endpoint类别(read/submit/poll)
+        的令牌桶中取令牌；服务器返回429/503时整类暂停，并在暂停结束后重发。
+        幂等的请求遇到连接错误或5xx时按指数退避重试，受会话级重试预算限制（见services.retry）。
+        """
+        idempotent = IDEMPOTENT_ENDPOINTS[endpoint]
+        throttled = retries = 0
+        with self.scheduler.slot(ticket):
+            while True:
+                self.limiter.acquire(endpoint)
+                # 超时不超过所在请求组的剩余时间预算（见services.deadline），已超出时直接失败
+                timeout = request_timeout()
+                try:
+                    # 主机或接口持续故障时熔断器直接失败，不再等待超时（见services.breaker）
+                    response = breakers.call(url, lambda: self._send(url, headers, data, timeout), per_endpoint=True)
+                except CircuitOpenError:
+                    raise
+                except requests.RequestException as e:
+                    delay = backoff_delay(retries, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX)
+                    if not self._may_retry(idempotent, retries, delay):
+                        raise
+                    self._notice(f"请求出错({type(e).__name__})，{delay:.1f}秒后重试...")
+                    retries += 1
+                    time.sleep(delay)
+                    continue
+
+                if response.status_code in THROTTLE_STATUS:
+                    delay = self.limiter.throttled(endpoint, parse_retry_after(response.headers.get('Retry-After')))
+                    # 429表示请求未被处理，可以安全重发；提交请求遇到503时可能已被处理，不重发
+                    if (throttled == RATE_LIMIT_MAX_WAITS or not fits_deadline(delay)
+                            or (not idempotent and response.status_code != 429)):
+                        return response
+                    self._notice(f"服务器繁忙(HTTP {response.status_code})，{delay:.1f}秒后重试...")
+                    throttled += 1
+                    continue
+
+                if response.status_code in RETRY_STATUS:
+                    delay = backoff_delay(retries, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX)
+                    if self._may_retry(idempotent, retries, delay):
+                        self._notice(f"服务器错误(HTTP {response.status_code})，{delay:.1f}秒后重试...")
+                        retries += 1
+                        time.sleep(delay)
+                        continue
+
+                self.limiter.succeeded(endpoint)
+                if response.status_code < 500:
+                    self.retry_budget.succeeded()
+                return response
+
+    def _notice(self, message, error=False):
+        """显示请求过程中的提示（可能在工作线程中调用），error为True时按错误显示"""
+        if self.on_notice is not None:
+            self.on_notice(message, error)
+        elif error:
+            print(f"[\x1b[0;31mx\x1b[0m] {message}")
+        else:
+            print(f"[\x1b[0;33m!\x1b[0m] {message}")
+
+    def _send(self, url, headers, data, timeout):
+        if self.http2 is not None and self.http2.enabled:
+            return self.http2.post(url, headers, data, timeout)
+        return self.session.post(url, headers=headers, data=data, verify=False, timeout=timeout)
+
+    def _may_retry(self, idempotent, retries, delay):
+        """幂等、未超过重试次数、等待后不超过截止时间且重试额度充足时才重试"""
+        return (idempotent and retries < RETRY_MAX_ATTEMPTS and fits_deadline(delay)
+                and self.retry_budget.spend())
+
+    def request_stats(self):
+        """请求层的统计信息"""
+        return {'scheduler': self.scheduler.stats(), 'rate_limit': self.limiter.stats(),
+                'retry': self.retry_budget.stats(), 'coalescing': self.flights.stats(),
+                'connections': self.http.stats(),
+                'transport': 'HTTP/2' if self.http2 is not None and self.http2.enabled else 'HTTP/1.1'}
+
+    def _mirror(self, method, *args):
+        """将获取到的数据写入本地存储，写入失败不影响正常使用"""
+        if self.store is None:
+            return
+        try:
+            getattr(self.store, method)(*args)
+        except Exception as e:
+            self._notice(f"写入本地存储失败: {e}")
 
     def cas_login(self, username, password):
         print("[\x1b[0;36m!\x1b[0m] 测试OAuth授权URL...")
 
         # 步骤1: 首先访问OJ主页，获取初始cookie
-        self.session.get(self.base_url, verify=False)
+        self.session.get(self.base_url, verify=False, timeout=request_timeout())
 
         # 步骤2: 直接访问CAS的OAuth授权URL
         cas_authorize_url = "https://cas.sustech.edu.cn/cas/oauth2.0/authorize?response_type=code&client_id=FTdwYshmid34mMtRURbH5Naa6eclg4s6BVP7&redirect_uri=https://oj.cse.sustech.edu.cn/api/login/cas/"
 
         self.session.headers.update({'Referer': self.base_url})
-        response = self.session.get(cas_authorize_url, allow_redirects=False, verify=False)
+        response = self.session.get(cas_authorize_url, allow_redirects=False, verify=False, timeout=request_timeout())
 
         if response.status_code != 302 or 'Location' not in response.headers:
             print("[\x1b[0;31mx\x1b[0m] 授权URL未返回预期的302重定向")
@@ -44,7 +201,7 @@ class OJRequester:
         # 步骤3: 跟随重定向到CAS登录页面
         login_url = response.headers['Location']
         print("[\x1b[0;36m!\x1b[0m] CAS登录中...")
-        response = self.session.get(login_url, verify=False)
+        response = self.session.get(login_url, verify=False, timeout=request_timeout())
 
         if response.status_code != 200:
             print("[\x1b[0;31mx\x1b[0m] 访问登录页面失败")
@@ -69,7 +226,8 @@ class OJRequester:
         }
 
         self.session.headers.update({'Referer': login_url})
-        response = self.session.post(login_url, data=login_data, allow_redirects=False, verify=False)
+        response = self.session.post(login_url, data=login_data, allow_redirects=False, verify=False,
+                                     timeout=request_timeout())
 
         if response.status_code != 302 or 'Location' not in response.headers:
             print("[\x1b[0;31mx\x1b[0m] 登录请求失败")
@@ -87,7 +245,7 @@ class OJRequester:
 
         while redirect_count < max_redirects:
             print(f"[\x1b[0;36m!\x1b[0m] 跟随重定向{redirect_count + 1}...")
-            response = self.session.get(current_url, allow_redirects=False, verify=False)
+            response = self.session.get(current_url, allow_redirects=False, verify=False, timeout=request_timeout())
 
             # 检查是否有更多重定向
             if response.status_code in (301, 302, 303, 307) and 'Location' in response.headers:
@@ -97,7 +255,7 @@ class OJRequester:
                 # 如果重定向回到OJ系统，则完成最后跳转
                 if self.base_url in current_url:
                     print(f"[\x1b[0;36m!\x1b[0m] 跟随重定向{redirect_count + 1}，重定向到OJ系统...")
-                    response = self.session.get(current_url, allow_redirects=True, verify=False)
+                    response = self.session.get(current_url, allow_redirects=True, verify=False, timeout=request_timeout())
                     break
             else:
                 # 没有更多的重定向
@@ -121,7 +279,8 @@ class OJRequester:
             'Sec-Fetch-Site': 'same-origin'
         }
         print(f"[\x1b[0;36m!\x1b[0m] 获取CSRF令牌中...")
-        response = self.session.get(f"{self.base_url}/api/cors/", headers=headers, verify=False)
+        response = self.session.get(f"{self.base_url}/api/cors/", headers=headers, verify=False,
+                                    timeout=request_timeout())
 
         if response.status_code != 200:
             print("[\x1b[0;31mx\x1b[0m] 访问cors API失败")
@@ -168,23 +327,16 @@ class OJRequester:
             print(f"[\x1b[0;31mx\x1b[0m] Cookies保存失败: {e}")
             return False
 
-    def load_cookies(self, filename=None):
-        """从文本文件加载必要的cookies"""
+    def load_cookies(self, filename=None, stored=None):
+        """从文本文件加载必要的cookies，stored为已经读取好的文件内容（见read_cookies_file）"""
         filepath = filename or self.cookies_file
 
-        if not os.path.exists(filepath):
-            print(f"[\x1b[0;33m!\x1b[0m] 没有找到保存的Cookies文件")
-            return False
-
         try:
-            stored = {}
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#') or '=' not in line:
-                        continue
-                    key, value = line.split('=', 1)
-                    stored[key.strip()] = value.strip()
+            if stored is None:
+                stored = read_cookies_file(filepath)
+            if stored is None:
+                print(f"[\x1b[0;33m!\x1b[0m] 没有找到保存的Cookies文件")
+                return False
 
             jcoder_id = stored.get('JCoderID')
             csrf_token = stored.get('csrftoken')
@@ -210,16 +362,7 @@ class OJRequester:
 
     def clear_session(self):
         """Clear all cookies and session data to start fresh"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9',
-            'Sec-Ch-Ua': '"Not(A:Brand";v="99", "Google Chrome";v="133", "Chromium";v="133"',
-            'Sec-Ch-Ua-Mobile': '?0',
-            'Sec-Ch-Ua-Platform': '"Windows"',
-            'Priority': 'u=1, i'
-        })
+        self._init_transport()
         self.csrf_token = None
 
     def get_my_courses(self):
@@ -250,11 +393,12 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                self._mirror('save_courses', result)
                 if 'list' in result and result['list']:
                     return result
                 else:
@@ -296,11 +440,12 @@ class OJRequester:
         print(f"\n[\x1b[0;36m!\x1b[0m] 获取课程{course_id}的作业列表...")
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                self._mirror('save_homeworks_list', course_id, result)
                 if 'list' in result and result['list']:
                     return result
                 else:
@@ -339,11 +484,12 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                self._mirror('save_homework_info', course_id, homework_id, result)
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -378,11 +524,12 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                self._mirror('save_homework_problems', course_id, homework_id, result)
                 if 'list' in result and result['list']:
                     return result
                 else:
@@ -422,11 +569,12 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                self._mirror('save_problem_info', course_id, homework_id, problem_id, result)
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -462,11 +610,12 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data)
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                # 提交记录由RecordSync按recordId增量合并到本地存储
                 return result
             except json.JSONDecodeError:
                 print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
@@ -475,8 +624,75 @@ class OJRequester:
             print(f"[\x1b[0;31mx\x1b[0m] 请求失败，HTTP状态码: {response.status_code}")
             return False
 
-    def submit_homework(self, homework_id, problem_id, course_id, file_paths):
-        """提交Java作业到OJ平台"""
+    def _find_submitted_record(self, problem_id, homework_id, course_id, files_dict, known_record_ids):
+        """在最近的提交记录中查找代码与files_dict完全相同、且不在known_record_ids中的新记录"""
+        records = self.get_problem_submission_records(problem_id, homework_id, course_id)
+        if not records:
+            return None
+        expected = _code_hashes(files_dict)
+        for record in records.get('list') or []:
+            if record.get('recordId') in known_record_ids:
+                continue
+            if _code_hashes(record.get('code') or {}) == expected:
+                return record
+        return None
+
+    def _submit_once(self, url, headers, data, problem_key, files_dict, known_record_ids):
+        """发送提交请求，结果不明（连接错误或5xx）时先确认服务器是否已收到，再决定是否重发
+
+        Returns:
+            服务器的响应；确认已提交时返回{'recordId': ...}；请求失败返回None
+        """
+        unknown = False  # 无法确认服务器是否已收到之前的提交
+        for attempt in range(RETRY_MAX_ATTEMPTS + 1):
+            error = None
+            try:
+                response = self._api_post(url, headers=headers, data=data, endpoint='submit')
+                if response.status_code < 500:
+                    return response
+            except CircuitOpenError as e:
+                # 熔断时请求没有发出，也不消耗重试额度；之前的尝试仍可能已被收到
+                print(f"[\x1b[0;31mx\x1b[0m] 提交请求失败: {e}")
+                if attempt > 0:
+                    print("[\x1b[0;33m!\x1b[0m] 提交可能已被服务器收到，请先查看提交记录再决定是否重新提交")
+                return None
+            except requests.RequestException as e:
+                response, error = None, e
+
+            # 不知道已有哪些提交记录时无法判断是否已提交，不重发
+            if known_record_ids is None or attempt == RETRY_MAX_ATTEMPTS or not self.retry_budget.spend():
+                break
+
+            print(f"[\x1b[0;33m!\x1b[0m] 提交结果不明，检查是否已提交...")
+            try:
+                record = self._find_submitted_record(*problem_key, files_dict, set(known_record_ids))
+            except requests.RequestException as e:
+                # 无法确认时不重发，避免重复提交
+                print(f"[\x1b[0;31mx\x1b[0m] 无法获取提交记录({type(e).__name__})，不再重新提交")
+                unknown = True
+                break
+            if record:
+                print(f"[\x1b[0;32m+\x1b[0m] 服务器已收到该提交！记录ID: {record.get('recordId')}")
+                return {'recordId': record.get('recordId')}
+
+            delay = backoff_delay(attempt, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX)
+            print(f"[\x1b[0;33m!\x1b[0m] 未找到该提交，{delay:.1f}秒后重新提交...")
+            time.sleep(delay)
+
+        if error is not None or unknown:
+            if error is not None:
+                print(f"[\x1b[0;31mx\x1b[0m] 提交请求失败: {error}")
+            else:
+                print(f"[\x1b[0;31mx\x1b[0m] 提交请求失败，HTTP状态码: {response.status_code}")
+            print("[\x1b[0;33m!\x1b[0m] 提交可能已被服务器收到，请先查看提交记录再决定是否重新提交")
+            return None
+        return response
+
+    def submit_homework(self, homework_id, problem_id, course_id, file_paths, known_record_ids=None):
+        """提交Java作业到OJ平台
+
+        known_record_ids为提交前已有的提交记录ID，提供时请求失败会先在提交记录中确认是否已提交再重发
+        """
         # 检查CSRF令牌是否存在
         if not self.csrf_token:
             print("[\x1b[0;31mx\x1b[0m] 没有CSRF令牌，无法发送提交请求")
@@ -534,7 +750,10 @@ class OJRequester:
 
         # 发送请求
         print(f"[\x1b[0;36m!\x1b[0m] 正在提交Java作业...")
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._submit_once(url, headers, data, (problem_id, homework_id, course_id),
+                                     files_dict, known_record_ids)
+        if response is None or isinstance(response, dict):
+            return response
 
         if response.status_code == 200:
             try:
@@ -589,15 +808,16 @@ class OJRequester:
         }
 
         # 发送请求
-        response = self.session.post(url, headers=headers, data=data, verify=False)
+        response = self._api_post(url, headers=headers, data=data, endpoint='poll')
 
         if response.status_code == 200:
             try:
                 result = response.json()
+                self._mirror('save_result', record_id, course_id, homework_id, result)
                 return result
             except json.JSONDecodeError:
-                print("[\x1b[0;31mx\x1b[0m] 响应不是JSON格式")
+                self._notice("响应不是JSON格式", error=True)
                 return None
         else:
-            print(f"[\x1b[0;31mx\x1b[0m] 请求失败，HTTP状态码: {response.status_code}")
+            self._notice(f"请求失败，HTTP状态码: {response.status_code}", error=True)
             return None
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""请求重试策略：指数退避 + 抖动，会话级重试预算"""
+import random
+import threading
+
+# 可以重试的临时性错误状态码（429/503由限速器处理）
+RETRY_STATUS = (500, 502, 504)
+
+# 各接口类别是否幂等：幂等的请求可以直接重发，提交作业不能盲目重发
+IDEMPOTENT_ENDPOINTS = {
+    'read': True,
+    'poll': True,
+    'submit': False,
+}
+
+
+def backoff_delay(attempt, base, cap):
+    """第attempt次（从0开始）重试前的等待秒数：指数退避，在[0, 上限]内随机取值"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RetryBudget:
+    """会话级重试预算
+
+    每次重试消耗1个额度，每次成功的请求回补refill个，最多size个。服务器持续故障时
+    额度很快耗尽，之后的请求直接失败，不会因重试把请求量放大数倍。
+    """
+
+    def __init__(self, size, refill=0.1):
+        self.size = size
+        self.refill = refill
+        self._tokens = float(size)
+        self._retries = 0
+        self._denied = 0
+        self._lock = threading.Lock()
+
+    def spend(self):
+        """尝试消耗一次重试额度，额度不足时返回False"""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._retries += 1
+                return True
+            self._denied += 1
+            return False
+
+    def succeeded(self):
+        with self._lock:
+            self._tokens = min(self.size, self._tokens + self.refill)
+
+    def stats(self):
+        with self._lock:
+            return {'retries': self._retries, 'denied': self._denied, 'remaining': int(self._tokens)}
@@ -0,0 +1,133 @@
+"""请求优先级调度：用户操作的请求优先于后台预加载"""
+import time
+import threading
+from contextlib import contextmanager
+
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+PRIORITY_NAMES = ('interactive', 'normal', 'background')
+
+_local = threading.local()
+
+
+def current_priority():
+    """当前线程的请求优先级，主线程默认为INTERACTIVE，其他线程默认为NORMAL"""
+    priority = getattr(_local, 'priority', None)
+    if priority is not None:
+        return priority
+    return INTERACTIVE if threading.current_thread() is threading.main_thread() else NORMAL
+
+
+@contextmanager
+def request_priority(priority):
+    """在with块内以指定优先级发送请求"""
+    previous = getattr(_local, 'priority', None)
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+class Ticket:
+    """一个排队中的请求"""
+    __slots__ = ('priority', 'queued')
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.queued = False
+
+
+class PriorityScheduler:
+    """请求准入控制
+
+    最多max_concurrent个请求同时进行；有更高优先级的请求在等待时，低优先级请求不会被放行；
+    后台请求最多只能占用 max_concurrent - reserved 个名额，为用户操作保留余量。
+    """
+
+    def __init__(self, max_concurrent, reserved=1):
+        self.max_concurrent = max_concurrent
+        self.background_limit = max(1, max_concurrent - reserved)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._active_background = 0
+        self._waiting = [0, 0, 0]
+        self._max_waiting = [0, 0, 0]
+        self._count = [0, 0, 0]
+        self._wait_total = [0.0, 0.0, 0.0]
+        self._wait_max = [0.0, 0.0, 0.0]
+
+    def _can_run(self, priority):
+        if self._active >= self.max_concurrent:
+            return False
+        if any(self._waiting[higher] for higher in range(priority)):
+            return False
+        if priority == BACKGROUND and self._active_background >= self.background_limit:
+            return False
+        return True
+
+    def acquire(self, ticket):
+        """等待直到ticket被放行，等待期间ticket的优先级可能被boost提高"""
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[ticket.priority] += 1
+            self._max_waiting[ticket.priority] = max(self._max_waiting[ticket.priority],
+                                                     self._waiting[ticket.priority])
+            ticket.queued = True
+            try:
+                while not self._can_run(ticket.priority):
+                    self._cond.wait()
+            finally:
+                ticket.queued = False
+                self._waiting[ticket.priority] -= 1
+            priority = ticket.priority
+            self._active += 1
+            if priority == BACKGROUND:
+                self._active_background += 1
+
+            waited = time.monotonic() - started
+            self._count[priority] += 1
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+    def release(self, ticket):
+        with self._cond:
+            self._active -= 1
+            if ticket.priority == BACKGROUND:
+                self._active_background -= 1
+            self._cond.notify_all()
+
+    def boost(self, ticket, priority):
+        """把仍在排队的ticket提高到priority（例如用户操作在等待同一个后台请求的结果）"""
+        with self._cond:
+            if not ticket.queued or priority >= ticket.priority:
+                return
+            self._waiting[ticket.priority] -= 1
+            self._waiting[priority] += 1
+            ticket.priority = priority
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, ticket=None):
+        """占用一个请求名额，默认使用当前线程的优先级"""
+        ticket = ticket or Ticket(current_priority())
+        self.acquire(ticket)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def stats(self):
+        """各优先级的请求数、当前/最大排队数与等待时间（毫秒）"""
+        with self._cond:
+            return {
+                PRIORITY_NAMES[p]: {
+                    'requests': self._count[p],
+                    'queued': self._waiting[p],
+                    'max_queued': self._max_waiting[p],
+                    'avg_wait_ms': self._wait_total[p] / self._count[p] * 1000 if self._count[p] else 0.0,
+                    'max_wait_ms': self._wait_max[p] * 1000,
+                }
+                for p in (INTERACTIVE, NORMAL, BACKGROUND)
+            }
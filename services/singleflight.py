@@ -0,0 +1,75 @@
+"""请求合并：同时发出的相同请求只发送一次，其余调用者等待并共享结果"""
+import threading
+
+
+def form_key(url, data):
+    """由URL与表单数据构造合并用的键，参数顺序与值的类型（如 1 与 '1'）不影响结果"""
+    return url, tuple(sorted((str(key), str(value)) for key, value in (data or {}).items()))
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'context')
+
+    def __init__(self, context):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.context = context
+
+
+class SingleFlight:
+    """按键合并进行中的调用
+
+    第一个调用者执行fn，之后到达的相同键的调用者不再执行，等待第一个调用完成并得到同样的结果
+    （或同样的异常）。调用完成后键即被移除，之后的调用会重新执行。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._total = 0
+        self._coalesced = 0
+
+    def do(self, key, fn, context=None, on_join=None, wait_timeout=None):
+        """执行或加入key对应的调用
+
+        Args:
+            context: 由执行者提供，传给之后加入者的on_join
+            on_join: 加入者在等待前调用on_join(执行者的context)，例如提高执行者的优先级
+            wait_timeout: 加入者最多等待的秒数，超时抛出TimeoutError
+
+        Raises:
+            TimeoutError: 加入者等待超时
+        """
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(context)
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            if on_join is not None:
+                on_join(call.context)
+            if not call.done.wait(wait_timeout):
+                raise TimeoutError("等待合并的请求超时")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self._total, 'coalesced': self._coalesced, 'in_flight': len(self._calls)}
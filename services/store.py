@@ -0,0 +1,475 @@
+"""本地SQLite存储：镜像OJRequester获取到的所有数据，并支持离线浏览"""
+import json
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    course_id   TEXT PRIMARY KEY,
+    name        TEXT,
+    position    INTEGER,
+    payload     TEXT NOT NULL,
+    fetched_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS homeworks (
+    course_id       TEXT NOT NULL,
+    homework_id     TEXT NOT NULL,
+    name            TEXT,
+    state           INTEGER,
+    due_date        TEXT,
+    list_payload    TEXT,
+    details_payload TEXT,
+    fetched_at      REAL NOT NULL,
+    PRIMARY KEY (course_id, homework_id)
+);
+CREATE INDEX IF NOT EXISTS idx_homeworks_homework ON homeworks (homework_id);
+CREATE INDEX IF NOT EXISTS idx_homeworks_due_date ON homeworks (due_date);
+CREATE TABLE IF NOT EXISTS problems (
+    course_id     TEXT NOT NULL,
+    homework_id   TEXT NOT NULL,
+    problem_id    TEXT NOT NULL,
+    name          TEXT,
+    position      INTEGER,
+    list_payload  TEXT,
+    info_payload  TEXT,
+    fetched_at    REAL NOT NULL,
+    PRIMARY KEY (course_id, homework_id, problem_id)
+);
+CREATE INDEX IF NOT EXISTS idx_problems_problem ON problems (problem_id);
+CREATE TABLE IF NOT EXISTS records (
+    record_id        TEXT PRIMARY KEY,
+    course_id        TEXT NOT NULL,
+    homework_id      TEXT NOT NULL,
+    problem_id       TEXT NOT NULL,
+    result_state     TEXT,
+    score            REAL,
+    submission_time  TEXT,
+    payload          TEXT NOT NULL,
+    code_hashes      TEXT,
+    fetched_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_problem ON records (course_id, homework_id, problem_id);
+CREATE INDEX IF NOT EXISTS idx_records_state ON records (result_state);
+CREATE TABLE IF NOT EXISTS results (
+    record_id     TEXT PRIMARY KEY,
+    course_id     TEXT NOT NULL,
+    homework_id   TEXT NOT NULL,
+    result_state  TEXT,
+    score         REAL,
+    payload       TEXT NOT NULL,
+    fetched_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_homework ON results (course_id, homework_id);
+CREATE INDEX IF NOT EXISTS idx_results_state ON results (result_state);
+CREATE TABLE IF NOT EXISTS sync_tasks (
+    course_id  TEXT NOT NULL,
+    task_key   TEXT NOT NULL,
+    PRIMARY KEY (course_id, task_key)
+);
+CREATE TABLE IF NOT EXISTS sync_runs (
+    course_id    TEXT PRIMARY KEY,
+    started_at   REAL NOT NULL,
+    finished_at  REAL
+);
+"""
+
+
+# 题目全文索引（FTS5，trigram分词可匹配中文子串），rowid与problems表的rowid相同
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE problem_search USING fts5(
+    course_id UNINDEXED, homework_id UNINDEXED, problem_id UNINDEXED,
+    name, tags, content, tokenize = 'trigram'
+)
+"""
+
+# 由problems表生成索引行，WHERE条件由调用者追加
+SEARCH_INDEX_SQL = """
+INSERT OR REPLACE INTO problem_search (rowid, course_id, homework_id, problem_id, name, tags, content)
+SELECT rowid, course_id, homework_id, problem_id, coalesce(name, ''),
+       coalesce((SELECT group_concat(value, ', ') FROM json_each(info_payload, '$.publicTags')), ''),
+       coalesce(json_extract(info_payload, '$.content'), '')
+FROM problems
+"""
+
+# 短于3个字符的词无法使用trigram索引，按子串扫描
+SEARCH_MIN_TERM = 3
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _snippet(content, terms, width=30):
+    """截取content中第一个匹配词附近的一段文本"""
+    text = ' '.join(content.split())
+    lowered = text.lower()
+    hits = [i for i in (lowered.find(term) for term in terms) if i >= 0]
+    if not hits:
+        return text[:width * 2] + ('…' if len(text) > width * 2 else '')
+    start = max(0, min(hits) - width)
+    end = min(len(text), min(hits) + width)
+    return ('…' if start > 0 else '') + text[start:end] + ('…' if end < len(text) else '')
+
+
+class LocalStore:
+    """线程安全的SQLite本地存储，所有ID统一以字符串保存"""
+
+    def __init__(self, path):
+        import os
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.searchable = False
+        self._migrate()
+        self._record_sync = None
+
+    def _migrate(self):
+        """为旧版本创建的数据库补充新增的列与全文索引"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(records)")}
+        if 'code_hashes' not in columns:
+            self._conn.execute("ALTER TABLE records ADD COLUMN code_hashes TEXT")
+
+        if self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'problem_search'").fetchone():
+            self.searchable = True
+            return
+        try:
+            self._conn.execute(SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return  # SQLite没有FTS5或trigram分词器，搜索退化为扫描
+        self.searchable = True
+        # 为已保存的题目建立索引，之后随每次保存增量更新
+        self._conn.execute(SEARCH_INDEX_SQL)
+
+    def _index_problems(self, course_id, homework_id, problem_id=None):
+        """更新一个作业（或其中一道题目）在全文索引中的行"""
+        if not self.searchable:
+            return
+        sql = SEARCH_INDEX_SQL + " WHERE course_id = ? AND homework_id = ?"
+        params = (str(course_id), str(homework_id))
+        if problem_id is not None:
+            sql += " AND problem_id = ?"
+            params += (str(problem_id),)
+        self._execute(sql, params)
+
+    @property
+    def record_sync(self):
+        """提交记录增量同步器(RecordSync)"""
+        if self._record_sync is None:
+            from services.record_sync import RecordSync
+            self._record_sync = RecordSync(self)
+        return self._record_sync
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _executemany(self, sql, rows):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---- 写入 ----
+
+    def save_courses(self, courses):
+        now = time.time()
+        self._executemany(
+            "INSERT OR REPLACE INTO courses (course_id, name, position, payload, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            [(str(c.get('course_id')), c.get('course_name'), i, _dumps(c), now)
+             for i, c in enumerate(courses.get('list') or [])])
+
+    def save_homeworks_list(self, course_id, homeworks):
+        now = time.time()
+        self._executemany(
+            """INSERT INTO homeworks (course_id, homework_id, name, state, due_date, list_payload, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (course_id, homework_id) DO UPDATE SET
+                   name = excluded.name, state = excluded.state, due_date = excluded.due_date,
+                   list_payload = excluded.list_payload, fetched_at = excluded.fetched_at""",
+            [(str(course_id), str(hw.get('homeworkId')), hw.get('homeworkName'), hw.get('state'),
+              hw.get('nextDate'), _dumps(hw), now)
+             for hw in homeworks.get('list') or []])
+
+    def save_homework_info(self, course_id, homework_id, details):
+        self._execute(
+            """INSERT INTO homeworks (course_id, homework_id, details_payload, fetched_at) VALUES (?, ?, ?, ?)
+               ON CONFLICT (course_id, homework_id) DO UPDATE SET
+                   details_payload = excluded.details_payload, fetched_at = excluded.fetched_at""",
+            (str(course_id), str(homework_id), _dumps(details), time.time()))
+
+    def save_homework_problems(self, course_id, homework_id, problems):
+        now = time.time()
+        self._executemany(
+            """INSERT INTO problems (course_id, homework_id, problem_id, name, position, list_payload, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (course_id, homework_id, problem_id) DO UPDATE SET
+                   name = excluded.name, position = excluded.position,
+                   list_payload = excluded.list_payload, fetched_at = excluded.fetched_at""",
+            [(str(course_id), str(homework_id), str(p.get('problemId')), p.get('problemName'), i, _dumps(p), now)
+             for i, p in enumerate(problems.get('list') or [])])
+        self._index_problems(course_id, homework_id)
+
+    def save_problem_info(self, course_id, homework_id, problem_id, info):
+        self._execute(
+            """INSERT INTO problems (course_id, homework_id, problem_id, info_payload, fetched_at) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (course_id, homework_id, problem_id) DO UPDATE SET
+                   info_payload = excluded.info_payload, fetched_at = excluded.fetched_at""",
+            (str(course_id), str(homework_id), str(problem_id), _dumps(info), time.time()))
+        self._index_problems(course_id, homework_id, problem_id)
+
+    def upsert_records(self, rows):
+        """写入提交记录，rows为(record_id, course_id, homework_id, problem_id, result_state, score,
+        submission_time, payload, code_hashes)元组"""
+        now = time.time()
+        self._executemany(
+            """INSERT OR REPLACE INTO records (record_id, course_id, homework_id, problem_id, result_state,
+                                               score, submission_time, payload, code_hashes, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [row + (now,) for row in rows])
+
+    def save_result(self, record_id, course_id, homework_id, result):
+        # 批改中(JG)的结果不保存，避免覆盖最终结果
+        if result.get('resultState') == 'JG':
+            return
+        self._execute(
+            """INSERT OR REPLACE INTO results (record_id, course_id, homework_id, result_state, score, payload, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (str(record_id), str(course_id), str(homework_id), result.get('resultState'), result.get('score'),
+             _dumps(result), time.time()))
+
+    # ---- 整课程同步的断点状态 ----
+
+    def begin_sync(self, course_id):
+        """开始同步课程，返回上次未完成的同步中已完成的任务集合（用于断点续传）"""
+        rows = self._query("SELECT finished_at FROM sync_runs WHERE course_id = ?", (str(course_id),))
+        if rows and rows[0][0] is None:
+            done = self._query("SELECT task_key FROM sync_tasks WHERE course_id = ?", (str(course_id),))
+            return {row[0] for row in done}
+
+        self._execute("DELETE FROM sync_tasks WHERE course_id = ?", (str(course_id),))
+        self._execute("INSERT OR REPLACE INTO sync_runs (course_id, started_at, finished_at) VALUES (?, ?, NULL)",
+                      (str(course_id), time.time()))
+        return set()
+
+    def mark_sync_task(self, course_id, task_key):
+        self._execute("INSERT OR IGNORE INTO sync_tasks (course_id, task_key) VALUES (?, ?)",
+                      (str(course_id), task_key))
+
+    def finish_sync(self, course_id):
+        self._execute("UPDATE sync_runs SET finished_at = ? WHERE course_id = ?", (time.time(), str(course_id)))
+        self._execute("DELETE FROM sync_tasks WHERE course_id = ?", (str(course_id),))
+
+    # ---- 读取，返回与API相同结构的数据 ----
+
+    def load_courses(self):
+        rows = self._query("SELECT payload FROM courses ORDER BY position")
+        return {'list': [json.loads(row[0]) for row in rows]} if rows else None
+
+    def load_homeworks_list(self, course_id):
+        rows = self._query("SELECT list_payload FROM homeworks WHERE course_id = ? AND list_payload IS NOT NULL "
+                           "ORDER BY due_date", (str(course_id),))
+        return {'list': [json.loads(row[0]) for row in rows]} if rows else None
+
+    def load_homework_info(self, course_id, homework_id):
+        rows = self._query("SELECT details_payload FROM homeworks WHERE course_id = ? AND homework_id = ?",
+                           (str(course_id), str(homework_id)))
+        return json.loads(rows[0][0]) if rows and rows[0][0] else None
+
+    def load_homework_problems(self, course_id, homework_id):
+        rows = self._query("SELECT list_payload FROM problems WHERE course_id = ? AND homework_id = ? "
+                           "AND list_payload IS NOT NULL ORDER BY position", (str(course_id), str(homework_id)))
+        return {'list': [json.loads(row[0]) for row in rows]} if rows else None
+
+    def load_problem_info(self, course_id, homework_id, problem_id):
+        rows = self._query("SELECT info_payload FROM problems WHERE course_id = ? AND homework_id = ? AND problem_id = ?",
+                           (str(course_id), str(homework_id), str(problem_id)))
+        return json.loads(rows[0][0]) if rows and rows[0][0] else None
+
+    def load_records(self, course_id, homework_id, problem_id):
+        rows = self._query("SELECT payload FROM records WHERE course_id = ? AND homework_id = ? AND problem_id = ? "
+                           "ORDER BY submission_time DESC", (str(course_id), str(homework_id), str(problem_id)))
+        return {'list': [json.loads(row[0]) for row in rows]}
+
+    def count_records(self, course_id, homework_id, problem_id):
+        rows = self._query("SELECT COUNT(*) FROM records WHERE course_id = ? AND homework_id = ? AND problem_id = ?",
+                           (str(course_id), str(homework_id), str(problem_id)))
+        return rows[0][0]
+
+    def load_records_page(self, course_id, homework_id, problem_id, offset, limit):
+        """按提交时间倒序返回一页提交记录的摘要（不读取含代码的payload）
+
+        Returns:
+            [(record_id, result_state, score, submission_time)]
+        """
+        return self._query("SELECT record_id, result_state, score, submission_time FROM records "
+                           "WHERE course_id = ? AND homework_id = ? AND problem_id = ? "
+                           "ORDER BY submission_time DESC, record_id DESC LIMIT ? OFFSET ?",
+                           (str(course_id), str(homework_id), str(problem_id), limit, offset))
+
+    def load_problem_results(self, course_id, homework_id, problem_id):
+        """按提交时间先后返回题目每次提交的批改结果
+
+        Returns:
+            [(record_id, submission_time, result_state, 批改结果字典或None)]，没有保存批改结果的为None
+        """
+        rows = self._query("SELECT r.record_id, r.submission_time, r.result_state, s.payload FROM records r "
+                           "LEFT JOIN results s ON s.record_id = r.record_id "
+                           "WHERE r.course_id = ? AND r.homework_id = ? AND r.problem_id = ? "
+                           "ORDER BY r.submission_time, r.record_id",
+                           (str(course_id), str(homework_id), str(problem_id)))
+        return [(row[0], row[1], row[2], json.loads(row[3]) if row[3] else None) for row in rows]
+
+    def load_record_index(self, course_id, homework_id, problem_id):
+        """返回已保存记录的 {record_id: (result_state, score, code_hashes)}"""
+        rows = self._query("SELECT record_id, result_state, score, code_hashes FROM records "
+                           "WHERE course_id = ? AND homework_id = ? AND problem_id = ?",
+                           (str(course_id), str(homework_id), str(problem_id)))
+        return {row[0]: (row[1], row[2], json.loads(row[3]) if row[3] else None) for row in rows}
+
+    def load_result(self, record_id):
+        rows = self._query("SELECT payload FROM results WHERE record_id = ?", (str(record_id),))
+        return json.loads(rows[0][0]) if rows else None
+
+    # ---- 全文搜索 ----
+
+    def search_problems(self, query, limit=20):
+        """在已保存的题目名称、标签与题目描述中搜索，所有词都须出现
+
+        Returns:
+            按相关度排序的结果列表，每项为包含course_id、homework_id、problem_id、name、
+            homework_name、tags与snippet的字典
+        """
+        terms = list(dict.fromkeys(term.lower() for term in query.split()))
+        if not terms:
+            return []
+
+        if self.searchable:
+            indexed = [term for term in terms if len(term) >= SEARCH_MIN_TERM]
+            columns = "s.course_id, s.homework_id, s.problem_id, s.name, h.name, s.tags, s.content"
+            source = "problem_search s"
+            text = "lower(s.name || ' ' || s.tags || ' ' || s.content)"
+        else:
+            indexed = []
+            columns = ("s.course_id, s.homework_id, s.problem_id, coalesce(s.name, ''), h.name, "
+                       "coalesce((SELECT group_concat(value, ', ') FROM json_each(s.info_payload, '$.publicTags')), ''), "
+                       "coalesce(json_extract(s.info_payload, '$.content'), '')")
+            source = "problems s"
+            text = "lower(coalesce(s.name, '') || ' ' || coalesce(s.info_payload, ''))"
+
+        conditions, params = [], []
+        if indexed:
+            conditions.append("problem_search MATCH ?")
+            params.append(' AND '.join('"' + term.replace('"', '""') + '"' for term in indexed))
+            # 名称中的匹配权重最高，其次是标签
+            order = "bm25(problem_search, 0, 0, 0, 10, 5, 1)"
+        else:
+            order = "instr(lower(s.name), ?) = 0, s.course_id, s.homework_id, s.problem_id"
+        for term in terms:
+            if term not in indexed:
+                conditions.append(f"instr({text}, ?) > 0")
+                params.append(term)
+        if not indexed:
+            params.append(terms[0])
+
+        rows = self._query(
+            f"SELECT {columns} FROM {source} "
+            "LEFT JOIN homeworks h ON h.course_id = s.course_id AND h.homework_id = s.homework_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?", params + [limit])
+        return [{'course_id': row[0], 'homework_id': row[1], 'problem_id': row[2], 'name': row[3],
+                 'homework_name': row[4], 'tags': row[5], 'snippet': _snippet(row[6], terms)}
+                for row in rows]
+
+    # ---- 按ID反查所属课程与作业，供一次性子命令省去逐级选择 ----
+
+    def find_homework_course(self, homework_id):
+        """返回作业所属的课程ID，本地没有该作业时返回None"""
+        rows = self._query("SELECT course_id FROM homeworks WHERE homework_id = ? "
+                           "UNION SELECT course_id FROM problems WHERE homework_id = ? LIMIT 1",
+                           (str(homework_id), str(homework_id)))
+        return rows[0][0] if rows else None
+
+    def find_record(self, record_id):
+        """返回提交记录的(course_id, homework_id, problem_id)，problem_id未知时为None；本地没有时返回None"""
+        rows = self._query("SELECT course_id, homework_id, problem_id FROM records WHERE record_id = ?",
+                           (str(record_id),))
+        if not rows:
+            rows = self._query("SELECT course_id, homework_id, NULL FROM results WHERE record_id = ?",
+                               (str(record_id),))
+        return tuple(rows[0]) if rows else None
+
+
+def open_store(path=None):
+    """打开本地存储，失败时返回None（不影响在线使用）"""
+    from config import LOCAL_STORE_FILE
+    try:
+        return LocalStore(path or LOCAL_STORE_FILE)
+    except sqlite3.Error as e:
+        print(f"[\x1b[0;33m!\x1b[0m] 无法打开本地存储: {e}")
+        return None
+
+
+class OfflineRequester:
+    """与OJRequester接口相同，只从本地存储读取数据，用于离线浏览"""
+
+    def __init__(self, store):
+        self.store = store
+        self.csrf_token = 'offline'
+
+    def _missing(self, what):
+        print(f"[\x1b[0;33m!\x1b[0m] 离线模式: 本地没有{what}的数据")
+        return False
+
+    def load_cookies(self, filename=None, stored=None):
+        return True
+
+    def request_stats(self):
+        return {}
+
+    def check_cookies_status(self):
+        return True
+
+    def get_my_courses(self):
+        return self.store.load_courses() or self._missing("课程列表")
+
+    def get_homeworks_list(self, course_id):
+        print(f"\n[\x1b[0;36m!\x1b[0m] 从本地存储读取课程{course_id}的作业列表...")
+        return self.store.load_homeworks_list(course_id) or self._missing("作业列表")
+
+    def get_homework_info(self, homework_id, course_id):
+        return self.store.load_homework_info(course_id, homework_id) or False
+
+    def get_homework_problems(self, homework_id, course_id):
+        return self.store.load_homework_problems(course_id, homework_id) or self._missing("题目列表")
+
+    def get_problem_info(self, problem_id, homework_id, course_id):
+        return self.store.load_problem_info(course_id, homework_id, problem_id) or False
+
+    def get_problem_submission_records(self, problem_id, homework_id, course_id):
+        return self.store.load_records(course_id, homework_id, problem_id)
+
+    def submit_homework(self, homework_id, problem_id, course_id, file_paths, known_record_ids=None):
+        print("[\x1b[0;31mx\x1b[0m] 离线模式下无法提交作业")
+        return None
+
+    def get_submission_result(self, record_id, course_id, homework_id):
+        return self.store.load_result(record_id)
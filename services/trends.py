@@ -0,0 +1,153 @@
+"""测试用例耗时与内存趋势：汇总一道题目历次提交的批改结果，按测试用例标题得到时间/内存序列"""
+import math
+from array import array
+
+import requests
+
+NAN = float('nan')
+
+# 变化小于这些值时不算退步，避免评测机的抖动被误报
+TIME_NOISE_MS = 10
+MEMORY_NOISE_MB = 1
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _limit(limits):
+    """从 {语言: 限制} 中取Java的限制，没有时取第一项"""
+    if not isinstance(limits, dict) or not limits:
+        return None
+    value = limits.get('Java', next(iter(limits.values())))
+    return _number(value) if _number(value) > 0 else None
+
+
+def _last_two(series):
+    """序列中最后两个有效值 (上一次, 最近一次)，不存在的为None"""
+    values = [value for value in series if not math.isnan(value)][-2:]
+    return ([None] * (2 - len(values)) + values) if values else (None, None)
+
+
+def _change(series, noise, threshold):
+    """最近一次相对上一次的变化比例，以及是否算作退步"""
+    previous, latest = _last_two(series)
+    if previous is None or latest is None or previous <= 0:
+        return None, False
+    change = (latest - previous) / previous
+    return change, change > threshold and latest - previous > noise
+
+
+class CaseTrend:
+    """一个测试用例在历次提交中的耗时与内存
+
+    times/memories与提交列表一一对应，该次提交没有这个测试用例或数值无效时为NaN。
+    """
+    __slots__ = ('title', 'times', 'memories', 'time_change', 'memory_change',
+                 'time_regression', 'memory_regression', 'time_ratio', 'memory_ratio')
+
+    def __init__(self, title, length):
+        self.title = title
+        self.times = array('d', [NAN]) * length
+        self.memories = array('d', [NAN]) * length
+        self.time_change = self.memory_change = None
+        self.time_regression = self.memory_regression = False
+        self.time_ratio = self.memory_ratio = None
+
+    @property
+    def runs(self):
+        return sum(1 for value in self.times if not math.isnan(value))
+
+    @property
+    def latest_time(self):
+        return _last_two(self.times)[1]
+
+    @property
+    def latest_memory(self):
+        return _last_two(self.memories)[1]
+
+    @property
+    def headroom(self):
+        """最近一次占时间/内存限制的较大比例，未知时为0"""
+        return max(self.time_ratio or 0, self.memory_ratio or 0)
+
+    def to_dict(self):
+        def clean(series):
+            return [None if math.isnan(value) else value for value in series]
+        return {'title': self.title, 'time': clean(self.times), 'memory': clean(self.memories),
+                'time_change': self.time_change, 'memory_change': self.memory_change,
+                'time_regression': self.time_regression, 'memory_regression': self.memory_regression,
+                'time_ratio': self.time_ratio, 'memory_ratio': self.memory_ratio}
+
+
+def load_problem_results(requester, course_id, homework_id, problem_id):
+    """读取题目每次提交的批改结果，本地没有保存的并发向服务器获取（获取到的结果会写入本地存储）
+
+    Returns:
+        按提交时间先后排列的 [(record_id, submission_time, 批改结果字典)]，没有本地存储时返回None
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from config import SUBMIT_WORKERS
+
+    store = getattr(requester, 'store', None)
+    if store is None:
+        return None
+    rows = store.load_problem_results(course_id, homework_id, problem_id)
+
+    missing = [record_id for record_id, _, state, result in rows if result is None and state != 'JG']
+    fetched = {}
+    if missing:
+        def fetch(record_id):
+            try:
+                return requester.get_submission_result(record_id, course_id, homework_id)
+            except requests.RequestException:
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(len(missing), SUBMIT_WORKERS),
+                                thread_name_prefix='oja-trend') as executor:
+            fetched = dict(zip(missing, executor.map(fetch, missing)))
+
+    results = []
+    for record_id, submission_time, _, result in rows:
+        result = result or fetched.get(record_id)
+        if result and result.get('resultState') != 'JG' and result.get('resultList'):
+            results.append((record_id, submission_time, result))
+    return results
+
+
+def build_case_trends(results, problem=None):
+    """按测试用例标题汇总时间与内存序列，标记退步并计算最近一次占限制的比例
+
+    Args:
+        results: load_problem_results的返回值
+        problem: 可选，已加载详情的Problem，用于获取时间与内存限制
+
+    Returns:
+        CaseTrend列表，顺序为测试用例第一次出现的顺序
+    """
+    from config import TREND_REGRESSION_THRESHOLD
+
+    trends = {}
+    for index, (_, _, result) in enumerate(results):
+        for case in result['resultList']:
+            title = case.get('title', '')
+            trend = trends.get(title)
+            if trend is None:
+                trend = trends[title] = CaseTrend(title, len(results))
+            trend.times[index] = _number(case.get('time'))
+            trend.memories[index] = _number(case.get('memory'))
+
+    time_limit = _limit(problem.time_limit) if problem else None
+    memory_limit = _limit(problem.memory_limit) if problem else None
+    for trend in trends.values():
+        trend.time_change, trend.time_regression = _change(trend.times, TIME_NOISE_MS, TREND_REGRESSION_THRESHOLD)
+        trend.memory_change, trend.memory_regression = _change(trend.memories, MEMORY_NOISE_MB,
+                                                               TREND_REGRESSION_THRESHOLD)
+        if time_limit and trend.latest_time is not None:
+            trend.time_ratio = trend.latest_time / time_limit
+        if memory_limit and trend.latest_memory is not None:
+            trend.memory_ratio = trend.latest_memory / memory_limit
+    return list(trends.values())
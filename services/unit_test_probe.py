@@ -0,0 +1,114 @@
+"""单元测试文件存在性探测，结果带TTL缓存，探测在后台进行不阻塞显示"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from config import CACHE_DIR, UNIT_TEST_PROBE_TTL, UNIT_TEST_DOWNLOAD_WORKERS
+from services.data_service import build_unit_test_url
+from services.deadline import request_timeout
+from services.breaker import breakers
+from utils.cache import JsonIndex
+
+
+class UnitTestProbe:
+    """缓存并异步探测题目是否存在单元测试文件"""
+
+    def __init__(self, cache_path, ttl, max_workers):
+        self.ttl = ttl
+        self._cache = JsonIndex(cache_path)
+        self._manifest = JsonIndex(os.path.join(CACHE_DIR, 'unit_tests.json'))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='oja-probe')
+        self._session = requests.Session()
+        self._pending = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def refresh_manifest(self):
+        """批量同步单元测试文件后清单会被改写，重新读取以免再次探测刚下载的文件"""
+        self._manifest.refresh()
+
+    def lookup(self, url):
+        """返回缓存的探测结果：True/False，未知或已过期时返回None"""
+        # 已经下载过的测试文件（批量同步记录的清单）一定存在
+        if self._manifest.get(url):
+            return True
+        entry = self._cache.get(url)
+        if entry and time.time() - entry['checked'] < self.ttl:
+            return entry['exists']
+        return None
+
+    def _probe(self, url):
+        try:
+            response = breakers.call(url, lambda: self._session.head(url, verify=False, timeout=request_timeout(),
+                                                                    allow_redirects=True))
+            if response.status_code in (200, 404, 403):
+                self._cache.set(url, {'exists': response.status_code == 200, 'checked': time.time()})
+                with self._lock:
+                    self._dirty = True
+        except Exception:
+            pass  # 探测失败时保持未知状态，下次显示时再试
+        finally:
+            # 一批探测全部完成后才写回缓存文件，而不是每探测一个就重写整个索引
+            with self._lock:
+                self._pending.discard(url)
+                save = self._dirty and not self._pending
+                if save:
+                    self._dirty = False
+            if save:
+                self._cache.save()
+
+    def close(self):
+        """取消尚未开始的探测并保存已有的结果，避免退出时等待整个探测队列"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            save, self._dirty = self._dirty, False
+        if save:
+            self._cache.save()
+
+    def schedule(self, url):
+        """在后台探测url，已在探测中的url不会重复提交"""
+        with self._lock:
+            if url in self._pending:
+                return
+            self._pending.add(url)
+        self._executor.submit(self._probe, url)
+
+
+_probe = None
+
+
+def _get_probe():
+    global _probe
+    if _probe is None:
+        _probe = UnitTestProbe(os.path.join(CACHE_DIR, 'unit_test_probe.json'),
+                               UNIT_TEST_PROBE_TTL, UNIT_TEST_DOWNLOAD_WORKERS)
+    return _probe
+
+
+def close_probe():
+    """关闭后台探测（如果已经启动）"""
+    global _probe
+    if _probe is not None:
+        _probe.close()
+        _probe = None
+
+
+def get_unit_test_availability(course_code, homework_id, problems):
+    """获取题目列表的单元测试可用性，不等待网络
+
+    Returns:
+        dict: problemId -> True（有）/ False（无）/ None（探测中）
+    """
+    probe = _get_probe()
+    probe.refresh_manifest()
+    availability = {}
+    for problem in problems:
+        url = build_unit_test_url(course_code, homework_id, problem.id, problem.name)
+        status = probe.lookup(url)
+        if status is None:
+            probe.schedule(url)
+        availability[problem.id] = status
+    return availability
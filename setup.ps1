@@ -26,6 +26,14 @@ catch {
     exit 1
 }
 
+# ojAssistant requires Python 3.10 or newer
+python -c "import sys; sys.exit(0 if sys.version_info >= (3, 10) else 1)"
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "ojAssistant requires Python 3.10 or newer (found $pythonVersion). Please upgrade Python and try again." -ForegroundColor Red
+    Write-Host "Download Python from: https://www.python.org/downloads/" -ForegroundColor Yellow
+    exit 1
+}
+
 # Get the script directory
 $scriptDir = Join-Path $env:USERPROFILE "Documents\ojAssistant"
 
@@ -0,0 +1,152 @@
+import pytest
+import requests
+
+from services import breaker as breaker_module
+from services import deadline as deadline_module
+from services.breaker import BreakerRegistry, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from services.deadline import deadline, DeadlineExceeded
+
+URL = "https://oj.example.com/api/problem/info/"
+HOST = "oj.example.com"
+ENDPOINT = HOST + "/api/problem/info/"
+
+
+class Response:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+
+def ok():
+    return Response(200)
+
+
+def raiser(error):
+    def send():
+        raise error
+    return send
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(breaker_module, 'time', clock)
+    monkeypatch.setattr(deadline_module, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def registry(clock):
+    return BreakerRegistry(failure_threshold=2, reset_timeout=10)
+
+
+def _fail(registry, times, error=None, per_endpoint=True):
+    for _ in range(times):
+        with pytest.raises(requests.RequestException):
+            registry.call(URL, raiser(error or requests.ConnectionError("refused")), per_endpoint=per_endpoint)
+
+
+def test_opens_after_threshold_and_fails_fast(registry):
+    _fail(registry, 1)
+    assert registry.get(HOST).state == CLOSED
+    _fail(registry, 1)
+    assert registry.get(HOST).state == OPEN
+
+    sent = []
+    with pytest.raises(CircuitOpenError) as error:
+        registry.call(URL, lambda: sent.append(1), per_endpoint=True)
+    assert sent == []
+    assert HOST in str(error.value)
+    assert isinstance(error.value, requests.ConnectionError)  # 调用者按网络错误处理即可
+
+
+def test_success_resets_failure_count(registry):
+    _fail(registry, 1)
+    registry.call(URL, ok)
+    _fail(registry, 1)
+    assert registry.get(HOST).state == CLOSED
+
+
+def test_half_open_allows_single_probe_then_closes(registry, clock):
+    _fail(registry, 2)
+    assert registry.get(HOST).retry_in() == 10
+    clock.advance(10)
+
+    def probe():
+        # 探测请求进行中，其他请求仍直接失败
+        with pytest.raises(CircuitOpenError):
+            registry.call(URL, ok, per_endpoint=True)
+        assert registry.get(HOST).state == HALF_OPEN
+        return ok()
+
+    registry.call(URL, probe, per_endpoint=True)
+    assert registry.get(HOST).state == CLOSED
+    assert registry.get(ENDPOINT).state == CLOSED
+    assert registry.open_breakers() == []
+
+
+def test_failed_probe_reopens(registry, clock):
+    _fail(registry, 2)
+    clock.advance(10)
+    _fail(registry, 1)
+    assert registry.get(HOST).state == OPEN
+    assert registry.get(HOST).retry_in() == 10
+    assert [name for name, state, _ in registry.open_breakers()] == [HOST, ENDPOINT]
+
+
+def test_endpoint_breaker_counts_5xx_but_host_stays_closed(registry):
+    for _ in range(2):
+        registry.call(URL, lambda: Response(500), per_endpoint=True)
+    assert registry.get(HOST).state == CLOSED
+    assert registry.get(ENDPOINT).state == OPEN
+    # 503表示服务器繁忙（由限速处理），不算接口故障
+    other = "https://oj.example.com/api/record/result/"
+    for _ in range(3):
+        registry.call(other, lambda: Response(503), per_endpoint=True)
+    assert registry.get(HOST + "/api/record/result/").state == CLOSED
+
+
+def test_open_endpoint_releases_host_probe(registry, clock):
+    _fail(registry, 2, per_endpoint=False)
+    clock.advance(5)
+    endpoint = registry.get(ENDPOINT)
+    endpoint.record_failure()
+    endpoint.record_failure()
+    clock.advance(5)
+    # 主机熔断器可以探测了，但接口熔断器仍打开：主机放行的探测名额必须归还
+    with pytest.raises(CircuitOpenError) as error:
+        registry.call(URL, ok, per_endpoint=True)
+    assert ENDPOINT in str(error.value)
+    assert registry.get(HOST).allow()
+
+
+def test_shortened_timeout_is_not_a_failure(registry, clock):
+    # 时间预算只剩1秒（小于配置的读取超时），这时的超时不说明服务不可用
+    for _ in range(3):
+        with deadline(1):
+            with pytest.raises(requests.Timeout):
+                registry.call(URL, raiser(requests.ReadTimeout()), per_endpoint=True)
+    assert registry.get(HOST).state == CLOSED
+
+    # 没有时间预算时的超时计入失败
+    _fail(registry, 2, error=requests.ReadTimeout())
+    assert registry.get(HOST).state == OPEN
+
+
+def test_shortened_timeout_releases_half_open_probe(registry, clock):
+    _fail(registry, 2)
+    clock.advance(10)
+    with deadline(1):
+        with pytest.raises(requests.Timeout):
+            registry.call(URL, raiser(requests.ReadTimeout()), per_endpoint=True)
+    # 探测没有得出结论：仍为半开，下一个请求可以重新探测
+    assert registry.get(HOST).state == HALF_OPEN
+    registry.call(URL, ok, per_endpoint=True)
+    assert registry.get(HOST).state == CLOSED
+
+
+def test_deadline_exceeded_releases_probe(registry, clock):
+    _fail(registry, 2)
+    clock.advance(10)
+    with pytest.raises(DeadlineExceeded):
+        registry.call(URL, raiser(DeadlineExceeded("budget")), per_endpoint=True)
+    assert registry.get(HOST).state == HALF_OPEN
+    assert registry.get(HOST).allow()
@@ -0,0 +1,74 @@
+from email.utils import format_datetime
+from datetime import datetime, timezone
+
+import pytest
+
+from services import ratelimit
+from services.ratelimit import TokenBucket, RateLimiter, parse_retry_after
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    monkeypatch.setattr(ratelimit.random, 'uniform', lambda low, high: 1.0)  # 去掉抖动
+    return clock
+
+
+def test_bucket_allows_burst_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    # 令牌用完后按每秒2个补充，下一个令牌需要等0.5秒
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.slept == [pytest.approx(0.5)]
+
+
+def test_bucket_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket(rate=2, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.advance(60)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0  # 空闲再久也只积攒burst个
+
+
+def test_pause_blocks_until_over_and_drops_saved_tokens(clock):
+    bucket = TokenBucket(rate=8, burst=4)
+    clock.advance(60)
+    bucket.pause(3)
+    # 暂停结束后令牌从0开始补充，不会立即放出突发请求
+    assert bucket.acquire() == pytest.approx(3 + 0.125)
+    assert bucket.acquire() == pytest.approx(0.125)
+
+
+def test_throttled_uses_retry_after(clock):
+    limiter = RateLimiter({'read': (8, 4)}, backoff_base=1, backoff_max=30)
+    assert limiter.throttled('read', retry_after=4) == 4
+    assert limiter.acquire('read') is None
+    assert sum(clock.slept) == pytest.approx(4 + 0.125)
+    assert limiter.stats()['read']['throttled'] == 1
+
+
+def test_throttled_backs_off_until_success(clock):
+    limiter = RateLimiter({'poll': (8, 4)}, backoff_base=1, backoff_max=5)
+    # 没有Retry-After时连续限流的暂停时间加倍，不超过backoff_max
+    assert [limiter.throttled('poll') for _ in range(4)] == [1, 2, 4, 5]
+    limiter.succeeded('poll')
+    assert limiter.throttled('poll') == 1
+    assert limiter.throttled('poll', retry_after=120) == 5
+
+
+def test_endpoints_are_limited_separately(clock):
+    limiter = RateLimiter({'read': (8, 1), 'submit': (1, 1)})
+    limiter.throttled('submit', retry_after=10)
+    limiter.acquire('read')
+    assert clock.slept == []
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(' 12 ') == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True)) == 0.0
@@ -0,0 +1,126 @@
+import threading
+import time
+
+from services.scheduler import (PriorityScheduler, Ticket, INTERACTIVE, NORMAL, BACKGROUND,
+                                current_priority, request_priority)
+
+
+def _start(scheduler, ticket, admitted):
+    """在新线程中等待放行，放行后把ticket记入admitted"""
+    def run():
+        scheduler.acquire(ticket)
+        admitted.append(ticket)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_queued(ticket, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not ticket.queued:
+        assert time.monotonic() < deadline, "ticket没有进入排队"
+        time.sleep(0.001)
+
+
+def _wait_admitted(admitted, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while len(admitted) < count:
+        assert time.monotonic() < deadline, "请求没有被放行"
+        time.sleep(0.001)
+
+
+def test_reserved_slot_admits_interactive_while_background_waits():
+    scheduler = PriorityScheduler(2, reserved=1)
+    first = Ticket(BACKGROUND)
+    scheduler.acquire(first)
+
+    # 后台请求只能占用 2 - 1 个名额，第二个后台请求排队
+    admitted = []
+    second = Ticket(BACKGROUND)
+    thread = _start(scheduler, second, admitted)
+    _wait_queued(second)
+
+    # 保留的名额仍可以放行用户操作
+    interactive = Ticket(INTERACTIVE)
+    scheduler.acquire(interactive)
+    assert admitted == []
+    scheduler.release(interactive)
+
+    scheduler.release(first)
+    thread.join(2)
+    assert admitted == [second]
+    scheduler.release(second)
+
+
+def test_higher_priority_is_admitted_first():
+    scheduler = PriorityScheduler(1, reserved=0)
+    running = Ticket(NORMAL)
+    scheduler.acquire(running)
+
+    admitted = []
+    background = Ticket(BACKGROUND)
+    threads = [_start(scheduler, background, admitted)]
+    _wait_queued(background)
+    interactive = Ticket(INTERACTIVE)
+    threads.append(_start(scheduler, interactive, admitted))
+    _wait_queued(interactive)
+
+    scheduler.release(running)
+    _wait_admitted(admitted, 1)
+    assert admitted == [interactive]
+    scheduler.release(interactive)
+    _wait_admitted(admitted, 2)
+    for thread in threads:
+        thread.join(2)
+    assert admitted == [interactive, background]
+
+
+def test_boost_moves_queued_ticket_ahead():
+    scheduler = PriorityScheduler(1, reserved=0)
+    running = Ticket(NORMAL)
+    scheduler.acquire(running)
+
+    admitted = []
+    normal = Ticket(NORMAL)
+    background = Ticket(BACKGROUND)
+    threads = [_start(scheduler, background, admitted)]
+    _wait_queued(background)
+    threads.append(_start(scheduler, normal, admitted))
+    _wait_queued(normal)
+
+    scheduler.boost(background, INTERACTIVE)
+    assert background.priority == INTERACTIVE
+    assert scheduler.stats()['interactive']['queued'] == 1
+
+    scheduler.release(running)
+    threads[0].join(2)
+    assert admitted == [background]
+    scheduler.release(background)
+    threads[1].join(2)
+    assert admitted == [background, normal]
+    scheduler.release(normal)
+
+
+def test_boost_ignores_running_or_lower_priority():
+    scheduler = PriorityScheduler(2)
+    ticket = Ticket(NORMAL)
+    scheduler.boost(ticket, INTERACTIVE)  # 没有在排队
+    assert ticket.priority == NORMAL
+
+    ticket.queued = True
+    scheduler.boost(ticket, BACKGROUND)  # 不会降低优先级
+    assert ticket.priority == NORMAL
+
+
+def test_slot_uses_thread_priority_and_records_stats():
+    scheduler = PriorityScheduler(2)
+    assert current_priority() == INTERACTIVE  # 主线程
+    with request_priority(BACKGROUND):
+        assert current_priority() == BACKGROUND
+        with scheduler.slot():
+            pass
+    assert current_priority() == INTERACTIVE
+
+    stats = scheduler.stats()
+    assert stats['background']['requests'] == 1
+    assert stats['interactive']['requests'] == 0
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from services.scheduler import PriorityScheduler, Ticket, INTERACTIVE, BACKGROUND
+from services.singleflight import SingleFlight, form_key
+
+
+def _leader(flights, key, fn, context=None):
+    """在新线程中以执行者身份调用，返回(线程, 结果列表)"""
+    results = []
+
+    def run():
+        try:
+            results.append(flights.do(key, fn, context=context))
+        except Exception as e:
+            results.append(e)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, results
+
+
+def test_joiner_shares_leader_result():
+    flights = SingleFlight()
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        assert finish.wait(2)
+        return {'problemId': 1}
+
+    thread, results = _leader(flights, 'key', fetch, context='leader')
+    assert started.wait(2)
+
+    joined = []
+
+    def on_join(context):
+        joined.append(context)
+        finish.set()  # 已加入后才让执行者完成
+
+    result = flights.do('key', lambda: pytest.fail("加入者不应执行"), on_join=on_join)
+    thread.join(2)
+
+    assert result is results[0]
+    assert joined == ['leader']
+    assert calls == [1]
+    assert flights.stats() == {'calls': 2, 'coalesced': 1, 'in_flight': 0}
+
+
+def test_joiner_receives_leader_error():
+    flights = SingleFlight()
+    started, finish = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        assert finish.wait(2)
+        raise ConnectionError("down")
+
+    thread, results = _leader(flights, 'key', fetch)
+    assert started.wait(2)
+    with pytest.raises(ConnectionError):
+        flights.do('key', lambda: None, on_join=lambda context: finish.set())
+    thread.join(2)
+    assert isinstance(results[0], ConnectionError)
+
+
+def test_key_is_removed_after_call():
+    flights = SingleFlight()
+    assert flights.do('key', lambda: 1) == 1
+    assert flights.do('key', lambda: 2) == 2
+    assert flights.stats()['coalesced'] == 0
+
+
+def test_join_timeout():
+    flights = SingleFlight()
+    started, finish = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        finish.wait(2)
+
+    thread, _ = _leader(flights, 'key', fetch)
+    assert started.wait(2)
+    with pytest.raises(TimeoutError):
+        flights.do('key', lambda: None, wait_timeout=0.01)
+    finish.set()
+    thread.join(2)
+
+
+def test_join_boosts_queued_leader():
+    # 与OJRequester._api_post相同：执行者的context是其排队中的ticket，加入者在等待前提高它的优先级
+    scheduler = PriorityScheduler(1, reserved=0)
+    running = Ticket(BACKGROUND)
+    scheduler.acquire(running)
+
+    flights = SingleFlight()
+    ticket = Ticket(BACKGROUND)
+
+    def fetch():
+        with scheduler.slot(ticket):
+            return 'done'
+
+    thread, results = _leader(flights, 'key', fetch, context=ticket)
+    while not ticket.queued:
+        time.sleep(0.001)
+
+    def boost(leader_ticket):
+        scheduler.boost(leader_ticket, INTERACTIVE)
+        scheduler.release(running)
+
+    assert flights.do('key', lambda: None, on_join=boost, wait_timeout=2) == 'done'
+    thread.join(2)
+    assert ticket.priority == INTERACTIVE
+    assert results == ['done']
+
+
+def test_form_key_ignores_order_and_value_types():
+    assert form_key('/api', {'a': 1, 'b': '2'}) == form_key('/api', {'b': 2, 'a': '1'})
+    assert form_key('/api', None) == ('/api', ())
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from services.store import LocalStore, SCHEMA
+
+
+def _fts5_trigram_available():
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(a, tokenize = 'trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+requires_fts5 = pytest.mark.skipif(not _fts5_trigram_available(), reason="SQLite没有FTS5或trigram分词器")
+
+
+def _save(store, homework_id, problems):
+    """保存作业的题目列表与题目详情，problems为 {problem_id: (名称, 标签列表, 描述)}"""
+    store.save_homework_problems('1', homework_id, {'list': [
+        {'problemId': problem_id, 'problemName': name} for problem_id, (name, _, _) in problems.items()]})
+    for problem_id, (name, tags, content) in problems.items():
+        store.save_problem_info('1', homework_id, problem_id, {'problemName': name, 'content': content,
+                                                               'publicTags': tags})
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalStore(str(tmp_path / 'oja.db'))
+    yield store
+    store.close()
+
+
+@requires_fts5
+def test_existing_database_is_backfilled(tmp_path):
+    # 旧版本创建的数据库没有全文索引，打开时为已保存的题目建立索引
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT INTO problems (course_id, homework_id, problem_id, name, info_payload, fetched_at) "
+                 "VALUES ('1', '10', '100', '矩阵乘法', ?, 0)",
+                 ('{"content": "计算两个矩阵的乘积", "publicTags": ["array"]}',))
+    conn.commit()
+    conn.close()
+
+    store = LocalStore(path)
+    try:
+        assert store.searchable
+        results = store.search_problems('矩阵的乘积')
+        assert [(r['homework_id'], r['problem_id'], r['name'], r['tags']) for r in results] == \
+            [('10', '100', '矩阵乘法', 'array')]
+    finally:
+        store.close()
+
+
+@requires_fts5
+def test_index_follows_saves(store):
+    _save(store, '10', {'100': ('Greeting', [], 'print hello')})
+    assert [r['problem_id'] for r in store.search_problems('hello')] == ['100']
+
+    # 更新题目详情后，索引中的旧内容被替换
+    store.save_problem_info('1', '10', '100', {'content': 'print goodbye'})
+    assert store.search_problems('hello') == []
+    assert [r['problem_id'] for r in store.search_problems('goodbye')] == ['100']
+
+
+@requires_fts5
+def test_name_matches_rank_above_content_matches(store):
+    _save(store, '10', {
+        '101': ('Two Sum', [], 'use a recursion helper to find the pair'),
+        '102': ('Recursion Basics', [], 'print numbers'),
+        '103': ('Queue', ['recursion'], 'simulate a queue'),
+    })
+    assert [r['problem_id'] for r in store.search_problems('recursion')] == ['102', '103', '101']
+
+
+@requires_fts5
+def test_all_terms_must_match_including_short_ones(store):
+    _save(store, '10', {
+        '101': ('数组求和', [], '输入n个整数，输出它们的和'),
+        '102': ('数组排序', [], '输入n个整数，按升序输出'),
+    })
+    # "求和"短于3个字符，无法使用trigram索引，按子串过滤
+    assert [r['problem_id'] for r in store.search_problems('个整数 求和')] == ['101']
+    assert [r['problem_id'] for r in store.search_problems('整数')] == ['101', '102']
+    assert store.search_problems('个整数 平均') == []
+
+
+def test_search_without_index_scans(store):
+    store.searchable = False  # 与没有FTS5的SQLite相同，退化为扫描
+    _save(store, '10', {'101': ('Hello World', ['io'], 'print hello'), '102': ('Loops', [], 'say hello')})
+    results = store.search_problems('hello')
+    assert [r['problem_id'] for r in results] == ['101', '102']  # 名称匹配的排在前面
+    assert results[0]['tags'] == 'io'
+    assert 'hello' in results[1]['snippet']
@@ -0,0 +1,75 @@
+"""比较HTTP/1.1连接池(requests)与HTTP/2(httpx)加载一份作业的耗时
+
+用法: python tools/bench_transport.py <课程ID> <作业ID> [轮数]
+
+每轮并发请求该作业所有题目的详情与提交记录（2×N个POST），分别使用两种传输各跑若干轮，
+输出每轮耗时的中位数与最小值。需要已保存的有效Cookies，HTTP/2还需要 pip install httpx[http2]。
+"""
+import os
+import sys
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import urllib3
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+import config
+
+
+def load_homework(requester, course_id, homework_id, problem_ids):
+    """并发获取所有题目的详情与提交记录，返回耗时（秒）"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_REQUESTS) as executor:
+        futures = []
+        for problem_id in problem_ids:
+            futures.append(executor.submit(requester.get_problem_info, problem_id, homework_id, course_id))
+            futures.append(executor.submit(requester.get_problem_submission_records,
+                                           problem_id, homework_id, course_id))
+        for future in futures:
+            future.result()
+    return time.perf_counter() - started
+
+
+def bench(http2, course_id, homework_id, rounds):
+    from services.requester import OJRequester
+
+    requester = OJRequester(http2=http2)
+    if not requester.load_cookies() or not requester.check_cookies_status():
+        print("[\x1b[0;31mx\x1b[0m] Cookies无效，请先运行oja登录")
+        return None
+    if http2 and requester.http2 is None:
+        return None
+
+    problems = requester.get_homework_problems(homework_id, course_id)
+    problem_ids = [item['problemId'] for item in (problems or {}).get('list') or []]
+    if not problem_ids:
+        print("[\x1b[0;31mx\x1b[0m] 作业中没有题目")
+        return None
+
+    load_homework(requester, course_id, homework_id, problem_ids)  # 预热：建立连接
+    timings = [load_homework(requester, course_id, homework_id, problem_ids) for _ in range(rounds)]
+    stats = requester.request_stats()
+    return timings, len(problem_ids) * 2, stats['transport']
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        return
+    course_id, homework_id = sys.argv[1], sys.argv[2]
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    for http2 in (False, True):
+        result = bench(http2, course_id, homework_id, rounds)
+        if result is None:
+            continue
+        timings, requests_per_round, transport = result
+        print(f"{transport:<9} {requests_per_round}个请求/轮  "
+              f"中位数 {statistics.median(timings) * 1000:.0f} ms  最小 {min(timings) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""检查oja从冷启动到第一行输出的时间是否在预算内
+
+用法: python tools/check_startup.py [预算毫秒] [次数]
+
+以 python -X importtime main.py 启动oja（工作目录为一个临时目录），第一行输出出现时即结束进程，
+取多次运行的中位数与预算比较。超出预算时以非0状态退出，并列出第一行输出之前导入最耗时的模块。
+注意：oja daemon正在运行时调用会被转发给它，测得的不是冷启动时间。
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+import statistics
+import subprocess
+
+STARTUP_BUDGET_MS = 150
+RUNS = 5
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def measure(work_dir):
+    """运行一次，返回(到第一行输出的毫秒数, 此前的importtime记录)"""
+    imports = []
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime', MAIN, work_dir],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            cwd=work_dir, text=True, encoding='utf-8', errors='replace')
+
+    def collect():
+        for line in proc.stderr:
+            imports.append(line)
+
+    reader = threading.Thread(target=collect, daemon=True)
+    reader.start()
+    first_line = proc.stdout.readline()
+    elapsed = (time.perf_counter() - started) * 1000
+    seen = len(imports)
+    proc.kill()
+    proc.wait()
+    reader.join(1)
+
+    if not first_line:
+        raise RuntimeError("oja没有产生任何输出")
+    return elapsed, imports[:seen]
+
+
+def slowest_imports(lines, limit=10):
+    """解析importtime输出，按累计耗时返回最慢的顶层导入 [(毫秒, 模块)]"""
+    entries = []
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.rstrip('\n').split('|', 2)
+        if name[1:].startswith(' '):
+            continue  # 只统计顶层导入（嵌套导入已计入其父模块）
+        entries.append((int(cumulative_us) / 1000, name.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_MS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = [measure(work_dir) for _ in range(runs)]
+
+    timings = [elapsed for elapsed, _ in results]
+    median = statistics.median(timings)
+    print(f"冷启动到第一行输出: 中位数 {median:.0f} ms, 最小 {min(timings):.0f} ms, 预算 {budget:.0f} ms")
+
+    if median <= budget:
+        print("[\x1b[0;32m+\x1b[0m] 在预算内")
+        return 0
+
+    print("[\x1b[0;31mx\x1b[0m] 超出预算，第一行输出之前最耗时的导入:")
+    median_run = sorted(range(runs), key=lambda i: timings[i])[runs // 2]
+    for ms, name in slowest_imports(results[median_run][1]):
+        print(f"  {ms:8.1f} ms  {name}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,35 @@
-"""UI模块，提供格式化显示与交互功能"""
+"""UI模块，提供格式化显示与交互功能
 
-from .display import display_courses, display_homeworks, display_problems_list, display_problems_info
-from .interaction import select_course, select_homework, interact_with_problems
-from .submission import handle_submission
+导出的名称在首次访问时才导入所在子模块。
+"""
+import importlib
+
+# 导出的名称 -> 所在子模块
+_EXPORTS = {
+    'display_courses': 'display',
+    'display_homeworks': 'display',
+    'display_problems_list': 'display',
+    'display_problems_info': 'display',
+    'display_request_stats': 'display',
+    'display_service_status': 'display',
+    'select_course': 'interaction',
+    'select_homework': 'interaction',
+    'interact_with_problems': 'interaction',
+    'handle_submission': 'submission',
+}
 
 # 定义当使用 from ui import * 时导入的内容
 __all__ = [
     'display_courses', 'display_homeworks', 'display_problems_info',
-    'select_course', 'select_homework', 'display_problems_list'
-]
\ No newline at end of file
+    'select_course', 'select_homework', 'display_problems_list', 'display_request_stats',
+    'display_service_status'
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
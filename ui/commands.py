@@ -0,0 +1,759 @@
+"""非交互式子命令"""
+import sys
+import functools
+import contextlib
+
+import config
+
+
+def _network_errors(handler):
+    """子命令遇到网络错误（包括服务已熔断）时显示一行原因并返回False，而不是打印调用栈
+
+    --json/--ndjson 模式下原因写到标准错误，标准输出只有JSON。
+    """
+    @functools.wraps(handler)
+    def wrapper(args):
+        try:
+            return handler(args)
+        except Exception as e:
+            import requests
+            if not isinstance(e, requests.RequestException):
+                raise
+            from services.data_service import report_request_error
+            json_mode = '--json' in args or '--ndjson' in args
+            with contextlib.redirect_stdout(sys.stderr) if json_mode else contextlib.nullcontext():
+                report_request_error(e)
+            return False
+    return wrapper
+
+
+@_network_errors
+def run_sync(args):
+    """oja sync <course>: 将整个课程的作业、题目与提交记录同步到本地存储"""
+    if not args:
+        print("用法: oja sync <课程ID>")
+        return False
+    course_id = args[0]
+
+    from services import create_requester
+    from services.course_sync import sync_course
+    from services.store import open_store
+
+    requester = create_requester()
+    if not requester:
+        return False
+    # 同步需要本地存储，即使配置中未启用
+    if requester.store is None:
+        requester.store = open_store()
+        if requester.store is None:
+            return False
+
+    print(f"\n[\x1b[0;36m!\x1b[0m] 开始同步课程 {course_id} (并发数 {config.SYNC_WORKERS})...")
+    stats = sync_course(requester, requester.store, course_id)
+    if stats is None:
+        return False
+
+    rate = stats['requests'] / stats['elapsed'] if stats['elapsed'] > 0 else 0
+    print(f"[\x1b[0;32m+\x1b[0m] 同步完成: {stats['homeworks']} 个作业, {stats['problems']} 道题目, "
+          f"{stats['requests']} 次请求, 用时 {stats['elapsed']:.1f}s ({rate:.1f} 请求/秒)")
+
+    from services.record_sync import report_record_changes
+    report_record_changes(requester.store)
+    return stats['errors'] == 0
+
+
+
+@_network_errors
+def run_export(args):
+    """oja export <course> [dir] [--offline]: 把整个课程的题目导出为Markdown，未变化的文件不重写"""
+    parsed = _parse_args(args)
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if not positional:
+        print("用法: oja export <课程ID> [导出目录] [--offline]")
+        return False
+    course_id = positional[0]
+
+    import os
+    import utils.workdir
+    from services.export import export_course
+
+    out_dir = os.path.abspath(positional[1]) if len(positional) > 1 else os.path.join(utils.workdir.get(), 'export')
+    requester = _requester(opts)
+    if not requester:
+        return False
+
+    print(f"\n[\x1b[0;36m!\x1b[0m] 导出课程 {course_id} 到 {out_dir}...")
+    stats = export_course(requester, course_id, out_dir)
+    if stats is None:
+        return False
+
+    print(f"[\x1b[0;32m+\x1b[0m] 导出完成: {stats['homeworks']} 个作业, 新增 {stats['new']}, 更新 {stats['updated']}, "
+          f"未变化 {stats['unchanged']}, 用时 {stats['elapsed']:.1f}s ({stats['path']})")
+    return stats['errors'] == 0
+
+
+def run_search(args):
+    """oja search <关键词...> [--limit N] [--json|--ndjson]: 在本地保存的所有题目中搜索，不需要网络"""
+    parsed = _parse_args(args, options=('--limit',))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if not positional:
+        print("用法: oja search <关键词...> [--limit 数量] [--json|--ndjson]")
+        return False
+    query = ' '.join(positional)
+    out = _Output(opts)
+
+    import re
+    import time
+    from services.store import open_store
+
+    with out.progress():
+        store = open_store()
+        if store is None:
+            return False
+        started = time.perf_counter()
+        hits = store.search_problems(query, limit=int(opts.get('limit') or 20))
+        elapsed = (time.perf_counter() - started) * 1000
+
+    if out.mode:
+        out.emit(hits)
+        return True
+
+    if not hits:
+        print(f"[\x1b[0;33m!\x1b[0m] 没有找到包含 '{query}' 的题目 ({elapsed:.1f} ms)"
+              + ("" if store.searchable else "，当前SQLite不支持FTS5，使用逐条扫描"))
+        return True
+
+    print(f"[\x1b[0;32m+\x1b[0m] 找到 {len(hits)} 道题目 ({elapsed:.1f} ms):")
+    pattern = re.compile('|'.join(re.escape(term) for term in query.split()), re.IGNORECASE)
+
+    def highlight(text):
+        return pattern.sub(lambda m: f"\x1b[0;33m{m.group(0)}\x1b[0m", text)
+
+    for hit in hits:
+        location = f"{hit['course_id']}/{hit['homework_id']}/{hit['problem_id']}"
+        homework = f" - {hit['homework_name']}" if hit['homework_name'] else ""
+        print(f"  [{location}] {highlight(hit['name'])}{homework}")
+        if hit['tags']:
+            print(f"      标签: {hit['tags']}")
+        if hit['snippet']:
+            print(f"      {highlight(hit['snippet'])}")
+    return True
+
+def run_daemon(args):
+    """oja daemon [stop]: 启动常驻进程保持登录状态与缓存，之后的oja调用都交给它执行"""
+    from services import daemon
+
+    if not daemon.supported():
+        print("[\x1b[0;31mx\x1b[0m] 当前系统不支持Unix域套接字，无法使用守护进程")
+        return False
+
+    if args and args[0] == 'stop':
+        if daemon.stop():
+            print("[\x1b[0;32m+\x1b[0m] 守护进程已停止")
+            return True
+        print("[\x1b[0;33m!\x1b[0m] 守护进程没有在运行")
+        return False
+
+    from services import create_requester
+    from services.auth_service import keep_warm
+
+    requester = create_requester()
+    if not requester:
+        return False
+    keep_warm(requester)
+
+    import main
+    return daemon.OjaDaemon(main.main).serve()
+
+
+# ---- 一次性子命令: 只发送所需的请求，输出表格或JSON，便于脚本与编辑器调用 ----
+
+COMMON_FLAGS = ('--json', '--ndjson', '--offline')
+
+
+def _parse_args(args, flags=(), options=()):
+    """把参数分为位置参数与选项（--flag 或 --option <值>）
+
+    Returns:
+        (位置参数列表, {选项名: 值，flag为True})，有未知选项或缺少值时返回None
+    """
+    positional, opts = [], {}
+    flags = COMMON_FLAGS + tuple(flags)
+    it = iter(args)
+    for arg in it:
+        if arg in flags:
+            opts[arg[2:]] = True
+        elif arg in options:
+            value = next(it, None)
+            if value is None:
+                print(f"[\x1b[0;31mx\x1b[0m] 选项 {arg} 缺少参数值")
+                return None
+            opts[arg[2:]] = value
+        elif arg.startswith('--'):
+            print(f"[\x1b[0;31mx\x1b[0m] 未知选项: {arg}")
+            return None
+        else:
+            positional.append(arg)
+    return positional, opts
+
+
+class _Output:
+    """--json输出一个JSON文档，--ndjson每行输出一个JSON对象，否则输出表格
+
+    JSON模式下获取数据时的进度信息改写到标准错误，标准输出只有JSON。
+    """
+
+    def __init__(self, opts):
+        import sys
+        self.mode = 'ndjson' if opts.get('ndjson') else 'json' if opts.get('json') else None
+        self.stdout = sys.stdout  # progress()期间JSON仍写到真正的标准输出
+
+    def progress(self):
+        import sys
+        import contextlib
+        return contextlib.redirect_stdout(sys.stderr) if self.mode else contextlib.nullcontext()
+
+    def emit(self, data):
+        import json
+        if self.mode == 'json':
+            print(json.dumps(data, ensure_ascii=False, indent=2), file=self.stdout, flush=True)
+        elif self.mode == 'ndjson':
+            for item in data if isinstance(data, list) else [data]:
+                print(json.dumps(item, ensure_ascii=False), file=self.stdout, flush=True)
+
+
+def _requester(opts):
+    from services import create_requester
+    return create_requester(bool(opts.get('offline')))
+
+
+def _resolve_course(requester, opts, homework_id=None):
+    """确定课程ID: --course，本地存储中该作业所属的课程，DEFAULT_COURSE，
+    只有一门课程时即为该课程，否则在各课程的作业列表中查找该作业"""
+    if opts.get('course'):
+        return opts['course']
+
+    store = getattr(requester, 'store', None)
+    if homework_id is not None and store is not None:
+        course_id = store.find_homework_course(homework_id)
+        if course_id:
+            return course_id
+
+    if config.DEFAULT_COURSE:
+        return config.DEFAULT_COURSE
+
+    courses = requester.get_my_courses()
+    courses = courses.get('list') if courses else None
+    if not courses:
+        print("[\x1b[0;31mx\x1b[0m] 无法获取课程列表或列表为空")
+        return None
+    if len(courses) == 1:
+        return courses[0]['course_id']
+
+    if homework_id is not None:
+        for course in courses:
+            homeworks = requester.get_homeworks_list(course['course_id'])
+            if any(str(hw.get('homeworkId')) == str(homework_id) for hw in (homeworks or {}).get('list') or []):
+                return course['course_id']
+        print(f"[\x1b[0;31mx\x1b[0m] 在所有课程中都没有找到作业 {homework_id}")
+        return None
+
+    print("[\x1b[0;31mx\x1b[0m] 你有多门课程，请用 --course <课程ID> 指定（或设置DEFAULT_COURSE）:")
+    for course in courses:
+        print(f"  [{course['course_id']}] {course.get('course_name', '')}")
+    return None
+
+
+@_network_errors
+def run_homeworks(args):
+    """oja homeworks [--course ID] [--json|--ndjson]: 显示课程的作业列表"""
+    parsed = _parse_args(args, options=('--course',))
+    if parsed is None:
+        return False
+    _, opts = parsed
+    out = _Output(opts)
+
+    from services import fetch_and_process_homeworks
+    with out.progress():
+        requester = _requester(opts)
+        course_id = requester and _resolve_course(requester, opts)
+        homeworks = course_id and fetch_and_process_homeworks(requester, course_id)
+    if not homeworks:
+        return False
+    homeworks.sort(key=lambda hw: hw.id)
+
+    if out.mode:
+        out.emit([dict(course_id=course_id, **hw.to_dict()) for hw in homeworks])
+        return True
+    from ui.display import display_homeworks
+    return display_homeworks(homeworks)
+
+
+@_network_errors
+def run_problems(args):
+    """oja problems <作业ID> [--course ID] [--json|--ndjson]: 显示作业的题目、最新状态与提交记录"""
+    parsed = _parse_args(args, options=('--course',))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if len(positional) != 1:
+        print("用法: oja problems <作业ID> [--course 课程ID] [--json|--ndjson] [--offline]")
+        return False
+    homework_id = positional[0]
+    out = _Output(opts)
+
+    from services import fetch_and_process_problems
+    with out.progress():
+        requester = _requester(opts)
+        course_id = requester and _resolve_course(requester, opts, homework_id)
+        problems = course_id and fetch_and_process_problems(requester, homework_id, course_id)
+    if not problems:
+        return False
+
+    if out.mode:
+        out.emit([dict(course_id=course_id, homework_id=homework_id, **problem.to_dict()) for problem in problems])
+        return True
+    from ui.display import display_problems_list
+    display_problems_list(problems)
+    return True
+
+
+def _submission_files(paths):
+    """要提交的文件: 指定的文件或目录中的.java文件；未指定时为工作目录中的Main.java，没有则为所有.java文件"""
+    import os
+    import utils.workdir
+    from services.local_runner import list_java_files, default_java_files
+
+    if not paths:
+        return default_java_files(utils.workdir.get())
+
+    files = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            files.extend(list_java_files(path))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"[\x1b[0;31mx\x1b[0m] 文件不存在: {path}")
+            return None
+    return list(dict.fromkeys(files))
+
+
+def _grading_output(out, result, record_id, **ids):
+    """显示或输出一个批改结果，返回是否全部通过"""
+    from services.models import GradingResult
+    if result['resultState'] == 'JG':
+        if out.mode:
+            out.emit(dict(ids, record_id=record_id, result_state='JG'))
+        else:
+            print(f"[\x1b[0;33m!\x1b[0m] 提交 {record_id} 仍在批改中，请稍后用 oja result {record_id} 查看")
+        return False
+
+    grading_result = GradingResult.from_api(result, record_id)
+    if out.mode:
+        out.emit(dict(ids, **grading_result.to_dict()))
+    else:
+        from ui.display import display_grading_result
+        display_grading_result(grading_result)
+    return grading_result.all_correct
+
+
+@_network_errors
+def run_submit(args):
+    """oja submit <作业ID> <题目ID> [文件或目录...] [--course ID] [--force] [--no-wait] [--json|--ndjson]
+
+    提交前只获取该题目的提交记录（用于检查重复提交与确认提交是否成功），然后轮询批改结果。
+    """
+    parsed = _parse_args(args, flags=('--force', '--no-wait'), options=('--course',))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if len(positional) < 2:
+        print("用法: oja submit <作业ID> <题目ID> [文件或目录...] [--course 课程ID] [--force] [--no-wait] [--json|--ndjson]")
+        return False
+    homework_id, problem_id = positional[:2]
+    out = _Output(opts)
+
+    from services.models import Problem
+    from services.data_service import load_problem, poll_grading_result
+    from ui.submission import read_submission_hashes, find_duplicate_submission
+
+    with out.progress():
+        files = _submission_files(positional[2:])
+        if not files:
+            print("[\x1b[0;31mx\x1b[0m] 没有找到要提交的.java文件")
+            return False
+        file_hashes = read_submission_hashes(files)
+        if file_hashes is None:
+            return False
+
+        requester = _requester(opts)
+        course_id = requester and _resolve_course(requester, opts, homework_id)
+        if not course_id:
+            return False
+
+        # 题目详情只用于确定轮询间隔，本地存储中有就用，没有则按默认时间限制轮询
+        problem = Problem(problem_id, '')
+        store = getattr(requester, 'store', None)
+        info = store.load_problem_info(course_id, homework_id, problem_id) if store is not None else None
+        if info:
+            problem.set_details(info)
+        load_problem(requester, problem, homework_id, course_id, details=False)
+
+        duplicate = find_duplicate_submission(problem.records, file_hashes)
+        if duplicate and not opts.get('force'):
+            print(f"[\x1b[0;31mx\x1b[0m] 文件内容与上一次提交 {duplicate.record_id} ({duplicate.submission_time}) "
+                  f"完全相同，提交已取消（使用 --force 仍然提交）")
+            return False
+
+        print(f"[\x1b[0;36m!\x1b[0m] 提交 {', '.join(file_hashes)} 到题目 {problem_id}...")
+        submitted = requester.submit_homework(homework_id, problem_id, course_id, files,
+                                              known_record_ids=[r.record_id for r in problem.records])
+        if not submitted or 'recordId' not in submitted:
+            return False
+        record_id = submitted['recordId']
+        ids = {'course_id': course_id, 'homework_id': homework_id, 'problem_id': problem_id}
+
+        if opts.get('no-wait'):
+            result = None
+        else:
+            print(f"[\x1b[0;36m!\x1b[0m] 已提交 (ID: {record_id})，等待批改结果...")
+            result = poll_grading_result(requester, record_id, course_id, homework_id,
+                                         time_limit=problem.java_time_limit)
+            if not result:
+                print("[\x1b[0;31mx\x1b[0m] 获取批改结果失败")
+                return False
+
+    if opts.get('no-wait'):
+        if out.mode:
+            out.emit(dict(ids, record_id=record_id, result_state=None))
+        else:
+            print(f"[\x1b[0;32m+\x1b[0m] 已提交 (ID: {record_id})，用 oja result {record_id} 查看结果")
+        return True
+    return _grading_output(out, result, record_id, **ids)
+
+
+@_network_errors
+def run_result(args):
+    """oja result <提交ID> [--course ID --homework ID] [--wait] [--json|--ndjson]: 显示一次提交的批改结果
+
+    提交所属的课程与作业从本地存储中查找，找不到时需要用--course与--homework指定。
+    """
+    parsed = _parse_args(args, flags=('--wait',), options=('--course', '--homework'))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if len(positional) != 1:
+        print("用法: oja result <提交ID> [--course 课程ID --homework 作业ID] [--wait] [--json|--ndjson] [--offline]")
+        return False
+    record_id = positional[0]
+    out = _Output(opts)
+
+    from services.data_service import poll_grading_result
+    with out.progress():
+        requester = _requester(opts)
+        if not requester:
+            return False
+
+        course_id, homework_id = opts.get('course'), opts.get('homework')
+        store = getattr(requester, 'store', None)
+        found = store.find_record(record_id) if store is not None else None
+        if found and not (course_id and homework_id):
+            course_id, homework_id = course_id or found[0], homework_id or found[1]
+        if not (course_id and homework_id):
+            print(f"[\x1b[0;31mx\x1b[0m] 本地没有提交 {record_id} 的记录，请用 --course 与 --homework 指定所属的课程与作业")
+            return False
+
+        result = requester.get_submission_result(record_id, course_id, homework_id)
+        if result and result.get('resultState') == 'JG' and opts.get('wait'):
+            result = poll_grading_result(requester, record_id, course_id, homework_id)
+        if not result:
+            print("[\x1b[0;31mx\x1b[0m] 获取批改结果失败")
+            return False
+
+    ids = {'course_id': course_id, 'homework_id': homework_id}
+    if found and found[2]:
+        ids['problem_id'] = found[2]
+    return _grading_output(out, result, record_id, **ids)
+
+
+@_network_errors
+def run_tests(args):
+    """oja tests <作业ID> [--course ID] [--json|--ndjson]: 下载作业所有题目的单元测试文件到 unittests/ 目录"""
+    parsed = _parse_args(args, options=('--course',))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if len(positional) != 1:
+        print("用法: oja tests <作业ID> [--course 课程ID] [--json|--ndjson]")
+        return False
+    homework_id = positional[0]
+    out = _Output(opts)
+
+    from services import fetch_problem_list, download_homework_unit_tests
+    with out.progress():
+        requester = _requester(opts)
+        course_id = requester and _resolve_course(requester, opts, homework_id)
+        problems = course_id and fetch_problem_list(requester, homework_id, course_id)
+        if not problems:
+            return False
+        results = download_homework_unit_tests(course_id, homework_id, problems)
+
+    if out.mode:
+        out.emit([{'course_id': course_id, 'homework_id': homework_id, 'problem_id': problem.id,
+                   'name': problem.name, 'status': status, 'detail': detail}
+                  for problem, status, detail in results])
+    else:
+        status_text = {
+            'new': "\x1b[0;32m新下载\x1b[0m",
+            'updated': "\x1b[0;36m已更新\x1b[0m",
+            'unchanged': "未变化",
+            'missing': "\x1b[0;33m暂无\x1b[0m",
+            'error': "\x1b[0;31m失败\x1b[0m",
+        }
+        for problem, status, detail in results:
+            print(f"  [{problem.id}] {problem.name}: {status_text[status]}"
+                  + (f" - {detail}" if status in ('new', 'updated', 'error') else ""))
+    return all(status != 'error' for _, status, _ in results)
+
+
+@_network_errors
+def run_trends(args):
+    """oja trends <作业ID> <题目ID> [--course ID] [--json|--ndjson]: 显示题目各测试用例在历次提交中的耗时与内存趋势"""
+    parsed = _parse_args(args, options=('--course',))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if len(positional) != 2:
+        print("用法: oja trends <作业ID> <题目ID> [--course 课程ID] [--json|--ndjson] [--offline]")
+        return False
+    homework_id, problem_id = positional
+    out = _Output(opts)
+
+    from services import fetch_problem_list
+    from services.data_service import load_problem
+    from services.trends import load_problem_results, build_case_trends
+    with out.progress():
+        requester = _requester(opts)
+        course_id = requester and _resolve_course(requester, opts, homework_id)
+        problems = course_id and fetch_problem_list(requester, homework_id, course_id)
+        if not problems:
+            return False
+        problem = next((problem for problem in problems if str(problem.id) == problem_id), None)
+        if problem is None:
+            print(f"[\x1b[0;31mx\x1b[0m] 作业 {homework_id} 中没有题目 {problem_id}")
+            return False
+
+        # 先刷新提交记录，新的提交才会出现在趋势中
+        load_problem(requester, problem, homework_id, course_id)
+        results = load_problem_results(requester, course_id, homework_id, problem_id)
+        if results is None:
+            print("[\x1b[0;31mx\x1b[0m] 未启用本地存储(ENABLE_LOCAL_STORE)，无法统计趋势")
+            return False
+        trends = build_case_trends(results, problem)
+
+    if out.mode:
+        out.emit({'course_id': course_id, 'homework_id': homework_id, 'problem_id': problem_id,
+                  'submissions': [{'record_id': record_id, 'submission_time': submission_time}
+                                  for record_id, submission_time, _ in results],
+                  'cases': [trend.to_dict() for trend in trends]})
+        return True
+    if not results:
+        print("[\x1b[0;33m!\x1b[0m] 还没有批改完成的提交")
+        return True
+    from ui.display import display_case_trends
+    display_case_trends(problem.name, len(results), trends)
+    return True
+
+
+class _SubmitJob:
+    """oja submit-all 中一道题目的提交"""
+    __slots__ = ('problem', 'files', 'state', 'record_id', 'result', 'message')
+
+    # 未得到批改结果时的状态: 显示文本与颜色
+    STATES = {
+        'pending': ("Pending", ""),
+        'same': ("Same", "\x1b[0;33m"),
+        'failed': ("Failed", "\x1b[0;31m"),
+        'judging': ("Judging", "\x1b[0;36m"),
+        'timeout': ("Timeout", "\x1b[0;33m"),
+    }
+
+    def __init__(self, problem, files):
+        self.problem = problem
+        self.files = files
+        self.state = 'pending'
+        self.record_id = None
+        self.result = None
+        self.message = ""
+
+    def status(self):
+        if self.result:
+            return self.result.result_state, self.result.status_color
+        return self.STATES[self.state]
+
+    def to_dict(self, **ids):
+        data = dict(ids, problem_id=self.problem.id, name=self.problem.name, files=self.files,
+                    state=self.state, record_id=self.record_id, message=self.message)
+        if self.result:
+            data.update(self.result.to_dict())
+        return data
+
+
+def _submission_jobs(work_dir, problems, mappings):
+    """由 题目ID=路径 参数与工作目录下的子目录确定每道题目要提交的文件"""
+    import os
+    from services.local_runner import default_java_files, match_problem_dirs
+
+    by_id = {str(problem.id): problem for problem in problems}
+    dirs = {}
+    for mapping in mappings:
+        problem_id, _, path = mapping.partition('=')
+        if problem_id not in by_id or not path:
+            print(f"[\x1b[0;31mx\x1b[0m] 无效的映射 '{mapping}'，应为 题目ID=目录，题目ID须属于该作业")
+            return None
+        dirs[problem_id] = os.path.abspath(path)
+    if not dirs:
+        dirs = {str(problem.id): path for problem, path in match_problem_dirs(work_dir, problems)}
+
+    jobs = []
+    for problem in problems:
+        path = dirs.get(str(problem.id))
+        if path is None:
+            continue
+        files = default_java_files(path) if os.path.isdir(path) else [path]
+        if files:
+            jobs.append(_SubmitJob(problem, files))
+    return jobs
+
+
+@_network_errors
+def run_submit_all(args):
+    """oja submit-all <作业ID> [题目ID=目录...] [--course ID] [--force] [--json|--ndjson]
+
+    把工作目录下与题目对应的子目录（目录名为题目ID、"题目ID_名称"或题目名称）同时提交，
+    与上一次提交相同的题目跳过，然后在同一个轮询循环中等待所有批改结果并实时更新汇总表。
+    """
+    parsed = _parse_args(args, flags=('--force',), options=('--course',))
+    if parsed is None:
+        return False
+    positional, opts = parsed
+    if not positional:
+        print("用法: oja submit-all <作业ID> [题目ID=目录...] [--course 课程ID] [--force] [--json|--ndjson]")
+        return False
+    homework_id = positional[0]
+    out = _Output(opts)
+
+    import utils.workdir
+    from concurrent.futures import ThreadPoolExecutor
+    from services import fetch_problem_list
+    from services.data_service import load_problem, poll_grading_results
+    from services.models import GradingResult
+    from ui.display import SubmissionBoard
+    from ui.submission import read_submission_hashes, find_duplicate_submission
+
+    with out.progress():
+        requester = _requester(opts)
+        course_id = requester and _resolve_course(requester, opts, homework_id)
+        problems = course_id and fetch_problem_list(requester, homework_id, course_id)
+        if not problems:
+            return False
+
+        jobs = _submission_jobs(utils.workdir.get(), problems, positional[1:])
+        if jobs is None:
+            return False
+        if not jobs:
+            print(f"[\x1b[0;31mx\x1b[0m] 工作目录 {utils.workdir.get()} 下没有与题目对应的目录"
+                  f"（目录名应为题目ID、\"题目ID_名称\"或题目名称），也可以用 题目ID=目录 指定")
+            return False
+        ids = {'course_id': course_id, 'homework_id': homework_id}
+
+        def submit(job):
+            file_hashes = read_submission_hashes(job.files)
+            if file_hashes is None:
+                job.state, job.message = 'failed', "无法读取文件"
+                return
+            load_problem(requester, job.problem, homework_id, course_id, details=False)
+            duplicate = find_duplicate_submission(job.problem.records, file_hashes)
+            if duplicate and not opts.get('force'):
+                job.state, job.record_id = 'same', duplicate.record_id
+                job.message = "与上一次提交相同，已跳过"
+                return
+            submitted = requester.submit_homework(homework_id, job.problem.id, course_id, job.files,
+                                                  known_record_ids=[r.record_id for r in job.problem.records])
+            if submitted and 'recordId' in submitted:
+                job.state, job.record_id = 'judging', submitted['recordId']
+            else:
+                job.state, job.message = 'failed', "提交失败"
+
+        # 提交接口的客户端限速(RATE_LIMITS['submit'])决定实际的提交速率
+        print(f"[\x1b[0;36m!\x1b[0m] 提交 {len(jobs)} 道题目...")
+        with ThreadPoolExecutor(max_workers=min(config.SUBMIT_WORKERS, len(jobs)),
+                                thread_name_prefix='oja-submit') as executor:
+            for job, error in zip(jobs, executor.map(_capture(submit), jobs)):
+                if error:
+                    job.state, job.message = 'failed', str(error)
+
+        # 所有等待批改的提交在同一个轮询循环中查询，结果到达时更新汇总表
+        live = out.mode is None and out.stdout.isatty()
+        board = SubmissionBoard(jobs)
+        if live:
+            board.show()
+        by_record = {job.record_id: job for job in jobs if job.state == 'judging'}
+        if out.mode == 'ndjson':
+            out.emit([job.to_dict(**ids) for job in jobs if job.state != 'judging'])
+
+        def on_result(record_id, result):
+            job = by_record[record_id]
+            if result:
+                job.state, job.result = 'done', GradingResult.from_api(result, record_id)
+            else:
+                job.state, job.message = 'failed', "获取批改结果失败"
+            if out.mode == 'ndjson':
+                out.emit(job.to_dict(**ids))
+            elif live:
+                board.refresh()
+
+        if by_record:
+            # 汇总表原位更新期间，工作线程中的重试提示显示在表格下方，不直接打印以免打乱表格
+            if live:
+                requester.on_notice = board.notice
+            try:
+                poll_grading_results(requester, list(by_record), course_id, homework_id, on_result=on_result)
+            finally:
+                requester.on_notice = None
+                if live:
+                    board.clear_notice()
+        for job in by_record.values():
+            if job.state == 'judging':
+                job.state, job.message = 'timeout', "批改超时，请稍后用 oja result 查看"
+                if out.mode == 'ndjson':
+                    out.emit(job.to_dict(**ids))
+
+    if out.mode == 'json':
+        out.emit([job.to_dict(**ids) for job in jobs])
+    elif out.mode is None:
+        if live:
+            board.refresh()
+        else:
+            board.write()
+        for job in jobs:
+            if job.message:
+                print(f"  [{job.problem.id}] {job.problem.name}: {job.message}")
+    return all(job.state == 'same' or (job.result and job.result.all_correct) for job in jobs)
+
+
+def _capture(fn):
+    """包装fn，返回其抛出的异常而不是抛出（用于executor.map中逐项记录错误）"""
+    def wrapper(*args):
+        try:
+            fn(*args)
+        except Exception as e:
+            return e
+        return None
+    return wrapper
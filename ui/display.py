@@ -1,17 +1,22 @@
-from utils import records_status_color, save_problem_to_file
-from datetime import datetime
-import re
+import sys
+
+from services.models import Course
+from ui.table import Table, LiveTable, Column
+
+CASE_COLUMNS = [Column("No.", 3), Column("Status", 8), Column("Test Case", 17, max_width=17),
+                Column("Time(ms)", 10), Column("Memory(MB)", 12), Column("Message", 27, max_width=27)]
 
 
 def display_courses(requester):
-    """获取并显示课程列表"""
+    """获取并显示课程列表，返回Course列表"""
     print(f"\n[\x1b[0;36m!\x1b[0m] 获取课程列表...")
     courses = requester.get_my_courses()
 
     if courses and 'list' in courses and len(courses['list']) > 0:
+        courses = [Course.from_api(course) for course in courses['list']]
         print("[\x1b[0;32m+\x1b[0m] 您的课程列表:")
-        for i, course in enumerate(courses['list']):
-            print(f"  {i + 1}. [{course['course_id']}] {course['course_name']} - {course['description']}")
+        for i, course in enumerate(courses):
+            print(f"  {i + 1}. [{course.id}] {course.name} - {course.description}")
         return courses
     else:
         print("[\x1b[0;31mx\x1b[0m] 无法获取课程列表或列表为空")
@@ -21,7 +26,7 @@ def display_homeworks(enriched_homeworks):
     """格式化显示作业列表
 
     Args:
-        enriched_homeworks: 包含详细信息的作业列表
+        enriched_homeworks: Homework列表
 
     Returns:
         布尔值，表示是否成功显示作业列表
@@ -30,94 +35,20 @@ def display_homeworks(enriched_homeworks):
         print("[\x1b[0;31mx\x1b[0m] 没有可显示的作业")
         return False
 
-    now = datetime.now()
-    print("[\x1b[0;32m+\x1b[0m] 该课程的作业列表(按截止日期排序):")
-
-    # 表头
-    header = "  {:<3} | {:<15} | {:<8} | {:<8} | {:<10} | {:<7} | {:<21}".format(
-        "ID", "Name", "Status", "Problems", "Completion", "Score", "Due Date"
-    )
-    print(header)
-    print("-" * len(header))  # 分隔线长度与表头一致
-
-    # 打印作业列表
+    table = Table([Column("ID", 3), Column("Name", 15), Column("Status", 8), Column("Problems", 8),
+                   Column("Completion", 10), Column("Score", 7), Column("Due Date", 21)], indent="  ")
     for hw in enriched_homeworks:
-        # 获取基本信息
-        hw_id = hw['homeworkId']
-        hw_name = hw['homeworkName']
-        due_date = hw.get('nextDate', 'No Due Date')
-        problems_count = hw.get('problemsCount', 0)
-
-        # 初始默认值
-        status = "Unknown"
-        status_color = ""
-        completion = "0%"
-        score = "0/0"
-
-        # 根据state字段判断状态
-        # state: 1=未开始, 2=进行中, 3=已截止, 4=已完成
-        state = hw.get('state', 0)
-        if state == 1:
-            status = "Pending"
-            status_color = "\x1b[0;33m"
-        elif state == 2:
-            status = "Active"
-            status_color = "\x1b[0;36m"
-        elif state == 3:
-            status = "Closed"
-            status_color = "\x1b[0;31m"
-        elif state == 4:
-            status = "Finished"
-            status_color = "\x1b[0;32m"
-
-        # 判断截止时间
-        if due_date != 'No Due Date':
-            due_datetime = datetime.strptime(due_date, '%Y-%m-%d %H:%M:%S')
-            if now > due_datetime and state == 2:
-                status = "Expired"
-                status_color = "\x1b[0;31m"
-
-        # 从详细信息中提取完成度和得分
-        if 'details' in hw and hw['details']:
-            details = hw['details']
-
-            # 提取分数信息
-            if 'currentScore' in details and 'totalScore' in details:
-                current = details.get('currentScore', 0)
-                total = details.get('totalScore', 100.0)
-                score = f"{current}/{int(total)}"
-
-                # 基于完成率计算完成度
-                if 'attemptRate' in details:
-                    attempt_rate = details.get('attemptRate', 0)
-                    completion = f"{int(attempt_rate)}%"
-
-                # 如果分数是满分，更新状态
-                if current == total and total > 0:
-                    status = "Complete"
-                    status_color = "\x1b[0;32m"
-
-        # 将状态文本转换为带颜色的版本
-        colored_status = f"{status_color}{status}\x1b[0m" if status_color else status
-
-        # 先输出格式化的行，不带颜色（用于正确对齐）
-        row = "  {:<3} | {:<15} | {:<8} | {:<8} | {:<10} | {:<7} | {:<21}".format(
-            hw_id, hw_name, status, problems_count, completion, score, due_date
-        )
-
-        # 替换状态文本为彩色版本
-        if status_color:
-            row = row.replace(status, colored_status, 1)
-
-        print(row)
-
+        table.add_row([hw.id, hw.name, hw.status, hw.problems_count, hw.completion_text, hw.score_text, hw.due_date],
+                      [None, None, hw.status_color])
+    table.write(before=["[\x1b[0;32m+\x1b[0m] 该课程的作业列表(按截止日期排序):"])
     return True
 
-def display_problems_list(enriched_problems):
+def display_problems_list(enriched_problems, unit_tests=None):
     """格式化显示问题列表，包括提交状态
 
     Args:
-        enriched_problems: 包含详细信息和提交记录的问题列表
+        enriched_problems: Problem列表
+        unit_tests: 可选，problemId -> 是否有单元测试文件（None表示探测中）
 
     Returns:
         布尔值，表示是否成功显示问题列表
@@ -126,84 +57,32 @@ def display_problems_list(enriched_problems):
         print("[\x1b[0;31mx\x1b[0m] 没有可显示的题目")
         return False
 
-    # 显示问题列表
-    print("\r[\x1b[0;32m+\x1b[0m] 当前作业中的题目列表:")
-
-    # 定义表头 - 更新表头以包含状态列
-    print(" {:<2} | {:<30} | {:<13} | {:<10} | {:<15}".format(
-        "No.", "Problem Name", "Status", "Difficulty", "Time Limit"
-    ))
-    print("-" * 85)  # 增加分隔线长度
-
+    table = Table([Column("No.", 3), Column("Problem Name", 30, max_width=40), Column("Status", 13),
+                   Column("Difficulty", 10), Column("Time Limit", 15), Column("Tests", 5)])
     for i, problem in enumerate(enriched_problems):
-        problem_name = re.sub(r'[^\w\s]', '', problem.get('problemName', 'Unknown'))
-        details = problem.get('details', {})
-
-        # 提取状态信息
-        status = "Not Attempted"
-        status_color = "\x1b[0;37m"  # 默认浅灰色
-
-        if 'submission_records' in problem and problem['submission_records']:
-            # 获取最新提交
-            latest = problem['submission_records'][0]
-            result_state = latest.get('resultState', '')
-            status, status_color = records_status_color(result_state)
-
-        colored_status = f"{status_color}{status}\x1b[0m"
-
-        # 提取难度
-        difficulty = details.get('difficulty', 0)
-        difficulty_levels = ["Unknown", "Noob", "Easy", "Normal", "Hard", "Demon"]
-        difficulty_text = difficulty_levels[min(difficulty, 5)]
-
-        # 提取时间限制
-        time_limit = "Unknown"
-        if 'timeLimit' in details and isinstance(details['timeLimit'], dict):
-            if 'Java' in details['timeLimit']:
-                time_limit = f"{details['timeLimit']['Java']} ms"
-            elif 'Junit' in details['timeLimit']:  # Check for Junit if Java is not present
-                time_limit = f"{details['timeLimit']['Junit']} ms"
-            elif details['timeLimit']:  # Fallback to the first available time limit
-                first_lang = next(iter(details['timeLimit']))
-                time_limit = f"{details['timeLimit'][first_lang]} ms ({first_lang})"
-
-        # 基本格式，先不带颜色
-        base_line = " {:<2}  | {:<30} | {:<13} | {:<10} | {:<15}".format(
-            i + 1, problem_name, status, difficulty_text, time_limit
-        )
-
-        # 根据难度添加颜色代码，但保持格式
-        if difficulty == 1:
-            colored_diff = f"\x1b[0;36mNoob\x1b[0m"  # 青色 - Noob
-        elif difficulty == 2:
-            colored_diff = f"\x1b[0;32mEasy\x1b[0m"  # 绿色 - Easy
-        elif difficulty == 3:
-            colored_diff = f"\x1b[0;33mNormal\x1b[0m"  # 黄色 - Normal
-        elif difficulty == 4:
-            colored_diff = f"\x1b[0;31mHard\x1b[0m"  # 红色 - Hard
-        elif difficulty == 5:
-            colored_diff = f"\x1b[0;35mDemon\x1b[0m"  # 紫色 - Demon
+        # 单元测试可用性
+        has_tests = unit_tests.get(problem.id) if unit_tests else None
+        if has_tests is None:
+            tests_text = "..."
         else:
-            colored_diff = "Unknown"
-
-        # 构造包含颜色的行，使用固定位置替换文本
-        parts = base_line.split("|")
-        parts[2] = " " + colored_status + " " * (14 - len(status))  # 状态列
-        parts[3] = " " + colored_diff + " " * (11 - len(difficulty_text))  # 难度列
-
-        colored_line = "|".join(parts)
-        print(colored_line)
+            tests_text = "Yes" if has_tests else "-"
 
+        table.add_row([i + 1, problem.list_name, problem.latest_status, problem.difficulty_label,
+                       problem.time_limit_text, tests_text],
+                      [None, None, problem.latest_status_color, problem.difficulty_color, None,
+                       "\x1b[0;32m" if has_tests else None])
+    table.write(before=["\r[\x1b[0;32m+\x1b[0m] 当前作业中的题目列表:"])
     return True
 
 
-def display_problems_info(enriched_problems, selected_course, selected_homework):
+def display_problems_info(enriched_problems, selected_course, selected_homework, warmer=None):
     """处理用户选择问题并展示详细信息，包括提交记录和保存选项
 
     Args:
-        enriched_problems: 包含详细信息的问题列表
+        enriched_problems: Problem列表
         selected_course: 选中的课程对象或课程ID
         selected_homework: 选中的作业对象或作业ID
+        warmer: 可选，ProblemWarmer，用于按需加载尚未加载的题目
 
     Returns:
         选择的问题对象，如果用户没有选择或退出则返回None
@@ -227,108 +106,14 @@ def display_problems_info(enriched_problems, selected_course, selected_homework)
         problem_index = int(problem_input) - 1
         if 0 <= problem_index < len(enriched_problems):
             selected_problem = enriched_problems[problem_index]
-            problem_id = selected_problem['problemId']
+            if warmer and not selected_problem.loaded:
+                print(f"[\x1b[0;36m!\x1b[0m] 加载题目详情...")
+                if warmer.ensure(selected_problem) is None:
+                    return None  # 已显示失败原因，回到题目列表
 
             # 使用已获取的问题详情，不再重新请求
-            problem_info = selected_problem.get('details', {})
-
-            if problem_info:
-                # 显示题目基本信息
-                print(f"\n{'-' * 40}")
-                print(f"题目编号: {problem_index + 1}")
-                print(f"题目名称: {selected_problem['problemName']}")
-
-                # 显示题目的其他信息
-                print(f"{'-' * 40}")
-                print(f"题目类型: {problem_info.get('problemType', '未知')}")
-
-                # 显示时间限制
-                if 'timeLimit' in problem_info:
-                    time_limits = problem_info['timeLimit']
-                    print("时间限制: ", end='')
-                    for lang, limit in time_limits.items():
-                        print(f"{lang}: {limit} ms")
-
-                # 显示内存限制
-                if 'memoryLimit' in problem_info:
-                    memory_limits = problem_info['memoryLimit']
-                    print("内存限制: ", end='')
-                    for lang, limit in memory_limits.items():
-                        print(f"{lang}: {limit} MB")
-
-                # 显示IO模式
-                io_mode = problem_info.get('ioMode', 0)
-                io_mode_text = "标准输入输出" if io_mode == 0 else "文件输入输出"
-                print(f"IO模式: {io_mode_text}")
-
-                # 显示难度 - 题目详情部分
-                difficulty = problem_info.get('difficulty', 0)
-                difficulty_levels = ["未知", "入门", "简单", "普通", "困难", "魔鬼"]
-                difficulty_text = difficulty_levels[min(difficulty, 5)]
-
-                # 创建彩色难度文本
-                difficulty_color = ""
-                if difficulty == 1:
-                    difficulty_color = "\x1b[0;36m"  # 青色 - 入门
-                elif difficulty == 2:
-                    difficulty_color = "\x1b[0;32m"  # 绿色 - 简单
-                elif difficulty == 3:
-                    difficulty_color = "\x1b[0;33m"  # 黄色 - 普通
-                elif difficulty == 4:
-                    difficulty_color = "\x1b[0;31m"  # 红色 - 困难
-                elif difficulty == 5:
-                    difficulty_color = "\x1b[0;35m"  # 紫色 - 魔鬼
-
-                colored_difficulty = f"{difficulty_color}{difficulty_text}\x1b[0m" if difficulty_color else difficulty_text
-                print(f"难度等级: {colored_difficulty}")
-
-                # 显示标签
-                if 'publicTags' in problem_info and problem_info['publicTags']:
-                    print("公开标签:", ", ".join(problem_info['publicTags']))
-
-                # 显示提交记录
-                print(f"{'-' * 40}")
-
-                # 使用已经获取的提交记录
-                if 'submission_records' in selected_problem and selected_problem['submission_records']:
-                    records = selected_problem['submission_records']
-                    from config import MAX_RECORDS_TO_SHOW
-                    records_count = min(MAX_RECORDS_TO_SHOW, len(records))  # 最多显示5条记录
-
-                    print(f"\n[\x1b[0;32m+\x1b[0m] 最近 {records_count} 条提交记录:")
-
-                    # 创建表头 - 使用与作业列表相同的风格
-                    header = " {:<6} | {:<5} | {:<19} | {:<8}".format(
-                        "Status", "Score", "Submit Time", "Record ID"
-                    )
-                    print(header)
-                    print("-" * 60)  # 分隔线长度与表头一致
-
-                    # 显示记录
-                    for i in range(records_count):
-                        record = records[i]
-                        result_state = record.get('resultState', 'Unknown')
-                        score = record.get('score', 0)
-                        submission_time = record.get('submissionTime', 'Unknown')
-                        record_id = record.get('recordId', 'Unknown')
-
-                        # 获取状态的颜色和文本，但先不合并
-                        status, status_color = records_status_color(result_state)
-                        colored_status = f"{status_color}{status}\x1b[0m" if status_color else status
-
-                        # 先创建没有颜色的行用于对齐
-                        line = " {:<6} | {:<5} | {:<19} | {:<8}".format(
-                            status, score, submission_time, record_id
-                        )
-
-                        # 替换普通状态文本为带颜色的文本
-                        if status_color:
-                            line = line.replace(status, colored_status, 1)
-
-                        print(line)
-                else:
-                    print("[\x1b[0;33m!\x1b[0m] 没有找到提交记录")
-
+            if selected_problem.has_details:
+                print("".join(_problem_details(selected_problem, problem_index)), end="", flush=True)
                 return selected_problem  # 返回选择的问题对象
             else:
                 print("[\x1b[0;31mx\x1b[0m] 题目详情不可用")
@@ -340,84 +125,279 @@ def display_problems_info(enriched_problems, selected_course, selected_homework)
         print("[\x1b[0;31mx\x1b[0m] 请输入有效的数字")
         return None
 
+
+def _problem_details(problem, problem_index):
+    """题目详情与最近的提交记录，返回要一次写出的文本片段列表"""
+    from config import MAX_RECORDS_TO_SHOW
+
+    out = [f"\n{'-' * 40}\n",
+           f"题目编号: {problem_index + 1}\n",
+           f"题目名称: {problem.name}\n",
+           f"{'-' * 40}\n",
+           f"题目类型: {problem.problem_type}\n"]
+
+    if problem.time_limit:
+        out.append("时间限制: " + "".join(f"{lang}: {limit} ms\n" for lang, limit in problem.time_limit.items()))
+    if problem.memory_limit:
+        out.append("内存限制: " + "".join(f"{lang}: {limit} MB\n" for lang, limit in problem.memory_limit.items()))
+    out.append(f"IO模式: {problem.io_mode_text}\n")
+
+    difficulty_text = problem.difficulty_label_zh
+    if problem.difficulty_color:
+        difficulty_text = f"{problem.difficulty_color}{difficulty_text}\x1b[0m"
+    out.append(f"难度等级: {difficulty_text}\n")
+
+    if problem.public_tags:
+        out.append("公开标签: " + ", ".join(problem.public_tags) + "\n")
+    out.append(f"{'-' * 40}\n")
+
+    if not problem.records:
+        out.append("[\x1b[0;33m!\x1b[0m] 没有找到提交记录\n")
+        return out
+
+    records = problem.records[:MAX_RECORDS_TO_SHOW]
+    table = Table([Column("Status", 6), Column("Score", 5), Column("Submit Time", 19), Column("Record ID", 8)])
+    for record in records:
+        table.add_row([record.status, record.score, record.submission_time, record.record_id],
+                      [record.status_color])
+    heading = f"[\x1b[0;32m+\x1b[0m] 最近 {len(records)} 条提交记录"
+    if len(problem.records) > len(records):
+        heading += f" (共 {len(problem.records)} 条，可在操作菜单中浏览全部)"
+    out.append(table.render(before=["", heading + ":"]))
+    return out
+
+
 def display_grading_result(result):
-    """显示批改结果，以表格形式展示
+    """显示批改结果，以表格形式展示，测试用例超过一屏时分页浏览
 
     Args:
-        result: 批改结果数据
+        result: GradingResult批改结果
 
     Returns:
         无返回值
     """
-    from utils.formatters import records_status_color
-
-    # 批改完成，显示结果
-    print(f"\n\n{'-' * 60}")
-    print(f"批改结果 - 提交ID: {result.get('recordId', '')}")
-
-    # 显示基本信息
-    status, status_color = records_status_color(result['resultState'])
-    print(f"题目: {result['problemName']}")
-    print(f"状态: {status_color}{result['resultState']}\x1b[0m")
-    print(f"得分: {result['score']}")
-    print(f"提交时间: {result['submissionTime']}")
-    print(f"{'-' * 60}")
-
-    # 显示详细结果 - 表格形式
-    print("\n[\x1b[0;36m!\x1b[0m]测试用例结果:")
-
-    # 表头
-    header = " {:<3} | {:<8} | {:<17} | {:<10} | {:<12} | {:<27}".format(
-        "No.", "Status", "Test Case", "Time(ms)", "Memory(MB)", "Message"
-    )
-    print(header)
-    print("-" * (len(header) + 2))  # Adjust separator length
-
-    # 表格内容
-    for idx, test_result in enumerate(result['resultList']):
-        status = test_result['state']
-        title_orig = test_result['title']
-        time_used = test_result['time']
-        memory_used = test_result['memory']
-        message_orig = test_result['message'] if test_result['message'] else "N/A"
-
-        # Sanitize title and message by replacing newlines and carriage returns with a space
-        title_orig = title_orig.replace('\n', ' ').replace('\r', ' ')
-        message_orig = message_orig.replace('\n', ' ').replace('\r', ' ')
-
-        # 根据状态设置颜色
-        _, status_color = records_status_color(status)
-        status_colored = f"{status_color}{status:<6}\x1b[0m"  # Pad status for color replacement
-
-        # Truncate title and message to fit column width
-        title_display = (title_orig[:14] + "...") if len(title_orig) > 17 else title_orig
-        message_display = (message_orig[:24] + "...") if len(message_orig) > 27 else message_orig
-
-        # 使用表格格式输出, ensure status has fixed width for replacement
-        plain_status_for_align = f"{status:<6}"
-
-        row_format = " {:<3} | {:<8} | {:<17} | {:<10} | {:<12} | {:<27}"
-
-        # Construct the row with plain status first for alignment, then replace with colored
-        temp_row = row_format.format(
-            idx + 1,
-            plain_status_for_align,
-            title_display,
-            time_used,
-            memory_used,
-            message_display
-        )
-
-        # Replace the plain status part with the colored status part
-        final_row = temp_row.replace(plain_status_for_align, status_colored, 1)
-
-        print(final_row)
-
-    # 如果有消息太长，显示完整版本
-    for idx, test_result in enumerate(result['resultList']):
-        message_orig = test_result['message']
-        if len(message_orig) > 27:
-            print(f"\n测试用例 {idx + 1} ({test_result['title']}) 完整消息:")
-            print(f"  {message_orig}")
-
-    print("-" * (len(header) + 2))  # Adjust separator length
\ No newline at end of file
+    before = ["", "", "-" * 60,
+              f"批改结果 - 提交ID: {result.record_id}",
+              f"题目: {result.problem_name}",
+              f"状态: {result.status_color}{result.result_state}\x1b[0m",
+              f"得分: {result.score}",
+              f"提交时间: {result.submission_time}",
+              "-" * 60,
+              "",
+              "[\x1b[0;36m!\x1b[0m]测试用例结果:"]
+
+    from ui.pager import should_page
+    if should_page(len(result.cases)):
+        # 测试用例超过一屏时分页浏览，完整消息按需查看
+        from ui.pager import Pager, ListSource
+        sys.stdout.write("\n".join(before) + "\n")
+        Pager(ListSource(result.cases), CASE_COLUMNS[1:], _case_row, "测试用例结果",
+              on_open=_show_case_message).run()
+        return
+
+    table = Table(CASE_COLUMNS)
+    for idx, case in enumerate(result.cases):
+        cells, colors = _case_row(case)
+        table.add_row([idx + 1] + cells, [None] + colors)
+
+    lines = table.lines()
+    rule = "-" * len(lines[1])
+
+    # 消息太长时显示完整版本
+    after = []
+    for idx, case in enumerate(result.cases):
+        if len(case.message) > 27:
+            after += ["", f"测试用例 {idx + 1} ({case.title}) 完整消息:", f"  {case.message}"]
+    after.append(rule)
+
+    sys.stdout.write("\n".join(before + lines + after) + "\n")
+    sys.stdout.flush()
+
+
+def _case_row(case):
+    """测试用例表格的一行（不含序号），标题与消息中的换行替换为空格"""
+    title = case.title.replace('\n', ' ').replace('\r', ' ')
+    message = (case.message or "N/A").replace('\n', ' ').replace('\r', ' ')
+    return [case.state, title, case.time, case.memory, message], [case.status_color]
+
+
+def _show_case_message(case):
+    print(f"\n测试用例 {case.title} 完整消息:\n  {case.message or 'N/A'}")
+
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+SPARK_LENGTH = 12
+
+
+def _sparkline(series):
+    """最近SPARK_LENGTH次提交的数值走势，缺失的位置为空格"""
+    import math
+    values = list(series[-SPARK_LENGTH:])
+    valid = [value for value in values if not math.isnan(value)]
+    if not valid:
+        return ""
+    low, high = min(valid), max(valid)
+    scale = (len(SPARK_CHARS) - 1) / (high - low) if high > low else 0
+    return "".join(" " if math.isnan(value) else SPARK_CHARS[int((value - low) * scale)] for value in values)
+
+
+def display_case_trends(problem_name, submissions, trends):
+    """显示各测试用例在历次提交中的耗时与内存趋势
+
+    Args:
+        problem_name: 题目名称
+        submissions: 参与统计的提交次数
+        trends: CaseTrend列表
+    """
+    from config import TREND_LIMIT_WARNING, TREND_REGRESSION_THRESHOLD
+
+    def change(value, regression):
+        if value is None:
+            return "-", None
+        if regression:
+            color = "\x1b[0;31m"
+        elif value < -TREND_REGRESSION_THRESHOLD:
+            color = "\x1b[0;32m"
+        else:
+            color = None
+        return f"{value:+.0%}", color
+
+    def ratio(value):
+        if value is None:
+            return "-", None
+        if value >= 1:
+            return f"{value:.0%}", "\x1b[0;31m"
+        return f"{value:.0%}", "\x1b[0;33m" if value >= TREND_LIMIT_WARNING else None
+
+    def number(value):
+        return "-" if value is None else f"{value:g}"
+
+    table = Table([Column("Test Case", 9, max_width=17), Column("Runs", 4, align='>'),
+                   Column("Time(ms)", 8, align='>'), Column("ΔTime", 6, align='>'), Column("Time%", 5, align='>'),
+                   Column("Memory(MB)", 10, align='>'), Column("ΔMem", 6, align='>'),
+                   Column("Mem%", 5, align='>'), Column("Time Trend", SPARK_LENGTH)])
+    for trend in trends:
+        time_change, time_color = change(trend.time_change, trend.time_regression)
+        memory_change, memory_color = change(trend.memory_change, trend.memory_regression)
+        time_ratio, time_ratio_color = ratio(trend.time_ratio)
+        memory_ratio, memory_ratio_color = ratio(trend.memory_ratio)
+        table.add_row([trend.title.replace('\n', ' '), trend.runs, number(trend.latest_time), time_change,
+                       time_ratio, number(trend.latest_memory), memory_change, memory_ratio,
+                       _sparkline(trend.times)],
+                      [None, None, None, time_color, time_ratio_color, None, memory_color, memory_ratio_color])
+
+    before = ["", f"[\x1b[0;36m!\x1b[0m] {problem_name}: {submissions} 次提交的测试用例耗时与内存 "
+                  f"(Δ为最近一次相对上一次，%为占限制的比例)"]
+    after = []
+    regressions = [trend.title for trend in trends if trend.time_regression or trend.memory_regression]
+    if regressions:
+        after.append(f"[\x1b[0;31mx\x1b[0m] 退步超过 {TREND_REGRESSION_THRESHOLD:.0%} 的测试用例: "
+                     + ", ".join(regressions))
+    closest = sorted((trend for trend in trends if trend.headroom >= TREND_LIMIT_WARNING),
+                     key=lambda trend: trend.headroom, reverse=True)[:3]
+    if closest:
+        after.append("[\x1b[0;33m!\x1b[0m] 最接近限制的测试用例: "
+                     + ", ".join(f"{trend.title} ({trend.headroom:.0%})" for trend in closest))
+    table.write(before, after)
+
+
+class SubmissionBoard:
+    """oja submit-all 的汇总表格，在终端中随批改结果到达只重绘变化的行
+
+    Args:
+        jobs: 提交任务列表，每项有problem、record_id、result与status()
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.table = LiveTable([Column("ID", 8), Column("Problem", 20, max_width=20), Column("Record", 10),
+                                Column("Status", 8), Column("Score", 7), Column("Cases", 7)], indent="  ")
+        for job in jobs:
+            self.table.add_row(*self._row(job))
+
+    @staticmethod
+    def _row(job):
+        status, color = job.status()
+        score, cases = "-", "-"
+        if job.result:
+            score = job.result.score
+            passed = sum(case.state == 'AC' for case in job.result.cases)
+            cases = f"{passed}/{len(job.result.cases)}"
+        return [job.problem.id, job.problem.name, job.record_id or "-", status, score, cases], \
+            [None, None, None, color]
+
+    def show(self):
+        """显示整张表，之后可以用refresh()原位更新"""
+        self.table.show()
+
+    def write(self):
+        """一次写出整张表（输出不是终端时使用）"""
+        self.table.write()
+
+    def refresh(self):
+        """重绘状态有变化的行"""
+        for index, job in enumerate(self.jobs):
+            self.table.update(index, *self._row(job))
+        self.table.refresh()
+
+    def notice(self, message, error=False):
+        """在表格下方显示一条提示（如请求重试），替换上一条"""
+        if error:
+            self.table.status(f"[x] {message}", color="\x1b[0;31m")
+        else:
+            self.table.status(f"[!] {message}", color="\x1b[0;33m")
+
+    def clear_notice(self):
+        self.table.status(None)
+
+
+def display_service_status():
+    """显示处于熔断状态的服务，这些服务的请求会直接失败而不等待超时"""
+    from services.breaker import breakers, HALF_OPEN
+    for name, state, retry_in in breakers.open_breakers():
+        if state == HALF_OPEN:
+            print(f"[\x1b[0;33m!\x1b[0m] {name} 之前不可用，正在重新尝试连接")
+        else:
+            print(f"[\x1b[0;31mx\x1b[0m] {name} 暂时不可用（已熔断），{retry_in:.0f}秒后重试")
+
+
+def display_request_stats(stats):
+    """显示请求层的统计信息（oja --stats）
+
+    Args:
+        stats: OJRequester.request_stats()的返回值
+    """
+    scheduler = stats.get('scheduler')
+    if not scheduler:
+        return
+
+    table = Table([Column("Priority", 12), Column("Requests", 8, align='>'), Column("Max Queue", 10, align='>'),
+                   Column("Avg Wait(ms)", 12, align='>'), Column("Max Wait(ms)", 12, align='>')])
+    for name, item in scheduler.items():
+        table.add_row([name, item['requests'], item['max_queued'], f"{item['avg_wait_ms']:.1f}",
+                       f"{item['max_wait_ms']:.1f}"])
+    out = [table.render(before=["", "[\x1b[0;36m!\x1b[0m] 请求统计:"])]
+
+    rate_limit = stats.get('rate_limit') or {}
+    if rate_limit:
+        table = Table([Column("Endpoint", 12), Column("Requests", 8, align='>'), Column("Throttled", 10, align='>'),
+                       Column("Avg Wait(ms)", 12, align='>')])
+        for name, item in rate_limit.items():
+            table.add_row([name, item['requests'], item['throttled'], f"{item['avg_wait_ms']:.1f}"])
+        out.append(table.render(before=[""]))
+
+    retry = stats.get('retry')
+    if retry:
+        out.append(f"\n重试: {retry['retries']} 次，因重试额度不足放弃: {retry['denied']} 次\n")
+
+    coalescing = stats.get('coalescing')
+    if coalescing:
+        out.append(f"合并: {coalescing['calls']} 次调用中有 {coalescing['coalesced']} 次共享了进行中的相同请求\n")
+
+    connections = stats.get('connections')
+    if connections:
+        out.append(f"连接: {connections['connections']} 个连接承载了 {connections['requests']} 个请求"
+                   f"（{connections['sessions']} 个线程会话）\n")
+    if stats.get('transport') == 'HTTP/2':
+        out.append("传输: HTTP/2（API请求不经过上面的连接池）\n")
+    print("".join(out), end="", flush=True)
@@ -2,34 +2,30 @@ def select_course(courses, auto_select_first=True):
     """处理课程选择逻辑
 
     Args:
-        courses: 课程列表数据
+        courses: Course列表
         auto_select_first: 是否自动选择第一门课程
 
     Returns:
         selected_course_id: 选择的课程ID，如果选择失败则返回None
     """
-    if not courses or 'list' not in courses or not courses['list']:
+    if not courses:
         return None
 
     if auto_select_first:
         # 默认选择第一门课程
-        selected_course = courses['list'][0]['course_id']
-        course_name = courses['list'][0]['course_name']
-        return selected_course
+        return courses[0].id
 
     # 如果需要手动选择课程，让用户输入课程编号
-    print("\n请输入要查看的课程序号(1-{})，或直接回车选择最后一门课程:".format(len(courses['list'])),end='')
+    print("\n请输入要查看的课程序号(1-{})，或直接回车选择最后一门课程:".format(len(courses)),end='')
     user_input = input().strip()
 
     if not user_input:  # 用户直接按回车
-        selected_course = courses['list'][len(courses['list'])-1]['course_id']
-        return selected_course
+        return courses[-1].id
 
     try:
         index = int(user_input) - 1
-        if 0 <= index < len(courses['list']):
-            selected_course = courses['list'][index]['course_id']
-            return selected_course
+        if 0 <= index < len(courses):
+            return courses[index].id
         else:
             print("[\x1b[0;31mx\x1b[0m] 无效的课程序号")
             return None
@@ -41,7 +37,7 @@ def select_homework(enriched_homeworks, auto_select_first):
     """处理用户选择作业的逻辑
 
     Args:
-        enriched_homeworks: 包含详细信息的作业列表
+        enriched_homeworks: Homework列表
         auto_select_first: 是否自动选择第一份作业
 
     Returns:
@@ -56,17 +52,16 @@ def select_homework(enriched_homeworks, auto_select_first):
         print("\n请输入要查看的作业ID(直接回车默认查看最近作业):", end='')
         user_input = input().strip()
     else:
-        return enriched_homeworks[len(enriched_homeworks)-1]['homeworkId']
+        return enriched_homeworks[-1].id
 
     # 如果用户没有输入，选择第一个作业（最近的）
     if not user_input:
-        selected_hw = enriched_homeworks[len(enriched_homeworks)-1]['homeworkId']
-        return selected_hw
+        return enriched_homeworks[-1].id
     else:
         try:
             selected_hw = int(user_input)
             # 验证输入的作业ID是否存在
-            hw_exists = any(hw['homeworkId'] == selected_hw for hw in enriched_homeworks)
+            hw_exists = any(hw.id == selected_hw for hw in enriched_homeworks)
             if not hw_exists:
                 print(f"[\x1b[0;33m!\x1b[0m] 警告: 输入的作业ID {selected_hw} 不在列表中，但仍将尝试获取")
             return selected_hw
@@ -75,19 +70,20 @@ def select_homework(enriched_homeworks, auto_select_first):
             return None
 
 
-def interact_with_problems(enriched_problems, selected_course, selected_homework, requester):
+def interact_with_problems(enriched_problems, selected_course, selected_homework, requester, warmer=None):
     """处理用户与问题的交互，包括查看详情和提交作业
 
     Args:
-        enriched_problems: 包含详细信息的问题列表
+        enriched_problems: Problem列表
         selected_course: 选中的课程对象或课程ID
         selected_homework: 选中的作业对象或作业ID
         requester: OJ请求实例
+        warmer: 可选，ProblemWarmer，题目按需加载时使用
 
     Returns:
         bool: True表示成功处理，False表示应该返回上一级
     """
-    from ui.display import display_problems_info, display_problems_list
+    from ui.display import display_problems_info, display_problems_list, display_service_status
     from ui.submission import handle_submission
     from utils.file_handlers import save_problem_to_file
 
@@ -95,11 +91,20 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
     course_id = selected_course['id'] if isinstance(selected_course, dict) else selected_course
     homework_id = selected_homework['id'] if isinstance(selected_homework, dict) else selected_homework
 
+    from services.record_sync import report_record_changes
+
     while True:
-        display_problems_list(enriched_problems)
+        # 报告本次获取到的新提交与结果变化（不产生额外请求）
+        report_record_changes(getattr(requester, 'store', None))
+
+        # 单元测试可用性只读缓存，未知的在后台探测，下次显示时即可看到
+        from services.unit_test_probe import get_unit_test_availability
+        unit_tests = get_unit_test_availability(course_id, homework_id, enriched_problems)
+        display_problems_list(enriched_problems, unit_tests)
+        display_service_status()
 
         # 用户选择问题并查看详情
-        selected_problem = display_problems_info(enriched_problems, selected_course, selected_homework)
+        selected_problem = display_problems_info(enriched_problems, selected_course, selected_homework, warmer)
 
         # 如果用户没有选择问题或返回上一级
         if not selected_problem:
@@ -111,6 +116,9 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
             print("1. 保存题目到本地")
             print("2. 提交作业")
             print("3. 下载单元测试文件")
+            print("4. 同步本作业所有题目的单元测试文件")
+            print("5. 浏览全部提交记录")
+            print("6. 查看测试用例耗时与内存趋势")
             print("0. 返回题目列表")
 
             choice = input("请输入选项编号: ").strip() or '2'
@@ -122,6 +130,8 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
             elif choice == '1':
                 # 保存题目到本地
                 print(f"[\x1b[0;36m!\x1b[0m] 正在保存题目内容到本地...")
+                if warmer and warmer.ensure(selected_problem) is None:
+                    continue
                 file_path = save_problem_to_file(selected_problem, course_id, homework_id)
                 if file_path:
                     print(f"[\x1b[0;32m+\x1b[0m] 题目内容已保存到: {file_path}")
@@ -140,11 +150,16 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
                 if result:
                     # 重新获取问题列表和记录，以显示最新状态
                     print(f"[\x1b[0;36m!\x1b[0m] 正在刷新题目状态...")
-                    from services import fetch_and_process_problems
-                    updated_problems = fetch_and_process_problems(requester, selected_homework, selected_course)
-                    if updated_problems:
-                        enriched_problems = updated_problems
-                        print(f"[\x1b[0;32m+\x1b[0m] 题目状态已更新")
+                    if warmer:
+                        # 按需加载模式下只刷新当前题目的提交记录
+                        if warmer.refresh_records(selected_problem) is not None:
+                            print(f"[\x1b[0;32m+\x1b[0m] 题目状态已更新")
+                    else:
+                        from services import fetch_and_process_problems
+                        updated_problems = fetch_and_process_problems(requester, selected_homework, selected_course)
+                        if updated_problems:
+                            enriched_problems = updated_problems
+                            print(f"[\x1b[0;32m+\x1b[0m] 题目状态已更新")
 
                     # 检查提交结果
                     if isinstance(result, dict) and result.get('all_correct', False):
@@ -160,12 +175,10 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
                 # 下载单元测试文件
                 print(f"[\x1b[0;36m!\x1b[0m] 准备下载单元测试文件...")
 
-                problem_id = selected_problem.get('problemId', '')
-                problem_name = selected_problem.get('problemName', '')
-
                 # 调用下载函数
                 from services import download_unit_test_file
-                success, result = download_unit_test_file(course_id, problem_id, homework_id, problem_name)
+                success, result = download_unit_test_file(course_id, selected_problem.id, homework_id,
+                                                          selected_problem.name)
 
                 if success:
                     print(f"[\x1b[0;32m+\x1b[0m] 单元测试文件已下载到: {result}")
@@ -177,5 +190,77 @@ def interact_with_problems(enriched_problems, selected_course, selected_homework
 
                 continue
 
+            elif choice == '4':
+                # 批量同步整份作业的单元测试文件
+                print(f"[\x1b[0;36m!\x1b[0m] 正在同步本作业所有题目的单元测试文件...")
+                from services import download_homework_unit_tests
+                results = download_homework_unit_tests(course_id, homework_id, enriched_problems)
+
+                status_text = {
+                    'new': "\x1b[0;32m新下载\x1b[0m",
+                    'updated': "\x1b[0;36m已更新\x1b[0m",
+                    'unchanged': "未变化",
+                    'missing': "\x1b[0;33m暂无\x1b[0m",
+                    'error': "\x1b[0;31m失败\x1b[0m",
+                }
+                for problem, status, detail in results:
+                    print(f"  {problem.name}: {status_text[status]}"
+                          + (f" - {detail}" if status in ('new', 'updated', 'error') else ""))
+                continue
+
+            elif choice == '5':
+                # 分页浏览全部提交记录，输入序号查看该次提交的批改结果
+                browse_submission_records(requester, selected_problem, course_id, homework_id)
+                continue
+
+            elif choice == '6':
+                show_case_trends(requester, selected_problem, course_id, homework_id)
+                continue
+
             else:
-                print("[\x1b[0;31mx\x1b[0m] 无效的选项，请重新选择")
\ No newline at end of file
+                print("[\x1b[0;31mx\x1b[0m] 无效的选项，请重新选择")
+
+def browse_submission_records(requester, problem, course_id, homework_id):
+    """分页浏览题目的全部提交记录，选中的记录的批改结果优先从本地存储读取，没有时再请求"""
+    from ui.pager import Pager, RecordSource
+    from ui.table import Column
+    from ui.display import display_grading_result
+    import requests
+    from services.models import GradingResult
+    from services.data_service import report_request_error
+
+    def open_record(record):
+        store = getattr(requester, 'store', None)
+        result = store.load_result(record.record_id) if store else None
+        if result is None:
+            print(f"[\x1b[0;36m!\x1b[0m] 正在获取提交 {record.record_id} 的批改结果...")
+            try:
+                result = requester.get_submission_result(record.record_id, course_id, homework_id)
+            except requests.RequestException as e:
+                report_request_error(e)
+                return
+        if not result or 'resultState' not in result:
+            print("[\x1b[0;31mx\x1b[0m] 无法获取批改结果")
+            return
+        display_grading_result(GradingResult.from_api(result, record.record_id))
+
+    columns = [Column("Status", 6), Column("Score", 5), Column("Submit Time", 19), Column("Record ID", 8)]
+    Pager(RecordSource(requester, problem, course_id, homework_id), columns,
+          lambda record: ([record.status, record.score, record.submission_time, record.record_id],
+                          [record.status_color]),
+          f"{problem.name} 的提交记录", on_open=open_record).run()
+
+
+def show_case_trends(requester, problem, course_id, homework_id):
+    """汇总题目历次提交的批改结果，显示各测试用例的耗时与内存趋势"""
+    from services.trends import load_problem_results, build_case_trends
+    from ui.display import display_case_trends
+
+    print(f"[\x1b[0;36m!\x1b[0m] 正在汇总历次提交的批改结果...")
+    results = load_problem_results(requester, course_id, homework_id, problem.id)
+    if results is None:
+        print("[\x1b[0;31mx\x1b[0m] 未启用本地存储(ENABLE_LOCAL_STORE)，无法统计趋势")
+    elif not results:
+        print("[\x1b[0;33m!\x1b[0m] 还没有批改完成的提交")
+    else:
+        display_case_trends(problem.name, len(results), build_case_trends(results, problem))
@@ -0,0 +1,144 @@
+"""分页浏览长列表：每次只取出并渲染当前屏幕能显示的一页
+
+数据由"数据源"按需提供，数据源需实现 count() 与 fetch(offset, limit)。翻页时按页向数据源取数据，
+只缓存最近访问的几页，所以无论列表多长，内存占用与每次渲染的开销都只与屏幕高度有关。
+"""
+import sys
+import shutil
+from collections import OrderedDict
+
+from ui.table import Table, Column
+
+PAGER_CHROME_LINES = 7  # 标题、表头、分隔线、页脚与输入提示占用的行数
+
+
+def page_size():
+    """按终端高度计算每页显示的行数"""
+    return max(5, shutil.get_terminal_size().lines - PAGER_CHROME_LINES)
+
+
+def should_page(count):
+    """列表超过一屏且在交互式终端中时才需要分页"""
+    return count > page_size() and sys.stdin.isatty() and sys.stdout.isatty()
+
+
+class ListSource:
+    """已在内存中的列表"""
+
+    def __init__(self, items):
+        self.items = items
+
+    def count(self):
+        return len(self.items)
+
+    def fetch(self, offset, limit):
+        return self.items[offset:offset + limit]
+
+
+class RecordSource:
+    """某道题目的提交记录：有本地存储时按页从存储中读取全部历史记录（不读取代码），
+    否则使用已从网络获取的记录列表"""
+
+    def __init__(self, requester, problem, course_id, homework_id):
+        self.store = getattr(requester, 'store', None)
+        self.key = (course_id, homework_id, problem.id)
+        self.fallback = None
+        if self.store is None or self.store.count_records(*self.key) < len(problem.records):
+            self.fallback = ListSource(problem.records)
+
+    def count(self):
+        if self.fallback:
+            return self.fallback.count()
+        return self.store.count_records(*self.key)
+
+    def fetch(self, offset, limit):
+        if self.fallback:
+            return self.fallback.fetch(offset, limit)
+        from services.models import SubmissionRecord
+        return [SubmissionRecord.from_api({'recordId': record_id, 'resultState': state,
+                                           'score': score, 'submissionTime': submission_time})
+                for record_id, state, score, submission_time
+                in self.store.load_records_page(*self.key, offset, limit)]
+
+
+class Pager:
+    """分页浏览器
+
+    Args:
+        source: 数据源，实现 count() 与 fetch(offset, limit)
+        columns: 表格列（不含序号列，序号列自动添加）
+        row: 把一项数据转换为 (cells, colors) 的函数
+        title: 每页顶部显示的标题
+        on_open: 可选，输入序号时对该项调用的函数
+        cached_pages: 最多缓存的页数
+    """
+
+    def __init__(self, source, columns, row, title, on_open=None, cached_pages=3):
+        self.source = source
+        self.columns = [Column("No.", 3)] + columns
+        self.row = row
+        self.title = title
+        self.on_open = on_open
+        self.cached_pages = cached_pages
+        self._pages = OrderedDict()
+        self.size = page_size()
+
+    def _page(self, index):
+        """取出第index页（从0开始），最近使用的页保留在缓存中"""
+        if index in self._pages:
+            self._pages.move_to_end(index)
+        else:
+            self._pages[index] = self.source.fetch(index * self.size, self.size)
+            if len(self._pages) > self.cached_pages:
+                self._pages.popitem(last=False)
+        return self._pages[index]
+
+    def _render(self, index, total, pages):
+        items = self._page(index)
+        table = Table(self.columns)
+        start = index * self.size
+        for offset, item in enumerate(items):
+            cells, colors = self.row(item)
+            table.add_row([start + offset + 1] + list(cells), [None] + list(colors or []))
+        before = ["", f"[\x1b[0;36m!\x1b[0m] {self.title}  第 {start + 1}-{start + len(items)} 条 / "
+                      f"共 {total} 条 (第 {index + 1}/{pages} 页)"]
+        help_text = "回车/n 下一页, p 上一页, g<页码> 跳转"
+        if self.on_open:
+            help_text += ", 输入序号查看详情"
+        table.write(before, [f"{help_text}, q 返回"])
+
+    def _item(self, number):
+        index, offset = divmod(number - 1, self.size)
+        items = self._page(index)
+        return items[offset] if offset < len(items) else None
+
+    def run(self):
+        """进入分页浏览，输入q返回"""
+        total = self.source.count()
+        if not total:
+            print("[\x1b[0;33m!\x1b[0m] 没有可显示的内容")
+            return
+        pages = (total + self.size - 1) // self.size
+        index = 0
+        while True:
+            self._render(index, total, pages)
+            try:
+                command = input("> ").strip().lower()
+            except EOFError:
+                return
+
+            if command in ('q', '0'):
+                return
+            elif command in ('', 'n'):
+                if index + 1 >= pages and command == '':
+                    return  # 最后一页直接回车返回
+                index = min(index + 1, pages - 1)
+            elif command == 'p':
+                index = max(index - 1, 0)
+            elif command.startswith('g') and command[1:].strip().isdigit():
+                index = min(max(int(command[1:]) - 1, 0), pages - 1)
+            elif command.isdigit() and self.on_open and 1 <= int(command) <= total:
+                self.on_open(self._item(int(command)))
+                input("按回车返回列表...")
+            else:
+                print("[\x1b[0;31mx\x1b[0m] 无效的输入")
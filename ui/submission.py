@@ -1,6 +1,5 @@
 import os
 import sys
-import time
 import hashlib
 
 def get_file_hash(content=None, file_path=None):
@@ -150,6 +149,41 @@ def get_java_file_paths(work_dir):
             # 循环将继续
 
 
+def read_submission_hashes(file_paths):
+    """读取要提交的文件并计算哈希值
+
+    Returns:
+        {带扩展名的文件名: 哈希}，有文件无法读取时返回None
+    """
+    from utils.file_handlers import read_java_file
+    hashes = {}
+    for file_path in file_paths:
+        content = read_java_file(file_path)
+        if not content:
+            print(f"[\x1b[0;31mx\x1b[0m] 无法读取文件内容: {file_path}")
+            return None
+
+        file_hash = get_file_hash(content=content)
+        if not file_hash:
+            print(f"[\x1b[0;31mx\x1b[0m] 无法计算文件哈希值: {file_path}")
+            return None
+
+        # API返回的code字典的键也是带扩展名的文件名
+        hashes[os.path.basename(file_path)] = file_hash
+    return hashes
+
+
+def find_duplicate_submission(records, file_hashes):
+    """若上一次提交（records[0]）的代码与file_hashes完全相同则返回该记录，否则返回None
+
+    仅当文件名集合和每个文件的哈希都相同时才认为是重复提交。
+    """
+    if not records or not file_hashes:
+        return None
+    latest_record = records[0]
+    return latest_record if latest_record.code_hashes == file_hashes else None
+
+
 def handle_submission(requester, problem, course_id, homework_id):
     """处理Java文件的选择和提交。支持多个Java文件。"""
 
@@ -160,7 +194,7 @@ def handle_submission(requester, problem, course_id, homework_id):
         homework_id = homework_id['id']
 
     print(f"\n{'-' * 40}")
-    print(f"提交题目解答: {problem['title'] if 'title' in problem else problem['problemName']}")
+    print(f"提交题目解答: {problem.name}")
     print(f"{'-' * 40}")
 
     import utils.workdir
@@ -170,74 +204,37 @@ def handle_submission(requester, problem, course_id, homework_id):
         return False
 
     # 读取当前文件内容并计算哈希值
-    from utils.file_handlers import read_java_file
-    current_files_content_hashes = {}
-    for file_path in selected_file_paths:
-        content = read_java_file(file_path)
-        if not content:
-            print(f"[\x1b[0;31mx\x1b[0m] 无法读取文件内容: {file_path}，提交取消")
-            return False
-        
-        file_hash = get_file_hash(content=content)
-        if not file_hash:
-            print(f"[\x1b[0;31mx\x1b[0m] 无法计算文件哈希值: {file_path}，提交取消")
-            return False
-        
-        filename_key = os.path.basename(file_path)  # 使用带扩展名的文件名作为键
-        current_files_content_hashes[filename_key] = file_hash
-
-    # 查找上一次提交记录中的代码哈希
-    last_submission_files_hashes = {}
-    last_submission_time = None
-    last_record_id = None
-
-    if 'submission_records' in problem and problem['submission_records'] and len(problem['submission_records']) > 0:
-        latest_record = problem['submission_records'][0]
-        if 'code' in latest_record and latest_record['code']: 
-            # 假设 API 返回的 code 字典的键也是带扩展名的文件名
-            for filename_key_from_api, code_content in latest_record['code'].items():
-                last_code_hash = get_file_hash(content=code_content)
-                if last_code_hash:
-                    last_submission_files_hashes[filename_key_from_api] = last_code_hash
-            
-            if last_submission_files_hashes:
-                last_submission_time = latest_record.get('submissionTime', 'Unknown')
-                last_record_id = latest_record.get('recordId', 'Unknown')
-
-    # 比较当前文件哈希和上次提交的文件哈希
-    # 仅当文件名集合和每个文件的哈希都相同时才认为是重复提交
-    if current_files_content_hashes and last_submission_files_hashes:
-        # 检查文件名集合是否相同 (键现在是带扩展名的)
-        if sorted(current_files_content_hashes.keys()) == sorted(last_submission_files_hashes.keys()):
-            all_hashes_match = True
-            for filename_key, current_hash in current_files_content_hashes.items():  # filename_key 是带扩展名的
-                if last_submission_files_hashes.get(filename_key) != current_hash:  # 使用相同的键格式进行比较
-                    all_hashes_match = False
-                    break
-            
-            if all_hashes_match:
-                print(f"\n[\x1b[0;31m!\x1b[0m] 检测到提交的文件内容与上一次提交完全相同。")
-                print(f"上次提交时间: {last_submission_time}")
-                print(f"上次提交ID: {last_record_id}")
-                print(f"当前提交文件: {', '.join(os.path.basename(f) for f in selected_file_paths)}")
-                print(f"[\x1b[0;31mx\x1b[0m] 提交已取消。请在修改后保存文件。")
-                return False
+    current_files_content_hashes = read_submission_hashes(selected_file_paths)
+    if current_files_content_hashes is None:
+        print("[\x1b[0;31mx\x1b[0m] 提交取消")
+        return False
+
+    # 与上一次提交的代码比较，完全相同时不再提交
+    latest_record = find_duplicate_submission(problem.records, current_files_content_hashes)
+    if latest_record:
+        print(f"\n[\x1b[0;31m!\x1b[0m] 检测到提交的文件内容与上一次提交完全相同。")
+        print(f"上次提交时间: {latest_record.submission_time}")
+        print(f"上次提交ID: {latest_record.record_id}")
+        print(f"当前提交文件: {', '.join(os.path.basename(f) for f in selected_file_paths)}")
+        print(f"[\x1b[0;31mx\x1b[0m] 提交已取消。请在修改后保存文件。")
+        return False
 
     # 确认提交
     print(f"\n准备提交:")
-    print(f"- 题目: {problem['title'] if 'title' in problem else problem['problemName']}")
+    print(f"- 题目: {problem.name}")
     print(f"- 文件: {', '.join(os.path.basename(f) for f in selected_file_paths)}") # 显示所有选定文件的基本名称
     confirm = input("确认提交? (y/n，默认y): ").strip().lower() or 'y'
     if confirm != 'y':
         print("[\x1b[0;33m!\x1b[0m] 已取消提交")
         return False
 
-    # 提交解答
+    # 提交解答，已知的提交记录用于在请求失败时确认是否已提交，避免重复提交
     result = requester.submit_homework(
         homework_id,
-        problem['problemId'],
+        problem.id,
         course_id,
-        selected_file_paths # 传递文件路径列表
+        selected_file_paths, # 传递文件路径列表
+        known_record_ids=[record.record_id for record in problem.records] if problem.loaded else None
     )
 
     # 如果提交成功并获取到record_id，则等待并显示批改结果
@@ -256,63 +253,36 @@ def wait_and_show_grading_result(requester, record_id, course_id, homework_id, p
         record_id: 提交记录ID
         course_id: 课程ID
         homework_id: 作业ID
-        problem: 问题对象
+        problem: Problem对象
 
     Returns:
         包含提交结果的字典，其中all_correct表示是否全部通过
     """
     from ui.display import display_grading_result
+    from services.models import GradingResult
 
     print(f"\n[\x1b[0;36m!\x1b[0m] 等待系统批改中...")
 
-    # 尝试获取时间限制信息
-    time_limit = None
-    if 'details' in problem and 'timeLimit' in problem['details'] and 'Java' in problem['details']['timeLimit']:
-        time_limit = int(problem['details']['timeLimit']['Java'])
-
-    # 如果无法获取具体时间限制，使用默认值
-    if not time_limit:
-        time_limit = 2000  # 默认1000毫秒
-
-    # 根据时间限制计算等待时间，给系统足够的时间批改
-    # 初始等待时间设为时间限制（毫秒转秒）
-    wait_time = (time_limit) / 1000
+    from services.data_service import poll_grading_result
+    result = poll_grading_result(
+        requester, record_id, course_id, homework_id, time_limit=problem.java_time_limit,
+        on_wait=lambda attempt, attempts: print(f"\r[\x1b[0;36m!\x1b[0m] 等待批改结果 ({attempt}/{attempts})...", end=''))
 
-    # 最多尝试10次
-    for attempt in range(1, 11):
-        print(f"\r[\x1b[0;36m!\x1b[0m] 等待批改结果 ({attempt}/10)...", end='')
-        time.sleep(wait_time)
+    if not result:
+        print("[\x1b[0;31mx\x1b[0m] 获取批改结果失败")
+        return {'all_correct': False}
 
-        # 获取批改结果
-        result = requester.get_submission_result(record_id, course_id, homework_id)
-
-        if not result:
-            print("[\x1b[0;31mx\x1b[0m] 获取批改结果失败")
-            return {'all_correct': False}
-
-        # 检查是否还在批改中
-        if result['resultState'] == 'JG':
-            # 增加下一次等待时间
-            wait_time = min(wait_time * 1.5, 5)  # 最长等待10秒
-            continue
-
-        # 添加记录ID到结果中，以便显示
-        result['recordId'] = record_id
+    if result['resultState'] != 'JG':
+        # 解析批改结果，并带上记录ID以便显示
+        grading_result = GradingResult.from_api(result, record_id)
 
         # 使用display.py中的函数显示批改结果
-        display_grading_result(result)
-
-        # 检查所有测试用例是否都通过
-        all_correct = True
-        for test_result in result['resultList']:
-            if test_result['state'] != 'AC':
-                all_correct = False
-                break
+        display_grading_result(grading_result)
 
         # 返回结果以及是否全部通过的标志
         return {
-            'result': result,
-            'all_correct': all_correct and result['resultState'] == 'AC'
+            'result': grading_result,
+            'all_correct': grading_result.all_correct
         }
 
     # 如果尝试次数用完仍未完成批改
@@ -0,0 +1,199 @@
+"""表格渲染：按显示宽度（中日韩文字占两列）计算列宽，整帧在缓冲区中拼好后一次写出
+
+单元格内容都是纯文本，颜色作为单元格的属性在填充对齐之后再加上，不对格式化好的行做文本替换。
+LiveTable 用于实时更新的表格（如批改进度），只重绘内容变化的行。
+"""
+import sys
+import shutil
+import threading
+import unicodedata
+
+RESET = "\x1b[0m"
+
+
+def char_width(char):
+    """单个字符在终端中占用的列数"""
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+def display_width(text):
+    """字符串在终端中占用的列数"""
+    if text.isascii():
+        return len(text)
+    return sum(char_width(char) for char in text)
+
+
+def truncate(text, width, ellipsis="..."):
+    """把text截断到不超过width列，被截断时以ellipsis结尾"""
+    if display_width(text) <= width:
+        return text
+    limit = width - len(ellipsis)
+    used, end = 0, 0
+    for end, char in enumerate(text):
+        used += char_width(char)
+        if used > limit:
+            break
+    return text[:end] + ellipsis
+
+
+def pad(text, width, align='<'):
+    """按显示宽度把text填充到width列"""
+    fill = " " * max(0, width - display_width(text))
+    return fill + text if align == '>' else text + fill
+
+
+class Column:
+    """表格的一列
+
+    Args:
+        title: 表头
+        min_width: 最小列宽
+        max_width: 最大列宽，超出的内容被截断（以...结尾）
+        align: '<' 左对齐，'>' 右对齐
+    """
+    __slots__ = ('title', 'min_width', 'max_width', 'align')
+
+    def __init__(self, title, min_width=0, max_width=None, align='<'):
+        self.title = title
+        self.min_width = min_width
+        self.max_width = max_width
+        self.align = align
+
+
+class Table:
+    """先收集所有行，列宽统一计算一次，整张表一次写出
+
+    Args:
+        columns: Column列表
+        indent: 每行开头的缩进
+        separator: 分隔线字符，None表示不显示表头下的分隔线
+    """
+
+    def __init__(self, columns, indent=" ", separator="-"):
+        self.columns = columns
+        self.indent = indent
+        self.separator = separator
+        self.rows = []
+        self.widths = None
+
+    def add_row(self, cells, colors=None):
+        """添加一行
+
+        Args:
+            cells: 各列的值（会被转换为字符串）
+            colors: 可选，各列的颜色代码列表，可以比列数短（None或空字符串表示不上色）
+        """
+        self.rows.append(([str(cell) for cell in cells], colors))
+
+    def _compute_widths(self):
+        widths = []
+        for i, column in enumerate(self.columns):
+            width = max([column.min_width, display_width(column.title)]
+                        + [display_width(cells[i]) for cells, _ in self.rows])
+            if column.max_width:
+                width = min(width, max(column.max_width, display_width(column.title)))
+            widths.append(width)
+        self.widths = widths
+
+    def _format(self, cells, colors=None):
+        parts = []
+        for i, (column, width) in enumerate(zip(self.columns, self.widths)):
+            cell = pad(truncate(cells[i], width), width, column.align)
+            color = colors[i] if colors and i < len(colors) else None
+            parts.append(f"{color}{cell}{RESET}" if color else cell)
+        return self.indent + " | ".join(parts)
+
+    def header_lines(self):
+        if self.widths is None:
+            self._compute_widths()
+        header = self._format([column.title for column in self.columns])
+        lines = [header]
+        if self.separator:
+            lines.append(self.separator * display_width(header))
+        return lines
+
+    def lines(self):
+        """渲染整张表，返回行列表"""
+        lines = self.header_lines()
+        lines.extend(self._format(cells, colors) for cells, colors in self.rows)
+        return lines
+
+    def render(self, before=(), after=()):
+        """渲染为一个字符串，before/after为表格前后的附加行"""
+        return "\n".join([*before, *self.lines(), *after]) + "\n"
+
+    def write(self, before=(), after=(), out=None):
+        """一次写出整张表（以及前后的附加行）"""
+        out = out or sys.stdout
+        out.write(self.render(before, after))
+        out.flush()
+
+
+class LiveTable(Table):
+    """原位更新的表格：show()显示整张表后，update()修改行内容，refresh()只重绘变化的行
+
+    列宽在show()时确定，之后变长的内容会被截断；在两次refresh()之间不能有其他输出，
+    需要显示的提示（可能来自其他线程）用status()写到表格下方的状态行。
+    """
+
+    def __init__(self, columns, indent=" ", separator="-", out=None):
+        super().__init__(columns, indent, separator)
+        self.out = out or sys.stdout
+        self._shown = []   # 终端上当前显示的各行
+        self._dirty = set()
+        self._status = None  # 表格下方状态行的内容，没有时为None
+        self._lock = threading.Lock()
+
+    def show(self):
+        lines = self.lines()
+        with self._lock:
+            self.out.write("\n".join(lines) + "\n")
+            self.out.flush()
+            self._shown = lines
+            self._dirty.clear()
+            self._status = None
+
+    def update(self, index, cells, colors=None):
+        self.rows[index] = ([str(cell) for cell in cells], colors)
+        self._dirty.add(index)
+
+    def refresh(self):
+        """把光标移到每个变化的行重写该行，最后回到表格下方，所有控制序列一次写出"""
+        with self._lock:
+            if not self._dirty:
+                return
+            offset = len(self._shown) - len(self.rows)  # 表头所占的行数
+            below = 0 if self._status is None else 1
+            height = shutil.get_terminal_size().lines
+            buffer = []
+            for index in sorted(self._dirty):
+                line = self._format(*self.rows[index])
+                position = offset + index
+                up = len(self._shown) - position + below
+                if line == self._shown[position] or up >= height:
+                    continue  # 内容没变，或该行已滚出屏幕无法原位更新
+                buffer.append(f"\x1b[{up}F\x1b[2K{line}\x1b[{up}E")
+                self._shown[position] = line
+            self._dirty.clear()
+            if buffer:
+                self.out.write("".join(buffer))
+                self.out.flush()
+
+    def status(self, text, color=None):
+        """在表格下方显示一行纯文本提示，替换上一条提示；text为None时清除状态行
+
+        提示按终端宽度截断，保证状态行只占一行，refresh()才能正确定位表格各行。
+        """
+        with self._lock:
+            if not self._shown:
+                return
+            if self._status is not None:
+                self.out.write("\x1b[1F\x1b[2K")  # 回到状态行并清除
+            if text is not None:
+                width = shutil.get_terminal_size().columns - display_width(self.indent) - 1
+                text = truncate(text, max(width, 10))
+                self.out.write(f"{self.indent}{color}{text}{RESET}\n" if color else f"{self.indent}{text}\n")
+            self._status = text
+            self.out.flush()
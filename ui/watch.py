@@ -0,0 +1,72 @@
+import os
+import hashlib
+from datetime import datetime
+
+import utils.workdir
+from config import WATCH_DEBOUNCE_MS, WATCH_POLL_INTERVAL_MS
+from services.local_runner import list_java_files, run_local_checks
+from ui.submission import get_file_hash
+from utils.watcher import create_watcher, wait_for_changes
+
+
+def workdir_content_hash(work_dir):
+    """计算工作目录下所有.java文件内容的组合哈希值"""
+    combined = hashlib.sha256()
+    for file_path in list_java_files(work_dir):
+        file_hash = get_file_hash(file_path=file_path)
+        if file_hash is None:
+            return None
+        combined.update(os.path.basename(file_path).encode('utf-8'))
+        combined.update(file_hash.encode('ascii'))
+    return combined.hexdigest()
+
+
+def format_check_line(result):
+    """将本地检查结果格式化为一行紧凑的输出"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    elapsed = f"({result.elapsed:.1f}s)"
+
+    if not result.compiled:
+        return f"[{timestamp}] \x1b[0;33mCE\x1b[0m {result.message} {elapsed}"
+
+    if result.kind is None:
+        return f"[{timestamp}] \x1b[0;32m编译通过\x1b[0m (无MainTest.java或样例文件) {elapsed}"
+
+    label = "JUnit" if result.kind == 'junit' else "样例"
+    if result.ok:
+        return f"[{timestamp}] \x1b[0;32mPASS\x1b[0m {label} {result.passed}/{result.total} {elapsed}"
+    return f"[{timestamp}] \x1b[0;31mFAIL\x1b[0m {label} {result.passed}/{result.total} {result.message} {elapsed}"
+
+
+def run_watch(args):
+    """oja watch [dir]: 监听工作目录，保存.java文件后自动编译并运行本地测试"""
+    if args:
+        utils.workdir.set(os.path.abspath(args[0]))
+    work_dir = utils.workdir.get()
+
+    if not os.path.isdir(work_dir):
+        print(f"[\x1b[0;31mx\x1b[0m] 工作目录 '{work_dir}' 不存在或不是一个目录")
+        return False
+
+    watcher = create_watcher(work_dir, poll_interval=WATCH_POLL_INTERVAL_MS / 1000)
+    print(f"[\x1b[0;36m!\x1b[0m] 正在监听 {work_dir} ({watcher.mode})，按Ctrl+C退出")
+
+    last_hash = workdir_content_hash(work_dir)
+    print(format_check_line(run_local_checks(work_dir)))
+
+    try:
+        while True:
+            wait_for_changes(watcher, WATCH_DEBOUNCE_MS / 1000)
+
+            # 内容未变化（例如仅触发了保存但没有修改）时跳过编译和测试
+            current_hash = workdir_content_hash(work_dir)
+            if current_hash == last_hash:
+                continue
+            last_hash = current_hash
+
+            print(format_check_line(run_local_checks(work_dir)))
+    except KeyboardInterrupt:
+        print("\n[\x1b[0;36m!\x1b[0m] 已停止监听")
+    finally:
+        watcher.close()
+    return True
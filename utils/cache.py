@@ -0,0 +1,95 @@
+"""本地缓存：内容寻址存储与JSON索引文件"""
+import os
+import json
+import hashlib
+import threading
+
+from utils.file_handlers import atomic_write
+
+
+class ContentStore:
+    """内容寻址存储，以内容的SHA-256作为文件名，相同内容只保存一份"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data):
+        """保存内容并返回其SHA-256"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            atomic_write(path, data)
+        return digest
+
+    def get(self, digest):
+        """读取内容，不存在时返回None"""
+        try:
+            with open(self.path_for(digest), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __contains__(self, digest):
+        return os.path.exists(self.path_for(digest))
+
+
+class JsonIndex:
+    """线程安全的JSON键值索引，修改后调用save()原子写回磁盘"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        self._mtime = None
+        self._load()
+
+    def _mtime_on_disk(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        mtime = self._mtime_on_disk()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        with self._lock:
+            self._data, self._mtime = data, mtime
+
+    def refresh(self):
+        """文件被其他JsonIndex实例或其他进程改写过时重新读取（本实例未保存的修改会被丢弃）"""
+        if self._mtime_on_disk() != self._mtime:
+            self._load()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def save(self):
+        with self._lock:
+            payload = json.dumps(self._data, ensure_ascii=False, indent=1)
+        atomic_write(self.path, payload)
+        self._mtime = self._mtime_on_disk()
+
+
+def file_sha256(file_path):
+    """计算文件内容的SHA-256，文件不存在时返回None"""
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
@@ -1,120 +1,185 @@
-def save_problem_to_file(problem, course_id, homework_id):
-    """将题目内容保存为文件"""
-    problem_id = problem.get('problemId', 'unknown')
-    problem_name = problem.get('problemName', 'unknown').replace('/', '-').replace('\\', '-')  # 替换无效文件名字符
-    details = problem.get('details', {})
-
-    # 创建文件名 - 直接在当前目录下保存
-    file_name = f"{course_id}_{homework_id}_{problem_id}_{problem_name}.md"
-
-    # 创建一个markdown格式的内容
-    content = f"# {problem_name}\n\n"
-    content += f"**题目ID:** {problem_id}  \n"
-    content += f"**课程:** {course_id}  \n"
-    content += f"**作业:** {homework_id}  \n\n"
-
-    # 添加题目属性
-    content += "## 题目信息\n\n"
-
-    # 难度
-    difficulty = details.get('difficulty', 0)
-    difficulty_text = ["未知", "入门", "简单", "普通", "困难", "魔鬼"][min(difficulty, 5)]
-    content += f"**难度:** {difficulty_text}  \n"
-
-    # IO模式
-    io_mode = details.get('ioMode', 0)
-    io_mode_text = "标准输入输出" if io_mode == 0 else "文件输入输出"
-    content += f"**IO模式:** {io_mode_text}  \n"
-
-    # 时间限制
-    if 'timeLimit' in details:
-        content += "**时间限制:**"
-        for lang, limit in details['timeLimit'].items():
-            content += f" {lang}: {limit} ms  \n"
-
-    # 内存限制
-    if 'memoryLimit' in details:
-        content += "**内存限制:**"
-        for lang, limit in details['memoryLimit'].items():
-            content += f" {lang}: {limit} MB  \n"
-
-    # 标签
-    if 'publicTags' in details and details['publicTags']:
-        content += "**标签:** " + ", ".join(details['publicTags']) + "  \n"
-
-    content += "\n## 题目描述\n\n"
-
-    # 添加题目内容
-    if 'content' in details:
-        content += details['content'] + "\n"
-    else:
-        content += "题目内容不可用\n"
-
-    # 添加最近提交记录信息（如果有）- 现在显示最多5条记录
-    if 'submission_records' in problem and problem['submission_records']:
-        content += "\n## 最近提交记录\n\n"
-
-        # 获取最多5条提交记录
-        records_to_show = min(5, len(problem['submission_records']))
-
-        for i in range(records_to_show):
-            record = problem['submission_records'][i]
-            record_id = record.get('recordId', 'Unknown')
-            result_state = record.get('resultState', 'Unknown')
-            score = record.get('score', 0)
-            submission_time = record.get('submissionTime', 'Unknown')
-
-            # 根据结果状态添加表情
-            status_emoji = "❓"
-            if result_state == 'AC':
-                status_emoji = "✅"
-            elif result_state == 'WA':
-                status_emoji = "❌"
-            elif result_state == 'TLE':
-                status_emoji = "⏱️"
-            elif result_state == 'MLE':
-                status_emoji = "💾"
-            elif result_state == 'RE':
-                status_emoji = "💥"
-            elif result_state == 'CE':
-                status_emoji = "⚠️"
-
-            content += f"### 提交 {i + 1} ({submission_time}) {status_emoji}\n\n"
-            content += f"**记录ID:** {record_id}  \n"
-            content += f"**状态:** {result_state}  \n"
-            content += f"**分数:** {score}  \n"
-
-            # 添加代码（如果有）
-            if 'code' in record and record['code']:
-                content += "\n**提交代码:**\n\n"
-                for code_file_name, code in record['code'].items():
-                    # 根据文件扩展名确定语言
-                    lang = ""
-                    if code_file_name.endswith('.java'):
-                        lang = "java"
-                    elif code_file_name.endswith('.py'):
-                        lang = "python"
-                    elif code_file_name.endswith('.cpp') or code_file_name.endswith('.c'):
-                        lang = "cpp"
-                    content += f"**{code_file_name}**\n\n```{lang}\n{code}\n```\n\n"
-
-            # 如果不是最后一条记录，添加分隔线
-            if i < records_to_show - 1:
-                content += "---\n\n"
-
-    # 保存文件 - 直接在当前目录
+import os
+import re
+import hashlib
+
+# 提交记录状态 -> 题目文件中显示的表情
+STATUS_EMOJI = {'AC': "✅", 'WA': "❌", 'TLE': "⏱️", 'MLE': "💾", 'RE': "💥", 'CE': "⚠️"}
+
+# 代码文件扩展名 -> Markdown代码块语言
+CODE_LANGUAGES = {'.java': "java", '.py': "python", '.cpp': "cpp", '.c': "cpp"}
+
+
+def safe_file_name(name):
+    """替换文件名中的无效字符"""
+    return re.sub(r'[\\/:*?"<>|]', '-', name).strip()
+
+
+def _slash_free(name):
+    """只替换路径分隔符，题目标题与单题保存的文件名一直使用这种形式"""
+    return name.replace('/', '-').replace('\\', '-')
+
+
+def write_problem_markdown(out, problem, course_id, homework_id, max_records=5):
+    """把题目渲染为Markdown，分段写入out（任何有write(str)方法的对象）
+
+    Args:
+        problem: Problem对象
+        max_records: 最多包含的最近提交记录数
+    """
+    write = out.write
+    write(f"# {_slash_free(problem.name)}\n\n")
+    write(f"**题目ID:** {problem.id}  \n")
+    write(f"**课程:** {course_id}  \n")
+    write(f"**作业:** {homework_id}  \n\n")
+
+    # 题目属性
+    write("## 题目信息\n\n")
+    write(f"**难度:** {problem.difficulty_label_zh}  \n")
+    write(f"**IO模式:** {problem.io_mode_text}  \n")
+
+    if problem.time_limit:
+        write("**时间限制:**")
+        for lang, limit in problem.time_limit.items():
+            write(f" {lang}: {limit} ms  \n")
+
+    if problem.memory_limit:
+        write("**内存限制:**")
+        for lang, limit in problem.memory_limit.items():
+            write(f" {lang}: {limit} MB  \n")
+
+    if problem.public_tags:
+        write("**标签:** " + ", ".join(problem.public_tags) + "  \n")
+
+    write("\n## 题目描述\n\n")
+    statement = problem.content
+    write(statement + "\n" if statement is not None else "题目内容不可用\n")
+
+    # 最近的提交记录
+    records = problem.records[:max_records]
+    if records:
+        write("\n## 最近提交记录\n\n")
+
+    for i, record in enumerate(records):
+        write(f"### 提交 {i + 1} ({record.submission_time}) {STATUS_EMOJI.get(record.result_state, '❓')}\n\n")
+        write(f"**记录ID:** {record.record_id}  \n")
+        write(f"**状态:** {record.result_state}  \n")
+        write(f"**分数:** {record.score}  \n")
+
+        code_files = record.code
+        if code_files:
+            write("\n**提交代码:**\n\n")
+            for code_file_name, code in code_files.items():
+                lang = CODE_LANGUAGES.get(os.path.splitext(code_file_name)[1], "")
+                write(f"**{code_file_name}**\n\n```{lang}\n{code}\n```\n\n")
+
+        # 记录之间的分隔线
+        if i < len(records) - 1:
+            write("---\n\n")
+
+
+def save_problem_to_file(problem, course_id, homework_id, directory=None):
+    """将题目内容保存为Markdown文件，内容未变化时不重写
+
+    Args:
+        problem: Problem对象
+        course_id: 课程ID
+        homework_id: 作业ID
+        directory: 保存目录，默认为工作目录
+
+    Returns:
+        文件路径，失败时返回None
+    """
+    import utils.workdir
+    file_name = f"{course_id}_{homework_id}_{problem.id}_{_slash_free(problem.name)}.md"
+    file_path = os.path.join(directory or utils.workdir.get(), file_name)
     try:
-        # 不创建子目录，直接在当前目录保存
-        import os,utils.workdir
-        file_path = os.path.join(utils.workdir.get(), file_name)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-
+        with AtomicWriter(file_path) as out:
+            write_problem_markdown(out, problem, course_id, homework_id)
         return file_path
     except Exception as e:
         print(f"[\x1b[0;31mx\x1b[0m] 保存题目文件时出错: {e}")
         return None
 
+
+class AtomicWriter:
+    """流式写入目标文件：内容写入同目录下的临时文件并同时计算SHA-256，
+    完成时与目标文件内容相同则丢弃临时文件，否则原子替换目标文件
+
+    与文本模式的open()一样，写入的\\n转换为newline（默认为os.linesep，Windows上为\\r\\n）。
+
+    用法:
+        with AtomicWriter(path) as out:
+            out.write(...)
+        out.status  # 'new' / 'updated' / 'unchanged'
+    """
+
+    def __init__(self, file_path, newline=os.linesep):
+        self.path = file_path
+        self.newline = newline
+        self.status = None
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        import tempfile
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+        self._file = os.fdopen(fd, 'wb')
+        return self
+
+    def write(self, text):
+        if self.newline != '\n':
+            text = text.replace('\n', self.newline)
+        data = text.encode('utf-8')
+        self._hash.update(data)
+        self._file.write(data)
+
+    @property
+    def digest(self):
+        return self._hash.hexdigest()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is not None:
+            os.remove(self._tmp_path)
+            return False
+
+        from utils.cache import file_sha256
+        existing = file_sha256(self.path)
+        if existing == self.digest:
+            os.remove(self._tmp_path)
+            self.status = 'unchanged'
+        else:
+            os.replace(self._tmp_path, self.path)
+            self.status = 'updated' if existing else 'new'
+        return False
+
+
+def atomic_write(file_path, data):
+    """原子地写入文件：先写入同目录下的临时文件，再替换目标文件
+
+    Args:
+        file_path: 目标文件路径
+        data: bytes或str（str按UTF-8编码）
+    """
+    import tempfile
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 def read_java_file(file_path):
     """读取Java文件内容。"""
     try:
@@ -122,4 +187,25 @@ def read_java_file(file_path):
             return file.read()
     except Exception as e:
         print(f"[\x1b[0;31mx\x1b[0m] 读取文件错误: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def read_cookies_file(file_path):
+    """读取Cookies文本文件（每行 key=value，#开头为注释）
+
+    Returns:
+        dict，文件不存在时返回None
+
+    Raises:
+        OSError: 读取文件失败
+    """
+    if not os.path.exists(file_path):
+        return None
+    stored = {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            stored[key.strip()] = value.strip()
+    return stored
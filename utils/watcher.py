@@ -0,0 +1,133 @@
+"""工作目录文件变化监听，Linux下使用inotify，其他平台退化为轮询"""
+import os
+import time
+import select
+import struct
+
+# inotify 事件掩码
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _is_java(name):
+    return name.lower().endswith('.java')
+
+
+class InotifyWatcher:
+    """基于inotify的目录监听器，只关注目录下的.java文件"""
+
+    mode = 'inotify'
+
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+
+        self.directory = directory
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+        if wd < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"无法监听目录: {directory}")
+
+    def poll(self, timeout):
+        """等待最多timeout秒，返回发生变化的.java文件路径集合"""
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += name_len
+            if name and _is_java(name):
+                changed.add(os.path.join(self.directory, name))
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PollingWatcher:
+    """轮询目录下.java文件的修改时间和大小来检测变化"""
+
+    mode = 'polling'
+
+    def __init__(self, directory, interval=0.5):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and _is_java(entry.name):
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return snapshot
+
+    def poll(self, timeout):
+        """等待最多timeout秒，返回发生变化的.java文件路径集合"""
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {path for path in current.keys() | self._snapshot.keys()
+                       if current.get(path) != self._snapshot.get(path)}
+            self._snapshot = current
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def create_watcher(directory, poll_interval=0.5):
+    """创建目录监听器，优先使用inotify，不可用时退化为轮询"""
+    try:
+        return InotifyWatcher(directory)
+    except (OSError, AttributeError):
+        return PollingWatcher(directory, interval=poll_interval)
+
+
+def wait_for_changes(watcher, debounce):
+    """阻塞直到有.java文件变化，并在静默debounce秒后返回本批所有变化的文件
+
+    编辑器保存时常常连续触发多个事件（截断、写入、重命名），合并为一次处理
+    """
+    changed = set()
+    while not changed:
+        changed = watcher.poll(1.0)
+
+    while True:
+        more = watcher.poll(debounce)
+        if not more:
+            return changed
+        changed |= more